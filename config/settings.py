@@ -9,9 +9,26 @@ USE_TESTNET = os.environ.get('BINANCE_TESTNET', 'false').lower() == 'true'
 
 # Trading parameters
 SYMBOL = 'BTCUSDT'
+# Comma separated symbols for the multi-symbol live engine
+SYMBOLS = os.environ.get('BINANCE_SYMBOLS', SYMBOL).split(',')
 INTERVAL = '15m'
 SHORT_WINDOW = 10
 LONG_WINDOW = 50
 
+# Quote amount (USDT) spent per BUY order in live and replay mode
+ORDER_SIZE = float(os.environ.get('ORDER_SIZE', 100))
+
+# Local data directory (klines, snapshots)
+DATA_DIR = os.environ.get('DATA_DIR', 'data')
+
+# Kline storage format: 'npy' (float records) or 'compact' (fixed-point integers)
+KLINE_FORMAT = os.environ.get('KLINE_FORMAT', 'npy')
+
+# Indicator tables kept up to date next to the stored klines (name:param:...)
+INDICATOR_TABLES = os.environ.get('INDICATOR_TABLES', 'macd:12:26:9,rsi:14,vwap:20')
+
+# Live engine state snapshot, used for warm restarts
+SNAPSHOT_PATH = os.environ.get('LIVE_SNAPSHOT_PATH', os.path.join(DATA_DIR, 'live_snapshot.npz'))
+
 # Backtesting parameters
 INITIAL_CAPITAL = 10000
\ No newline at end of file
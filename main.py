@@ -8,7 +8,18 @@ from src.trading.strategy import (
     VATSStrategy
 )
 from src.trading.vwap_strategy import VWAPStrategy
+from src.trading.macd_strategy import MACDStrategy
+from src.trading.ensemble import EnsembleStrategy
 from src.trading.backtest import Backtester
+from src.trading.live_engine import LiveSignalEngine
+from src.trading.vector_strategy import vectorize_strategy
+from src.trading.paper_broker import PaperBroker
+from src.trading.journal import TradeJournal
+from src.trading.replay import KlineReplay
+from src.trading.portfolio import PortfolioBacktester
+from src.data.compact import get_kline_store
+from src.data.indicators import IndicatorStore
+from src.service.signal_server import SignalService
 from config import settings
 from src.utils.logger import get_logger
 
@@ -58,7 +69,22 @@ STRATEGIES = {
         "params": {
             "window": 20,
         },
-    }
+    },
+    "ensemble": {
+        "name": "Ensemble vote (MA, RSI, Bollinger, VATS, MACD, VWAP)",
+        "class": EnsembleStrategy,
+        "params": {
+            "members": [
+                MovingAverageCrossoverStrategy(settings.SHORT_WINDOW, settings.LONG_WINDOW),
+                RSIStrategy(),
+                BollingerBandsStrategy(),
+                VATSStrategy(),
+                MACDStrategy(),
+                VWAPStrategy(),
+            ],
+            "threshold": 0.0,
+        },
+    },
 }
 
 def get_strategy(strategy_name):
@@ -77,6 +103,23 @@ def get_strategy(strategy_name):
     return strategy_instance
 
 
+def parse_symbols(symbols):
+    return [symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()]
+
+
+def load_history(binance_client, symbols, start_date):
+    """Closed klines per symbol, from the local store when available, otherwise downloaded"""
+    store = get_kline_store(binance_client)
+    history = {}
+    for symbol in symbols:
+        klines = store.get_historical_klines(symbol, settings.INTERVAL, start_date)
+        if not klines:
+            # The most recent downloaded kline is still open
+            klines = binance_client.get_historical_klines(symbol, settings.INTERVAL, start_date)[:-1]
+        history[symbol] = klines
+    return history
+
+
 def main():
     parser = argparse.ArgumentParser(description="Binance Trading Bot")
     parser.add_argument(
@@ -84,14 +127,15 @@ def main():
         type=str,
         default="ma",
         choices=list(STRATEGIES.keys()),
-        help="Trading strategy to use (default: ma). Options: ma, rsi, bb, vats, yolo",
+        help="Trading strategy to use (default: ma). Options: ma, rsi, bb, vats, yolo, vwap, ensemble",
     )
     parser.add_argument(
         "--mode",
         type=str,
         default="backtest",
-        choices=["backtest", "live"],
-        help="Trading mode: backtest or live",
+        choices=["backtest", "live", "replay", "portfolio", "serve"],
+        help="Trading mode: backtest, live, replay (stored klines through the live pipeline), "
+             "portfolio (multi-symbol backtest) or serve (local signal query service)",
     )
     parser.add_argument(
         "--start-date",
@@ -106,7 +150,104 @@ def main():
         choices=["unix", "human"],
         help="Timestamp format for trade logs: unix or human (default: unix)",
     )
+    parser.add_argument(
+        "--symbols",
+        type=str,
+        default=",".join(settings.SYMBOLS),
+        help="Comma separated symbols for live, replay and portfolio mode (default: BINANCE_SYMBOLS or SYMBOL)",
+    )
+    parser.add_argument(
+        "--execute",
+        action="store_true",
+        help="Live mode: send orders to Binance instead of the paper broker",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="Replay speed relative to real time, 0 = as fast as possible (default: 0)",
+    )
+    parser.add_argument(
+        "--allocation",
+        type=str,
+        default="equal",
+        choices=list(PortfolioBacktester.ALLOCATIONS),
+        help="Portfolio mode: capital allocation rule (default: equal)",
+    )
+    parser.add_argument(
+        "--max-positions",
+        type=int,
+        default=None,
+        help="Portfolio mode: maximum number of symbols held at once",
+    )
+    parser.add_argument(
+        "--rebalance-every",
+        type=int,
+        default=96,
+        help="Portfolio mode: bars between scheduled rebalances (default: 96)",
+    )
+    parser.add_argument(
+        "--stop-loss",
+        type=float,
+        default=None,
+        help="Backtest mode: stop-loss as a fraction of the entry price, e.g. 0.02",
+    )
+    parser.add_argument(
+        "--take-profit",
+        type=float,
+        default=None,
+        help="Backtest mode: take-profit as a fraction of the entry price",
+    )
+    parser.add_argument(
+        "--trailing-stop",
+        type=float,
+        default=None,
+        help="Backtest mode: trailing stop as a fraction below the highest price since entry",
+    )
+    parser.add_argument(
+        "--maker-fee",
+        type=float,
+        default=0.0,
+        help="Backtest mode: fee rate for take-profit (limit) fills (default: 0)",
+    )
+    parser.add_argument(
+        "--taker-fee",
+        type=float,
+        default=0.0,
+        help="Backtest mode: fee rate for market and stop fills (default: 0)",
+    )
+    parser.add_argument(
+        "--slippage-bps",
+        type=float,
+        default=0.0,
+        help="Backtest mode: adverse slippage on market and stop fills in basis points (default: 0)",
+    )
+    parser.add_argument(
+        "--intrabar-interval",
+        type=str,
+        default=None,
+        help="Backtest mode: finer interval (e.g. 1m, 1s) used to resolve bars that hit both the stop and the target",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Serve mode: local HTTP port (default: 8765)",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Serve mode: also listen on this Unix socket path",
+    )
+    parser.add_argument(
+        "--journal",
+        type=str,
+        default=None,
+        help="Append trades to this binary trade journal (backtest, live and replay mode)",
+    )
     args = parser.parse_args()
+    journal = TradeJournal(args.journal) if args.journal else None
 
     binance_client = get_binance_client()
 
@@ -128,13 +269,96 @@ def main():
             settings.INTERVAL,
             args.start_date,
             time_format=args.time_format,
+            journal=journal,
+            stop_loss=args.stop_loss,
+            take_profit=args.take_profit,
+            trailing_stop=args.trailing_stop,
+            maker_fee=args.maker_fee,
+            taker_fee=args.taker_fee,
+            slippage_bps=args.slippage_bps,
+            intrabar_interval=args.intrabar_interval,
+            kline_store=get_kline_store(binance_client),
+            indicator_store=IndicatorStore(get_kline_store(binance_client)),
         )
         backtester.run()
     elif args.mode == "live":
         logger.info("Running in live trading mode")
-        # Live trading logic will be implemented here in the future
-        logger.warning("Live trading mode is not yet implemented.")
+        symbols = parse_symbols(args.symbols)
+        engine = LiveSignalEngine(
+            vectorize_strategy(strategy, len(symbols)),
+            symbols,
+            settings.INTERVAL,
+            client=binance_client,
+            snapshot_path=settings.SNAPSHOT_PATH,
+            journal=journal,
+            indicator_store=IndicatorStore(get_kline_store(binance_client)),
+        )
+        if args.execute:
+            logger.warning("Orders will be sent to Binance")
+            engine.broker = binance_client
+            for symbol in symbols:
+                filters = binance_client.get_symbol_filters(symbol)
+                if filters:
+                    engine.step_sizes[symbol] = filters['step_size']
+        else:
+            engine.broker = PaperBroker(settings.INITIAL_CAPITAL, price_source=engine.last_close)
+        # Restores the last snapshot and only fetches bars missed since then
+        engine.resume(args.start_date)
+        try:
+            engine.start()
+        except KeyboardInterrupt:
+            logger.info("Stopping live engine")
+        finally:
+            engine.stop()
+    elif args.mode == "serve":
+        logger.info("Running the signal query service")
+        symbols = parse_symbols(args.symbols)
+        # Signal-only engine: no broker, no orders
+        engine = LiveSignalEngine(
+            vectorize_strategy(strategy, len(symbols)),
+            symbols,
+            settings.INTERVAL,
+            client=binance_client,
+            indicator_store=IndicatorStore(get_kline_store(binance_client)),
+        )
+        engine.resume(args.start_date)
+        service = SignalService(engine, port=args.port, unix_socket=args.socket)
+        service.start()
+        try:
+            engine.start()
+        except KeyboardInterrupt:
+            logger.info("Stopping signal service")
+        finally:
+            engine.stop()
+            service.stop()
+    elif args.mode == "replay":
+        logger.info("Running in replay mode")
+        symbols = parse_symbols(args.symbols)
+        history = load_history(binance_client, symbols, args.start_date)
+        engine = LiveSignalEngine(vectorize_strategy(strategy, len(symbols)), symbols, settings.INTERVAL,
+                                  journal=journal)
+        # Replayed fills happen at the bar close, not now
+        engine.broker = PaperBroker(settings.INITIAL_CAPITAL, price_source=engine.last_close,
+                                    time_source=engine.last_close_time)
+        KlineReplay(engine, history, speed=args.speed).run()
+        logger.info(f"Paper equity: {engine.broker.equity():.2f} (started with {settings.INITIAL_CAPITAL})")
+    elif args.mode == "portfolio":
+        logger.info("Running in portfolio backtest mode")
+        history = load_history(binance_client, parse_symbols(args.symbols), args.start_date)
+        history = {symbol: klines for symbol, klines in history.items() if klines}
+        if not history:
+            logger.error("Could not load klines for the portfolio backtest.")
+            return
+        PortfolioBacktester.from_strategy(
+            strategy,
+            history,
+            allocation=args.allocation,
+            max_positions=args.max_positions,
+            rebalance_every=args.rebalance_every,
+        ).run()
 
+    if journal is not None:
+        journal.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,8 @@
-from binance.client import Client
 from config import settings
+from src.api.transport import PooledClient, single_flight
 from src.utils.logger import get_logger
 import os
+import threading
 
 logger = get_logger(__name__)
 
@@ -9,25 +10,76 @@ class BinanceClient:
     def __init__(self, api_key=None, api_secret=None, testnet=False):
         # Allow None for public endpoints (backtesting)
         if api_key and api_secret:
-            self.client = Client(api_key, api_secret, testnet=testnet)
+            self.client = PooledClient(api_key, api_secret, testnet=testnet)
             if testnet:
                 logger.info("Connected to Binance TESTNET")
             else:
                 logger.info("Connected to Binance LIVE")
         else:
             # Public client for backtesting
-            self.client = Client()
+            self.client = PooledClient()
             logger.info("Using public Binance API (no authentication)")
 
-    def get_historical_klines(self, symbol, interval, start_str, end_str=None):
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None, raise_errors=False):
         logger.info(f"Fetching historical klines for {symbol} with interval {interval}")
         try:
-            klines = self.client.get_historical_klines(symbol, interval, start_str, end_str)
+            # Identical concurrent requests (from any client) share one download;
+            # the returned list is shared too, so callers must not modify it
+            key = (self.client.API_URL, 'klines', symbol, interval, start_str, end_str)
+            klines = single_flight.do(
+                key, self.client.get_historical_klines, symbol, interval, start_str, end_str
+            )
             return klines
         except Exception as e:
             logger.error(f"Error fetching historical klines: {e}")
+            # Callers that store data must not mistake a failed request for an empty range
+            if raise_errors:
+                raise
             return []
 
+    def get_symbol_ticker(self, symbol):
+        """Get the latest price as {'symbol', 'price'}"""
+        try:
+            key = (self.client.API_URL, 'ticker', symbol)
+            return single_flight.do(key, self.client.get_symbol_ticker, symbol=symbol)
+        except Exception as e:
+            logger.error(f"Error fetching ticker for {symbol}: {e}")
+            return None
+
+    def get_trading_symbols(self, quote_asset='USDT'):
+        """Symbols currently trading against `quote_asset`, e.g. every USDT pair"""
+        try:
+            info = self.client.get_exchange_info()
+            return [
+                entry['symbol'] for entry in info['symbols']
+                if entry['quoteAsset'] == quote_asset and entry['status'] == 'TRADING'
+            ]
+        except Exception as e:
+            logger.error(f"Error fetching exchange info: {e}")
+            return []
+
+    def get_order_book(self, symbol, limit=1000):
+        """Get a depth snapshot with 'lastUpdateId', 'bids' and 'asks'"""
+        logger.info(f"Fetching order book snapshot for {symbol} (limit {limit})")
+        try:
+            return self.client.get_order_book(symbol=symbol, limit=limit)
+        except Exception as e:
+            logger.error(f"Error fetching order book: {e}")
+            return None
+
+    def get_symbol_filters(self, symbol):
+        """Get the price tick size and quantity step size for a symbol"""
+        try:
+            info = self.client.get_symbol_info(symbol)
+            filters = {f['filterType']: f for f in info['filters']}
+            return {
+                'tick_size': float(filters['PRICE_FILTER']['tickSize']),
+                'step_size': float(filters['LOT_SIZE']['stepSize']),
+            }
+        except Exception as e:
+            logger.error(f"Error getting symbol filters for {symbol}: {e}")
+            return None
+
     def place_order(self, symbol, side, type, quantity):
         logger.info(f"Placing a {side} order for {quantity} of {symbol}")
         try:
@@ -66,12 +118,20 @@ class BinanceClient:
             logger.error(f"Error getting account info: {e}")
             return None
 
+# One client per credentials/network, so repeated calls skip the setup and ping
+_clients = {}
+_clients_lock = threading.Lock()
+
 def get_binance_client():
     # Check if we should use testnet
     use_testnet = os.environ.get('BINANCE_TESTNET', 'false').lower() == 'true'
-    
-    return BinanceClient(
-        settings.API_KEY, 
-        settings.API_SECRET,
-        testnet=use_testnet
-    )
\ No newline at end of file
+
+    key = (settings.API_KEY, settings.API_SECRET, use_testnet)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = BinanceClient(
+                settings.API_KEY,
+                settings.API_SECRET,
+                testnet=use_testnet
+            )
+        return _clients[key]
\ No newline at end of file
@@ -0,0 +1,100 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from binance.client import Client
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Connection pool shared by every client in the process. Sessions keep their own
+# headers (API keys), but mounting the same adapter makes them reuse its keep-alive
+# connections instead of opening and handshaking new ones.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+
+class SharedAdapter(HTTPAdapter):
+    """HTTPAdapter that outlives the sessions it is mounted on"""
+
+    def close(self):
+        # Session.close() closes every mounted adapter; one client closing its session
+        # must not drop the connections of all the others
+        pass
+
+    def close_pool(self):
+        super().close()
+
+
+_adapter = SharedAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+
+
+def shared_adapter():
+    return _adapter
+
+
+class PooledClient(Client):
+    """python-binance Client whose HTTP session uses the shared connection pool"""
+
+    def _init_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(self._get_headers())
+        session.mount('https://', _adapter)
+        session.mount('http://', _adapter)
+        return session
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Merge identical concurrent calls.
+
+        While a call for a key is in flight, other threads asking for the same key
+        wait for it and receive its result (or exception) instead of issuing their
+        own request. Nothing is cached once the call completes.
+
+        Calls are only merged within one process; separate processes share market
+        data through the MarketDataServer (src.service.market_data).
+        """
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self.lock:
+            return len(self.calls)
+
+
+# Shared by all clients in the process, so concurrent jobs running in threads coalesce across instances
+single_flight = SingleFlight()
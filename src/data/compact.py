@@ -0,0 +1,297 @@
+import json
+import math
+import os
+import struct
+import numpy as np
+from binance.helpers import interval_to_milliseconds
+from config import settings
+from src.data.kline_store import KLINE_DTYPE, KlineStore
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'CCTK'
+VERSION = 1
+# magic, version, length of the JSON metadata that follows
+HEADER = struct.Struct('<4sHI')
+# Records start on a 64 byte boundary so memory maps are aligned
+ALIGNMENT = 64
+
+# Binance reports quote volumes with 8 decimals
+QUOTE_DECIMALS = 8
+# Finest scale tried for values that are not multiples of the tick or step size
+MAX_DECIMALS = 12
+
+# Encoded columns, all integers:
+#   open_time_delta   open time minus previous open time minus the interval (0 without gaps)
+#   duration_delta    close time minus open time minus (interval - 1)
+#   close_delta       close minus previous close, in ticks
+#   open_offset       open minus close, in ticks
+#   high_offset       high minus max(open, close), in ticks
+#   low_offset        min(open, close) minus low, in ticks
+#   volume            base volumes in steps, quote volumes in 1e-8 units
+# Every column is stored in the narrowest integer type that fits it. Values finer than
+# the tick or step size get a finer scale (see fixed_point_scale), recorded in the metadata.
+COLUMNS = (
+    'open_time_delta', 'duration_delta', 'close_delta', 'open_offset', 'high_offset', 'low_offset',
+    'volume', 'quote_asset_volume', 'number_of_trades',
+    'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume',
+)
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def decimals(size):
+    """Decimal places needed to represent multiples of a tick or step size"""
+    return max(0, -math.floor(math.log10(size) + 1e-9)) if size < 1 else 0
+
+
+def narrowest(values):
+    if not len(values):
+        return np.int8
+    low, high = values.min(), values.max()
+    for int_type in INT_TYPES:
+        info = np.iinfo(int_type)
+        if info.min <= low and high <= info.max:
+            return int_type
+    raise ValueError("Values do not fit in 64 bit integers")
+
+
+def fixed_point_scale(columns, places):
+    """
+    Smallest scale 10**d with d >= places at which every value of `columns` survives
+    the round trip through integers.
+
+    A past tick size change, or a file keeping the tick size it was created with,
+    can leave values finer than the current tick; those get a finer scale instead of
+    being rounded.
+    """
+    for digits in range(places, MAX_DECIMALS + 1):
+        scale = 10 ** digits
+        if any(len(values) and np.abs(values).max() * scale >= 2 ** 62 for values in columns):
+            break
+        if all(np.allclose(np.rint(values * scale) / scale, values, rtol=1e-12, atol=0) for values in columns):
+            return scale
+    raise ValueError(f"Values cannot be stored as fixed-point integers with at most {MAX_DECIMALS} decimals")
+
+
+def _delta(values, first):
+    return np.diff(values, prepend=first)
+
+
+def encode_klines(records, interval, tick_size, step_size):
+    """
+    Encode KLINE_DTYPE records as delta-encoded fixed-point integers.
+
+    Args:
+        records: KLINE_DTYPE array sorted by open time
+        interval: Kline interval, e.g. '1m'
+        tick_size: Price tick size of the symbol
+        step_size: Quantity step size of the symbol
+
+    Returns:
+        (meta, encoded) where `meta` holds the scales and base values needed to decode
+    """
+    interval_ms = interval_to_milliseconds(interval)
+    price_scale = fixed_point_scale([records[name] for name in ('open', 'high', 'low', 'close')],
+                                    decimals(tick_size))
+    qty_scale = fixed_point_scale([records['volume'], records['taker_buy_base_asset_volume']],
+                                  decimals(step_size))
+    quote_scale = fixed_point_scale([records['quote_asset_volume'], records['taker_buy_quote_asset_volume']],
+                                    QUOTE_DECIMALS)
+    if price_scale > 10 ** decimals(tick_size) or qty_scale > 10 ** decimals(step_size):
+        logger.warning(
+            f"Klines are finer than tick size {tick_size} / step size {step_size}, "
+            f"storing prices x{price_scale} and quantities x{qty_scale}"
+        )
+
+    def units(name, scale):
+        return np.rint(records[name] * scale).astype(np.int64)
+
+    open_time = records['open_time'].astype(np.int64)
+    o, h, l, c = (units(name, price_scale) for name in ('open', 'high', 'low', 'close'))
+    base_open_time = int(open_time[0]) if len(records) else 0
+    base_close = int(c[0]) if len(records) else 0
+
+    columns = {
+        'open_time_delta': _delta(open_time, base_open_time - interval_ms) - interval_ms,
+        'duration_delta': records['close_time'] - open_time - (interval_ms - 1),
+        'close_delta': _delta(c, base_close),
+        'open_offset': o - c,
+        'high_offset': h - np.maximum(o, c),
+        'low_offset': np.minimum(o, c) - l,
+        'volume': units('volume', qty_scale),
+        'quote_asset_volume': units('quote_asset_volume', quote_scale),
+        'number_of_trades': records['number_of_trades'].astype(np.int64),
+        'taker_buy_base_asset_volume': units('taker_buy_base_asset_volume', qty_scale),
+        'taker_buy_quote_asset_volume': units('taker_buy_quote_asset_volume', quote_scale),
+    }
+    dtype = np.dtype([(name, narrowest(columns[name])) for name in COLUMNS])
+    encoded = np.empty(len(records), dtype=dtype)
+    for name in COLUMNS:
+        encoded[name] = columns[name]
+
+    meta = {
+        'interval_ms': interval_ms,
+        'tick_size': tick_size,
+        'step_size': step_size,
+        'price_scale': price_scale,
+        'qty_scale': qty_scale,
+        'quote_scale': quote_scale,
+        'base_open_time': base_open_time,
+        'base_close': base_close,
+        'count': len(records),
+        'dtype': [(name, dtype[name].str) for name in COLUMNS],
+    }
+    return meta, encoded
+
+
+def decode_klines(meta, encoded, columns=None):
+    """
+    Decode fixed-point records back into KLINE_DTYPE.
+
+    Args:
+        columns: Optional subset of KLINE_DTYPE fields to decode; the others are left
+            as zeros. Decoding only 'close' skips most of the work.
+    """
+    wanted = set(columns or KLINE_DTYPE.names)
+    records = np.zeros(len(encoded), dtype=KLINE_DTYPE)
+    if not len(encoded):
+        return records
+    interval_ms = meta['interval_ms']
+    price_scale, qty_scale, quote_scale = meta['price_scale'], meta['qty_scale'], meta['quote_scale']
+
+    if wanted & {'open_time', 'close_time'}:
+        steps = encoded['open_time_delta'].astype(np.int64) + interval_ms
+        open_time = meta['base_open_time'] - interval_ms + np.cumsum(steps)
+        records['open_time'] = open_time
+        if 'close_time' in wanted:
+            records['close_time'] = open_time + interval_ms - 1 + encoded['duration_delta']
+
+    if wanted & {'open', 'high', 'low', 'close'}:
+        c = meta['base_close'] + np.cumsum(encoded['close_delta'], dtype=np.int64)
+        o = c + encoded['open_offset']
+        records['close'] = c / price_scale
+        records['open'] = o / price_scale
+        if 'high' in wanted:
+            records['high'] = (np.maximum(o, c) + encoded['high_offset']) / price_scale
+        if 'low' in wanted:
+            records['low'] = (np.minimum(o, c) - encoded['low_offset']) / price_scale
+
+    for name, scale in (('volume', qty_scale), ('quote_asset_volume', quote_scale),
+                        ('taker_buy_base_asset_volume', qty_scale),
+                        ('taker_buy_quote_asset_volume', quote_scale)):
+        if name in wanted:
+            records[name] = encoded[name] / scale
+    if 'number_of_trades' in wanted:
+        records['number_of_trades'] = encoded['number_of_trades']
+    return records
+
+
+def write_compact(path, meta, encoded):
+    """Atomically write encoded klines: header, JSON metadata, padding, records"""
+    meta_bytes = json.dumps(meta).encode()
+    offset = HEADER.size + len(meta_bytes)
+    padding = -offset % ALIGNMENT
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(meta_bytes) + padding))
+        f.write(meta_bytes + b' ' * padding)
+        f.write(encoded.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_compact(path):
+    """
+    Read the metadata of a compact kline file and memory-map its records.
+
+    Returns:
+        (meta, encoded) with `encoded` a read-only memory map
+    """
+    with open(path, 'rb') as f:
+        magic, version, meta_length = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} compact kline file")
+        meta = json.loads(f.read(meta_length))
+    dtype = np.dtype([(name, type_str) for name, type_str in meta['dtype']])
+    if not meta['count']:
+        return meta, np.empty(0, dtype=dtype)
+    encoded = np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size + meta_length,
+                        shape=(meta['count'],))
+    return meta, encoded
+
+
+def get_kline_store(client=None):
+    """The kline store selected by settings.KLINE_FORMAT; `client` supplies symbol filters"""
+    if settings.KLINE_FORMAT == 'compact':
+        return CompactKlineStore(filters=client)
+    return KlineStore()
+
+
+class CompactKlineStore(KlineStore):
+    def __init__(self, root=None, filters=None):
+        """
+        KlineStore that keeps every series as fixed-point integers (see encode_klines).
+
+        Prices are scaled by the symbol's tick size and volumes by its step size, times
+        and prices are delta encoded, and each column uses the narrowest integer type
+        that fits. `load` decodes into the usual KLINE_DTYPE records; `load_columns`
+        decodes only what a caller needs.
+
+        Args:
+            root: Directory holding the files (default: <DATA_DIR>/klines)
+            filters: Dict of symbol -> {'tick_size', 'step_size'}, or an object with
+                `get_symbol_filters(symbol)` such as BinanceClient. Only needed to
+                create new files; existing files carry their own scales.
+        """
+        super().__init__(root)
+        self.filters = filters
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), f"{interval}.klc")
+
+    def symbol_filters(self, symbol):
+        if isinstance(self.filters, dict):
+            filters = self.filters.get(symbol)
+        elif self.filters is not None:
+            filters = self.filters.get_symbol_filters(symbol)
+        else:
+            filters = None
+        if not filters:
+            raise ValueError(f"No tick and step size available for {symbol}")
+        return filters
+
+    def load_encoded(self, symbol, interval):
+        """(meta, memory-mapped encoded records) or (None, None) if nothing is stored"""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None, None
+        return read_compact(path)
+
+    def load(self, symbol, interval, mmap=True):
+        """Return the stored records decoded into KLINE_DTYPE, empty if none"""
+        return self.load_columns(symbol, interval)
+
+    def load_columns(self, symbol, interval, columns=None):
+        meta, encoded = self.load_encoded(symbol, interval)
+        if meta is None:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return decode_klines(meta, encoded, columns)
+
+    def append_tail(self, symbol, interval, records):
+        # Appending could widen the delta columns, so compact files are always re-encoded
+        return False
+
+    def save(self, symbol, interval, records):
+        meta, _ = self.load_encoded(symbol, interval)
+        if meta is not None:
+            filters = {'tick_size': meta['tick_size'], 'step_size': meta['step_size']}
+        else:
+            filters = self.symbol_filters(symbol)
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta, encoded = encode_klines(records, interval, filters['tick_size'], filters['step_size'])
+        write_compact(path, meta, encoded)
+        logger.debug(
+            f"Encoded {len(records)} {symbol} {interval} klines in {encoded.nbytes} bytes "
+            f"({encoded.itemsize} per kline)"
+        )
@@ -0,0 +1,287 @@
+import argparse
+import inspect
+import os
+import numpy as np
+import pandas as pd
+from config import settings
+from src.data.compact import get_kline_store
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Indicator:
+    """
+    An indicator that can be extended bar by bar from a stored table.
+
+    Recursive indicators (EMAs) continue from the last stored row. Windowed indicators
+    recompute only the new bars from the `lookback` klines before them.
+    """
+    name = None
+    columns = ()
+    recursive = False
+
+    @property
+    def lookback(self):
+        return 0
+
+    def params(self):
+        names = inspect.signature(type(self).__init__).parameters
+        return {name: getattr(self, name) for name in names if name != 'self'}
+
+    def key(self):
+        return '_'.join([self.name] + [str(value) for value in self.params().values()])
+
+    def compute(self, records, seed=None):
+        """
+        Args:
+            records: KLINE_DTYPE records, starting `lookback` bars before the first new bar
+            seed: Last stored row for recursive indicators, None when starting from scratch
+
+        Returns:
+            Dict of column -> array with one value per record
+        """
+        raise NotImplementedError
+
+
+def _ema(values, span, seed=None):
+    # ewm(adjust=False) continues exactly from a previous value put in front of the data
+    if seed is None:
+        return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+    return pd.Series(np.concatenate([[seed], values])).ewm(span=span, adjust=False).mean().to_numpy()[1:]
+
+
+class EMAIndicator(Indicator):
+    name = 'ema'
+    columns = ('ema',)
+    recursive = True
+
+    def __init__(self, span=20):
+        self.span = span
+
+    def compute(self, records, seed=None):
+        return {'ema': _ema(records['close'], self.span, None if seed is None else seed['ema'])}
+
+
+class MACDIndicator(Indicator):
+    name = 'macd'
+    columns = ('ema_fast', 'ema_slow', 'macd_line', 'signal_line')
+    recursive = True
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+
+    def compute(self, records, seed=None):
+        def previous(column):
+            return None if seed is None else seed[column]
+
+        ema_fast = _ema(records['close'], self.fast_period, previous('ema_fast'))
+        ema_slow = _ema(records['close'], self.slow_period, previous('ema_slow'))
+        macd_line = ema_fast - ema_slow
+        signal_line = _ema(macd_line, self.signal_period, previous('signal_line'))
+        return {'ema_fast': ema_fast, 'ema_slow': ema_slow, 'macd_line': macd_line, 'signal_line': signal_line}
+
+
+class RSIIndicator(Indicator):
+    name = 'rsi'
+    columns = ('rsi',)
+
+    def __init__(self, rsi_period=14):
+        self.rsi_period = rsi_period
+
+    @property
+    def lookback(self):
+        return self.rsi_period
+
+    def compute(self, records, seed=None):
+        # Same arithmetic as RSIStrategy
+        delta = pd.Series(records['close']).diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
+        rs = gain / loss
+        return {'rsi': (100 - (100 / (1 + rs))).to_numpy()}
+
+
+class VWAPIndicator(Indicator):
+    name = 'vwap'
+    columns = ('vwap',)
+
+    def __init__(self, window=20):
+        self.window = window
+
+    @property
+    def lookback(self):
+        return self.window - 1
+
+    def compute(self, records, seed=None):
+        # Same arithmetic as VWAPStrategy
+        typical_price = (records['high'] + records['low'] + records['close']) / 3
+        vp = pd.Series(typical_price * records['volume']).rolling(window=self.window).sum()
+        volume = pd.Series(records['volume']).rolling(window=self.window).sum()
+        return {'vwap': (vp / volume).to_numpy()}
+
+
+INDICATORS = {
+    indicator.name: indicator for indicator in (EMAIndicator, MACDIndicator, RSIIndicator, VWAPIndicator)
+}
+
+
+def parse_indicators(spec):
+    """Parse 'macd:12:26:9,rsi:14' into Indicator instances (positional parameters)"""
+    indicators = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, *params = item.split(':')
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}'. Available: {', '.join(INDICATORS)}")
+        indicators.append(INDICATORS[name](*(int(param) for param in params)))
+    return indicators
+
+
+class IndicatorStore:
+    def __init__(self, store=None):
+        """
+        Materialized indicator tables stored next to the klines of a KlineStore.
+
+        Each table is a .npy record array with the kline open times and the indicator
+        columns, one row per stored kline. `update` extends a table over new klines only.
+
+        Args:
+            store: KlineStore the tables are computed from (default: get_kline_store())
+        """
+        self.store = store or get_kline_store()
+
+    def path(self, symbol, interval, indicator):
+        directory = os.path.join(os.path.dirname(self.store.path(symbol, interval)), 'indicators')
+        return os.path.join(directory, f"{interval}_{indicator.key()}.npy")
+
+    @staticmethod
+    def dtype(indicator):
+        return np.dtype([('open_time', np.int64)] + [(column, np.float64) for column in indicator.columns])
+
+    def load(self, symbol, interval, indicator):
+        """The stored table (read-only memory map), empty if none"""
+        path = self.path(symbol, interval, indicator)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=self.dtype(indicator))
+        return np.load(path, mmap_mode='r')
+
+    def save(self, symbol, interval, indicator, table):
+        path = self.path(symbol, interval, indicator)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+
+    def update(self, symbol, interval, indicator):
+        """
+        Bring a table up to date with the stored klines.
+
+        Only klines after the last table row are computed. The table is rebuilt when the
+        klines before it changed (history prepended, gaps filled).
+
+        Returns:
+            The up to date table
+        """
+        records = self.store.load(symbol, interval)
+        table = self.load(symbol, interval, indicator)
+        done = len(table)
+        if done > len(records) or not np.array_equal(table['open_time'], records['open_time'][:done]):
+            logger.info(f"Rebuilding {indicator.key()} table for {symbol} {interval}")
+            table, done = table[:0], 0
+        if done == len(records):
+            return table
+
+        first = max(0, done - indicator.lookback)
+        seed = table[-1] if done and indicator.recursive else None
+        values = indicator.compute(records[first:], seed)
+
+        new = np.empty(len(records) - done, dtype=self.dtype(indicator))
+        new['open_time'] = records['open_time'][done:]
+        for column in indicator.columns:
+            new[column] = values[column][done - first:]
+        table = np.concatenate([np.asarray(table), new])
+        self.save(symbol, interval, indicator, table)
+        logger.info(f"Extended {indicator.key()} table for {symbol} {interval} by {len(new)} bars ({len(table)} total)")
+        return table
+
+    def lookup(self, symbol, interval, indicator, open_times):
+        """
+        Stored columns for the given open times.
+
+        Table rows are warmed up over all the stored history before them, so they differ
+        from values computed over `open_times` alone until the warm-up fades out (see
+        `exact_columns`).
+
+        Returns:
+            Dict of column -> array aligned with `open_times`, or None if the table does
+            not cover all of them
+        """
+        table = self.load(symbol, interval, indicator)
+        open_times = np.asarray(open_times, dtype=np.int64)
+        if not len(table) or not len(open_times):
+            return None
+        rows = np.searchsorted(table['open_time'], open_times)
+        if rows[-1] >= len(table) or not np.array_equal(table['open_time'][rows], open_times):
+            return None
+        return {column: np.asarray(table[column][rows]) for column in indicator.columns}
+
+    def exact_columns(self, symbol, interval, indicator, records):
+        """
+        Stored columns equal to computing `indicator` over `records` alone.
+
+        A recursive indicator (EMA, MACD) carries the warm-up of every stored bar before
+        it, so its table only answers when it starts at the first record. A windowed
+        indicator (RSI, VWAP) depends on the `lookback` bars before each row only: its
+        rows from `lookback` on are read from the table wherever the records start, and
+        the first `lookback` rows are computed from the records.
+
+        Returns:
+            Dict of column -> array aligned with `records`, or None if the table does not
+            hold the records as consecutive rows
+        """
+        table = self.load(symbol, interval, indicator)
+        open_times = records['open_time']
+        if not len(table) or not len(open_times):
+            return None
+        first = int(np.searchsorted(table['open_time'], open_times[0]))
+        rows = table[first:first + len(open_times)]
+        if not np.array_equal(rows['open_time'], open_times):
+            return None
+        if first and indicator.recursive:
+            return None
+        columns = {column: np.array(rows[column]) for column in indicator.columns}
+        head = min(indicator.lookback, len(records))
+        if first and head:
+            values = indicator.compute(records[:head])
+            for column in indicator.columns:
+                columns[column][:head] = values[column]
+        return columns
+
+def main():
+    parser = argparse.ArgumentParser(description="Update indicator tables from stored klines")
+    parser.add_argument(
+        "--symbols",
+        type=str,
+        default=",".join(settings.SYMBOLS),
+        help="Comma separated symbols (default: BINANCE_SYMBOLS or SYMBOL)",
+    )
+    parser.add_argument("--interval", type=str, default=settings.INTERVAL, help="Kline interval")
+    parser.add_argument(
+        "--indicators",
+        type=str,
+        default=settings.INDICATOR_TABLES,
+        help="Comma separated name:param:... list, e.g. macd:12:26:9,rsi:14 (default: INDICATOR_TABLES)",
+    )
+    args = parser.parse_args()
+
+    indicator_store = IndicatorStore(get_kline_store())
+    for symbol in [symbol.strip().upper() for symbol in args.symbols.split(",") if symbol.strip()]:
+        for indicator in parse_indicators(args.indicators):
+            indicator_store.update(symbol, args.interval, indicator)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import io
+import os
+import numpy as np
+from binance.helpers import convert_ts_str
+from config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# One record per kline, in the column order returned by the Binance API
+KLINE_DTYPE = np.dtype([
+    ('open_time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('close_time', np.int64),
+    ('quote_asset_volume', np.float64),
+    ('number_of_trades', np.int64),
+    ('taker_buy_base_asset_volume', np.float64),
+    ('taker_buy_quote_asset_volume', np.float64),
+])
+
+
+def klines_to_array(klines):
+    """Convert raw API klines (lists of strings) into a KLINE_DTYPE record array"""
+    records = np.empty(len(klines), dtype=KLINE_DTYPE)
+    if len(klines):
+        columns = list(zip(*klines))
+        for i, name in enumerate(KLINE_DTYPE.names):
+            records[name] = np.asarray(columns[i], dtype=float).astype(KLINE_DTYPE[name])
+    return records
+
+
+def sort_unique(records):
+    """Sort records by open time and drop duplicate open times, keeping the last one"""
+    order = np.argsort(records['open_time'], kind='stable')
+    records = records[order]
+    last = np.append(records['open_time'][1:] != records['open_time'][:-1], True)
+    return records[last]
+
+
+def array_to_klines(records):
+    """Convert a record array back into API-style kline lists accepted by the strategies"""
+    return [list(record) + ['0'] for record in records.tolist()]
+
+
+class KlineStore:
+    def __init__(self, root=None):
+        """
+        On-disk kline history, one .npy file of KLINE_DTYPE records per (symbol, interval).
+
+        Files are sorted by open time without duplicates and can be memory-mapped. The
+        store also implements `get_historical_klines`, so it can stand in for a
+        BinanceClient in the Backtester.
+
+        Args:
+            root: Directory holding the files (default: <DATA_DIR>/klines)
+        """
+        self.root = root or os.path.join(settings.DATA_DIR, 'klines')
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), f"{interval}.npy")
+
+    def load(self, symbol, interval, mmap=True):
+        """Return the stored records (read-only memory map by default), empty if none"""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def save(self, symbol, interval, records):
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, records)
+        os.replace(tmp_path, path)
+
+    def append(self, symbol, interval, klines):
+        """
+        Merge new klines (raw API lists or records) into the stored series.
+
+        Rows are re-sorted by open time and duplicates keep the newest data. New bars
+        that all come after the stored ones (the usual sync) are appended in place; only
+        backfills and overlaps rewrite the file.
+
+        Returns:
+            The merged record array
+        """
+        new = klines if isinstance(klines, np.ndarray) else klines_to_array(klines)
+        if not len(new):
+            return self.load(symbol, interval)
+        new = sort_unique(new)
+        if self.append_tail(symbol, interval, new):
+            logger.info(f"Appended {len(new)} klines for {symbol} {interval}")
+            return self.load(symbol, interval)
+        merged = sort_unique(np.concatenate([self.load(symbol, interval, mmap=False), new]))
+        self.save(symbol, interval, merged)
+        logger.info(f"Stored {len(new)} klines for {symbol} {interval} ({len(merged)} total)")
+        return merged
+
+    def append_tail(self, symbol, interval, records):
+        """
+        Write sorted records that start after the last stored bar to the end of the file
+        and patch the length in the .npy header, without touching the stored rows.
+
+        The rows are written before the header, so a crash in between leaves the old
+        series readable.
+
+        Returns:
+            False, with nothing written, if there is no file or the records overlap it
+        """
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return False
+        with open(path, 'r+b') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype != KLINE_DTYPE or len(shape) != 1:
+                return False
+            data_offset = f.tell()
+            stored = shape[0]
+            if stored:
+                f.seek(data_offset + (stored - 1) * dtype.itemsize)
+                last = np.frombuffer(f.read(dtype.itemsize), dtype=KLINE_DTYPE)['open_time'][0]
+                if records['open_time'][0] <= last:
+                    return False
+
+            header = io.BytesIO()
+            header_dict = {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': fortran_order,
+                'shape': (stored + len(records),),
+            }
+            if version == (1, 0):
+                np.lib.format.write_array_header_1_0(header, header_dict)
+            else:
+                np.lib.format.write_array_header_2_0(header, header_dict)
+            if len(header.getvalue()) != data_offset:
+                return False  # The header would grow; let the caller rewrite the file
+
+            f.seek(data_offset + stored * dtype.itemsize)
+            f.write(records.astype(KLINE_DTYPE).tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(header.getvalue())
+        return True
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None):
+        """Same contract as BinanceClient.get_historical_klines, served from disk"""
+        records = self.load(symbol, interval)
+        open_times = records['open_time']
+        start = np.searchsorted(open_times, convert_ts_str(start_str), side='left')
+        end = len(records) if end_str is None else np.searchsorted(open_times, convert_ts_str(end_str), side='right')
+        return array_to_klines(records[start:end])
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from binance.helpers import convert_ts_str, interval_to_milliseconds
+from config import settings
+from src.data.kline_store import KlineStore, sort_unique
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def find_gaps(open_times, interval_ms):
+    """
+    Find missing bars in a sorted series of open times.
+
+    Returns:
+        Int64 array of shape (n_gaps, 2) with the first and last missing open time of each gap
+    """
+    open_times = np.asarray(open_times, dtype=np.int64)
+    steps = np.diff(open_times)
+    holes = np.flatnonzero(steps > interval_ms)
+    return np.column_stack([open_times[holes] + interval_ms, open_times[holes + 1] - interval_ms])
+
+
+def scan_series(open_times, interval_ms):
+    """
+    Report gaps, duplicates and out-of-order rows in a series of open times.
+
+    Returns:
+        Dict with 'rows', 'gaps' (see find_gaps), 'missing_bars', 'duplicates' and 'out_of_order'
+    """
+    open_times = np.asarray(open_times, dtype=np.int64)
+    steps = np.diff(open_times)
+    gaps = find_gaps(open_times, interval_ms)
+    return {
+        'rows': len(open_times),
+        'gaps': gaps,
+        'missing_bars': int(((gaps[:, 1] - gaps[:, 0]) // interval_ms + 1).sum()),
+        'duplicates': int((steps == 0).sum()),
+        'out_of_order': int((steps < 0).sum()),
+    }
+
+
+class KlineSync:
+    def __init__(self, client, store=None, manifest_path=None):
+        """
+        Keep stored kline series complete by fetching only what is missing.
+
+        A manifest records, per (symbol, interval), up to which open time the series has
+        been verified gap-free and which gaps the exchange has no data for. Later syncs
+        only scan the bars added since then and fetch the missing ranges plus the new tail.
+
+        Args:
+            client: BinanceClient used to fetch klines
+            store: KlineStore (default: KlineStore())
+            manifest_path: JSON manifest file (default: <store root>/manifest.json)
+        """
+        self.client = client
+        self.store = store or KlineStore()
+        self.manifest_path = manifest_path or os.path.join(self.store.root, 'manifest.json')
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def scan(self, symbol, interval, since=None):
+        """
+        Scan a stored series.
+
+        Args:
+            since: Only check bars from this open time on (None scans everything)
+        """
+        interval_ms = interval_to_milliseconds(interval)
+        open_times = self.store.load(symbol, interval)['open_time']
+        if since is not None:
+            open_times = open_times[np.searchsorted(open_times, since, side='left'):]
+        return scan_series(open_times, interval_ms)
+
+    def sync(self, symbol, interval, start_str):
+        """
+        Repair and extend the stored (symbol, interval) series from `start_str` up to now.
+
+        Returns:
+            Dict with the number of fetched bars, repaired gaps and gaps still open
+        """
+        interval_ms = interval_to_milliseconds(interval)
+        if interval_ms is None:
+            raise ValueError(f"Interval '{interval}' has no fixed length and cannot be synced")
+
+        key = f"{symbol.upper()}/{interval}"
+        entry = self.manifest.get(key, {'known_gaps': []})
+        known_gaps = {tuple(gap) for gap in entry['known_gaps']}
+        start_ms = convert_ts_str(start_str)
+
+        records = self.store.load(symbol, interval)
+        report = self.scan(symbol, interval, since=entry.get('verified_until'))
+        if report['duplicates'] or report['out_of_order']:
+            logger.warning(
+                f"{key}: {report['duplicates']} duplicate and {report['out_of_order']} "
+                f"out-of-order bars, rewriting sorted"
+            )
+            records = sort_unique(np.array(records))
+            self.store.save(symbol, interval, records)
+            report = self.scan(symbol, interval, since=entry.get('verified_until'))
+
+        ranges, head = [], None
+        if not len(records):
+            ranges.append((start_ms, None))
+        else:
+            first_open_time, last_open_time = int(records['open_time'][0]), int(records['open_time'][-1])
+            # Earlier history than stored, unless we already know the symbol did not trade then
+            if start_ms < first_open_time - interval_ms and start_ms < entry.get('head_checked_from', start_ms + 1):
+                head = (start_ms, first_open_time - interval_ms)
+                ranges.append(head)
+            ranges.extend(tuple(int(t) for t in gap) for gap in report['gaps'] if tuple(gap) not in known_gaps)
+            ranges.append((last_open_time + interval_ms, None))
+
+        fetched, repaired, failed = 0, 0, []
+        now_ms = int(time.time() * 1000)
+        for start, end in ranges:
+            try:
+                klines = self.client.get_historical_klines(symbol, interval, start, end, raise_errors=True)
+            except Exception:
+                failed.append((start, end))
+                continue
+            # Only store closed bars
+            klines = [kline for kline in klines if kline[6] < now_ms]
+            if (start, end) == head:
+                if not klines:
+                    entry['head_checked_from'] = start_ms
+            elif end is not None:
+                if klines:
+                    repaired += 1
+                else:
+                    # The exchange has nothing for this range (e.g. an outage); do not refetch it
+                    known_gaps.add((start, end))
+            self.store.append(symbol, interval, klines)
+            fetched += len(klines)
+
+        records = self.store.load(symbol, interval)
+        if len(records):
+            open_times = records['open_time']
+            # Only the part after the previously verified bar (plus any new head) can have changed
+            since = entry.get('verified_until') if head is None else None
+            checked = open_times if since is None else open_times[np.searchsorted(open_times, since):]
+            remaining = [
+                (int(a), int(b)) for a, b in find_gaps(checked, interval_ms)
+                if (int(a), int(b)) not in known_gaps
+            ]
+            verified_until = int(open_times[-1])
+            if remaining or failed:
+                # Re-check everything from the first unresolved range on next time
+                verified_until = min(start for start, _ in remaining + failed) - interval_ms
+            entry.update({
+                'first_open_time': int(open_times[0]),
+                'last_open_time': int(open_times[-1]),
+                'rows': len(records),
+                'verified_until': verified_until,
+            })
+        else:
+            remaining = []
+        entry['known_gaps'] = sorted(list(gap) for gap in known_gaps)
+        self.manifest[key] = entry
+        self.save_manifest()
+
+        logger.info(
+            f"Synced {key}: fetched {fetched} bars, repaired {repaired} gaps, "
+            f"{len(remaining)} gaps open, {len(failed)} failed requests"
+        )
+        return {'fetched': fetched, 'repaired': repaired, 'open_gaps': remaining, 'failed': failed}
+
+
+def main():
+    from src.api.binance_client import get_binance_client
+    from src.data.compact import get_kline_store
+    from src.data.indicators import IndicatorStore, parse_indicators
+
+    parser = argparse.ArgumentParser(description="Check and incrementally sync stored klines")
+    parser.add_argument(
+        "--symbols",
+        type=str,
+        default=",".join(settings.SYMBOLS),
+        help="Comma separated symbols (default: BINANCE_SYMBOLS or SYMBOL)",
+    )
+    parser.add_argument("--interval", type=str, default=settings.INTERVAL, help="Kline interval")
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        default="1 year ago UTC",
+        help="Earliest date to keep stored (default: 1 year ago UTC)",
+    )
+    parser.add_argument("--scan-only", action="store_true", help="Only report gaps and duplicates")
+    args = parser.parse_args()
+
+    symbols = [symbol.strip().upper() for symbol in args.symbols.split(",") if symbol.strip()]
+    if args.scan_only:
+        store = get_kline_store()
+        interval_ms = interval_to_milliseconds(args.interval)
+        for symbol in symbols:
+            report = scan_series(store.load(symbol, args.interval)['open_time'], interval_ms)
+            logger.info(
+                f"{symbol} {args.interval}: {report['rows']} bars, {len(report['gaps'])} gaps "
+                f"({report['missing_bars']} missing bars), {report['duplicates']} duplicates, "
+                f"{report['out_of_order']} out of order"
+            )
+        return
+
+    client = get_binance_client()
+    syncer = KlineSync(client, store=get_kline_store(client))
+    indicator_store = IndicatorStore(syncer.store)
+    for symbol in symbols:
+        syncer.sync(symbol, args.interval, args.start_date)
+        # Extend the configured indicator tables over the new bars
+        for indicator in parse_indicators(settings.INDICATOR_TABLES):
+            indicator_store.update(symbol, args.interval, indicator)
+
+
+if __name__ == "__main__":
+    main()
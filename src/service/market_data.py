@@ -0,0 +1,373 @@
+import argparse
+import re
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from binance import ThreadedWebsocketManager
+from binance.helpers import convert_ts_str, interval_to_milliseconds
+from config import settings
+from src.data.kline_store import KLINE_DTYPE, array_to_klines, klines_to_array
+from src.trading.live_engine import STREAMS_PER_SOCKET
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = int.from_bytes(b'CCTRING1', 'little')
+# Header words: magic, capacity, bars written, seqlock sequence (odd while a write is in progress)
+MAGIC_WORD, CAPACITY, COUNT, SEQUENCE = range(4)
+HEADER_SIZE = 64
+PREFIX = 'cctk'
+# Longest a reader waits for a write to finish; a writer killed mid-write leaves the sequence odd
+READ_TIMEOUT = 1.0
+
+
+def segment_name(symbol, interval, prefix=PREFIX):
+    """Shared memory name of the ring for (symbol, interval), e.g. 'cctk_btcusdt_15m'"""
+    return f"{prefix}_{re.sub(r'[^a-z0-9]', '', symbol.lower())}_{interval}"
+
+
+class KlineRing:
+    def __init__(self, name, capacity=None, create=False):
+        """
+        Ring buffer of KLINE_DTYPE records in a named shared memory segment.
+
+        Every record is written twice, at slot `i % capacity` and `i % capacity + capacity`,
+        so the most recent `n <= capacity` bars are always one contiguous slice and readers
+        get them as a NumPy view of the shared memory, without copying or parsing.
+
+        There is one writer (the market data server). Readers check a sequence number
+        that is odd while a write is in progress (a seqlock) and retry if it changed,
+        for at most READ_TIMEOUT seconds.
+
+        Args:
+            name: Shared memory name (see `segment_name`)
+            capacity: Number of bars kept; required when creating
+            create: Create the segment (writer) instead of attaching to it (reader)
+        """
+        self.name = name
+        self.owner = create
+        if create:
+            size = HEADER_SIZE + 2 * capacity * KLINE_DTYPE.itemsize
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = attach_segment(name)
+        self.header = np.ndarray(HEADER_SIZE // 8, dtype=np.uint64, buffer=self.shm.buf)
+        if create:
+            self.header[:] = 0
+            self.header[MAGIC_WORD] = MAGIC
+            self.header[CAPACITY] = capacity
+        elif int(self.header[MAGIC_WORD]) != MAGIC:
+            self.shm.close()
+            raise ValueError(f"{name} is not a kline ring")
+        self.capacity = int(self.header[CAPACITY])
+        self.slots = np.ndarray(2 * self.capacity, dtype=KLINE_DTYPE, buffer=self.shm.buf, offset=HEADER_SIZE)
+
+    @property
+    def count(self):
+        """Bars written since the ring was created"""
+        return int(self.header[COUNT])
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def last_open_time(self):
+        count = self.count
+        if not count:
+            return -1
+        return int(self.slots['open_time'][(count - 1) % self.capacity])
+
+    def append(self, records):
+        """
+        Publish closed bars; bars not newer than the last one are ignored.
+
+        Returns:
+            Number of bars written
+        """
+        records = records[records['open_time'] > self.last_open_time()]
+        written = len(records)
+        if not written:
+            return 0
+        # Only the last `capacity` bars of a large batch would survive anyway
+        records = records[-self.capacity:]
+        count = self.count + written
+        slots = (count - len(records) + np.arange(len(records))) % self.capacity
+        self.header[SEQUENCE] += 1
+        self.slots[slots] = records
+        self.slots[slots + self.capacity] = records
+        self.header[COUNT] = count
+        self.header[SEQUENCE] += 1
+        return written
+
+    def view(self, n=None, timeout=READ_TIMEOUT):
+        """
+        The last `n` bars (default: all kept) as a zero-copy view, oldest first.
+
+        The view aliases the ring: it stays valid until `capacity - n` more bars are
+        written. Use `read` for a copy that is guaranteed consistent.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = int(self.header[SEQUENCE])
+            records = self._last(n)
+            if sequence % 2 == 0 and int(self.header[SEQUENCE]) == sequence:
+                return records
+            self._check_deadline(deadline, timeout)
+
+    def read(self, n=None, timeout=READ_TIMEOUT):
+        """Copy of the last `n` bars, retried until no write overlapped it"""
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = int(self.header[SEQUENCE])
+            if sequence % 2 == 0:
+                records = self._last(n).copy()
+                if int(self.header[SEQUENCE]) == sequence:
+                    return records
+            self._check_deadline(deadline, timeout)
+
+    def _check_deadline(self, deadline, timeout):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{self.name} has been mid-write for {timeout}s, the market data server may have died")
+
+    def _last(self, n):
+        count = self.count
+        kept = min(count, self.capacity)
+        size = kept if n is None else min(n, kept)
+        start = (count - size) % self.capacity
+        return self.slots[start:start + size]
+
+    def wait(self, count, timeout=None, poll_interval=0.005):
+        """
+        Block until more than `count` bars have been written.
+
+        Returns:
+            The new bar count, or the old one on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.count <= count:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(poll_interval)
+        return self.count
+
+    def close(self):
+        # Views handed out keep the mapping alive; drop ours and let the GC unmap it
+        self.header = self.slots = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def attach_segment(name):
+    """Attach to an existing segment without letting this process's exit destroy it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment for unlinking at exit
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def unlink_segment(name):
+    """Remove a segment left behind by a crashed server"""
+    shm = attach_segment(name)
+    shm.close()
+    if sys.version_info < (3, 13):
+        # unlink() unregisters the segment here, and attach_segment already did
+        resource_tracker.register(shm._name, 'shared_memory')
+    shm.unlink()
+
+
+def history_bars(start_str, interval):
+    """Number of `interval` bars from `start_str` until now"""
+    span = int(time.time() * 1000) - convert_ts_str(start_str)
+    return max(1, -(-span // interval_to_milliseconds(interval)))
+
+
+def message_to_record(kline):
+    """Closed bar from a websocket kline payload as a one-row KLINE_DTYPE array"""
+    return np.array([(
+        kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'],
+        kline['T'], kline['q'], kline['n'], kline['V'], kline['Q'],
+    )], dtype=KLINE_DTYPE)
+
+
+class MarketDataServer:
+    def __init__(self, client, symbols, intervals, capacity=None, kline_store=None, prefix=PREFIX):
+        """
+        Local market data daemon for every bot and research process on the host.
+
+        Owns the Binance connection: it loads the history once (from the kline store
+        when available, topped up from the API), follows the kline streams, and
+        publishes closed bars into one shared memory KlineRing per (symbol, interval).
+        Consumers attach with MarketDataClient; another consumer costs no API weight
+        and no parsing.
+
+        Args:
+            client: BinanceClient used for history and gap backfills
+            symbols: List of symbols, e.g. ['BTCUSDT', 'ETHUSDT']
+            intervals: List of kline intervals, e.g. ['1m', '15m']
+            capacity: Bars kept per ring (default: the bars since the history start
+                passed to `open`, so each ring keeps that much history as it rolls)
+            kline_store: Optional KlineStore the history is read from first
+            prefix: Shared memory name prefix, to run several servers side by side
+        """
+        self.client = client
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.intervals = list(intervals)
+        self.capacity = capacity
+        self.kline_store = kline_store
+        self.prefix = prefix
+        self.rings = {}
+        self.twm = None
+
+    def open(self, start_str=None):
+        """
+        Create the rings (replacing segments left by a crashed server).
+
+        Args:
+            start_str: History start the rings are sized for when no capacity was given
+        """
+        if self.capacity is None and start_str is None:
+            raise ValueError("Either a ring capacity or the history start is needed to size the rings")
+        capacity = {interval: self.capacity or history_bars(start_str, interval) for interval in self.intervals}
+        for symbol in self.symbols:
+            for interval in self.intervals:
+                name = segment_name(symbol, interval, self.prefix)
+                try:
+                    self.rings[symbol, interval] = KlineRing(name, capacity[interval], create=True)
+                except FileExistsError:
+                    unlink_segment(name)
+                    self.rings[symbol, interval] = KlineRing(name, capacity[interval], create=True)
+
+    def load_history(self, start_str):
+        """Publish closed bars since `start_str`, downloading only what the store lacks"""
+        start = convert_ts_str(start_str)
+        for (symbol, interval), ring in self.rings.items():
+            records = np.empty(0, dtype=KLINE_DTYPE)
+            if self.kline_store is not None:
+                stored = self.kline_store.load(symbol, interval)
+                records = np.asarray(stored[np.searchsorted(stored['open_time'], start):])
+            fetch_from = start if not len(records) else int(records['open_time'][-1]) + interval_to_milliseconds(interval)
+            ring.append(records)
+            self.backfill(symbol, interval, fetch_from)
+            logger.info(f"Published {len(ring)} {interval} bars for {symbol}")
+
+    def backfill(self, symbol, interval, start):
+        """Download closed bars from `start` (ms) and publish them"""
+        # The most recent kline is still open
+        klines = self.client.get_historical_klines(symbol, interval, start)[:-1]
+        return self.rings[symbol, interval].append(klines_to_array(klines))
+
+    def handle_message(self, msg):
+        """Websocket callback for combined kline stream messages"""
+        data = msg.get('data', msg)
+        if data.get('e') == 'error':
+            logger.error(f"Websocket error: {data.get('m')}")
+            return
+        if data.get('e') != 'kline' or not data['k']['x']:
+            return
+        kline = data['k']
+        ring = self.rings.get((data['s'], kline['i']))
+        if ring is None:
+            return
+        last_open_time = ring.last_open_time()
+        if last_open_time >= 0 and kline['t'] > last_open_time + interval_to_milliseconds(kline['i']):
+            # Bars were missed while the stream was down
+            logger.warning(f"Gap in {data['s']} {kline['i']} stream, backfilling")
+            self.backfill(data['s'], kline['i'], last_open_time + 1)
+        ring.append(message_to_record(kline))
+
+    def streams(self):
+        return [f"{symbol.lower()}@kline_{interval}" for symbol in self.symbols for interval in self.intervals]
+
+    def start(self):
+        """Subscribe to the kline streams and block until stopped"""
+        self.twm = ThreadedWebsocketManager()
+        self.twm.start()
+        streams = self.streams()
+        for start in range(0, len(streams), STREAMS_PER_SOCKET):
+            self.twm.start_multiplex_socket(callback=self.handle_message, streams=streams[start:start + STREAMS_PER_SOCKET])
+        logger.info(f"Publishing {len(streams)} kline streams to shared memory")
+        self.twm.join()
+
+    def stop(self):
+        if self.twm is not None:
+            self.twm.stop()
+            self.twm = None
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
+
+
+class MarketDataClient:
+    def __init__(self, prefix=PREFIX):
+        """
+        Read side of MarketDataServer: bars come from the shared memory rings instead of
+        the API.
+
+        `get_historical_klines` follows the BinanceClient contract (closed bars only), so
+        the client can stand in for a BinanceClient in the Backtester or for warm-up.
+        """
+        self.prefix = prefix
+        self.rings = {}
+
+    def ring(self, symbol, interval):
+        key = (symbol.upper(), interval)
+        if key not in self.rings:
+            self.rings[key] = KlineRing(segment_name(symbol, interval, self.prefix))
+        return self.rings[key]
+
+    def klines(self, symbol, interval, n=None):
+        """Zero-copy view of the last `n` closed bars as KLINE_DTYPE records"""
+        return self.ring(symbol, interval).view(n)
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None):
+        records = self.ring(symbol, interval).read()
+        open_times = records['open_time']
+        start = np.searchsorted(open_times, convert_ts_str(start_str), side='left')
+        end = len(records) if end_str is None else np.searchsorted(open_times, convert_ts_str(end_str), side='right')
+        return array_to_klines(records[start:end])
+
+    def close(self):
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
+
+
+def main():
+    from src.api.binance_client import get_binance_client
+    from src.data.compact import get_kline_store
+
+    parser = argparse.ArgumentParser(description="Publish klines to shared memory for local bot processes")
+    parser.add_argument("--symbols", type=str, default=",".join(settings.SYMBOLS), help="Comma-separated symbols")
+    parser.add_argument("--intervals", type=str, default=settings.INTERVAL, help="Comma-separated kline intervals")
+    parser.add_argument("--start-date", type=str, default="30 days ago UTC", help="Start of the published history")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Bars kept per symbol and interval (default: the bars since --start-date)")
+    parser.add_argument("--prefix", type=str, default=PREFIX, help="Shared memory name prefix")
+    args = parser.parse_args()
+
+    client = get_binance_client()
+    server = MarketDataServer(
+        client,
+        [symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()],
+        [interval.strip() for interval in args.intervals.split(",") if interval.strip()],
+        capacity=args.capacity, kline_store=get_kline_store(client), prefix=args.prefix,
+    )
+    server.open(args.start_date)
+    try:
+        server.load_history(args.start_date)
+        server.start()
+    except KeyboardInterrupt:
+        logger.info("Stopping market data server")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
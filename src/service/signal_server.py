@@ -0,0 +1,159 @@
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from src.trading.vector_strategy import BAR_FIELDS
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SIGNAL_NAMES = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+NOT_FOUND = b'{"error": "unknown symbol"}'
+
+
+class SignalService:
+    def __init__(self, engine, host='127.0.0.1', port=8765, unix_socket=None):
+        """
+        Answer "what is the signal for SYMBOL right now?" from a running LiveSignalEngine.
+
+        The engine keeps the strategy state hot from the kline streams. After every bar
+        the answers for the updated symbols are encoded once, so a query is a dict lookup
+        and a socket write with no Binance traffic and no recomputation.
+
+        Endpoints:
+            HTTP GET /signal/<SYMBOL>, /signals (all symbols), /health
+            Unix socket: one symbol (or '*' for all) per line, one JSON line back
+
+        Args:
+            engine: LiveSignalEngine; the service installs itself as its `on_flush` callback
+            host, port: HTTP listen address; port None disables HTTP
+            unix_socket: Optional path of a Unix socket to listen on as well
+        """
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.answers = {}
+        self.all_answers = b'{}'
+        self.servers = []
+        self.threads = []
+        engine.on_flush = self.publish
+
+    def indicators(self, i):
+        """Current per-symbol indicator values of the strategy (float attributes with one row per symbol)"""
+        strategy = self.engine.strategy
+        values = {}
+        for name, value in vars(strategy).items():
+            if isinstance(value, np.ndarray) and value.shape == (strategy.n_symbols,) and value.dtype.kind == 'f':
+                number = float(value[i])
+                values[name] = number if np.isfinite(number) else None
+        return values
+
+    def encode(self, i):
+        engine = self.engine
+        last_open_time = int(engine.last_open_time[i])
+        answer = {
+            'symbol': engine.symbols[i],
+            'signal': SIGNAL_NAMES[int(np.sign(engine.strategy.signal[i]))],
+            'open_time': last_open_time if last_open_time >= 0 else None,
+            'bar': dict(zip(BAR_FIELDS, engine.staging[i].tolist())) if last_open_time >= 0 else None,
+            'position': float(engine.position[i]),
+            'indicators': self.indicators(i),
+        }
+        return json.dumps(answer).encode()
+
+    def publish(self, mask=None):
+        """Re-encode the answers of the symbols selected by `mask` (default: all)"""
+        rows = range(len(self.engine.symbols)) if mask is None else np.flatnonzero(mask)
+        answers = dict(self.answers)
+        for i in rows:
+            answers[self.engine.symbols[i]] = self.encode(i)
+        # Swap in whole objects so readers on other threads never see a partial update
+        self.all_answers = b'{' + b', '.join(
+            json.dumps(symbol).encode() + b': ' + answer for symbol, answer in answers.items()
+        ) + b'}'
+        self.answers = answers
+
+    def answer(self, query):
+        """Encoded answer for a symbol, '*' for all symbols, None if unknown"""
+        query = query.strip().upper()
+        if query == '*':
+            return self.all_answers
+        return self.answers.get(query)
+
+    def start(self):
+        """Publish the current state and start the HTTP and Unix socket listeners in the background"""
+        self.publish()
+        if self.port is not None:
+            server = ThreadingHTTPServer((self.host, self.port), SignalRequestHandler)
+            server.daemon_threads = True
+            server.service = self
+            self.port = server.server_address[1]
+            self.serve(server)
+            logger.info(f"Signal service listening on http://{self.host}:{self.port}")
+        if self.unix_socket is not None:
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            server = socketserver.ThreadingUnixStreamServer(self.unix_socket, SignalStreamHandler)
+            server.daemon_threads = True
+            server.service = self
+            self.serve(server)
+            logger.info(f"Signal service listening on {self.unix_socket}")
+
+    def serve(self, server):
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+        thread.start()
+        self.servers.append(server)
+        self.threads.append(thread)
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        if self.unix_socket is not None and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+        self.servers, self.threads = [], []
+
+
+class SignalRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so pollers reuse one connection
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment instead of waiting on delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path.startswith('/signal/'):
+            body = service.answer(self.path[len('/signal/'):])
+            self.respond(200 if body is not None else 404, body or NOT_FOUND)
+        elif self.path == '/signals':
+            self.respond(200, service.all_answers)
+        elif self.path == '/health':
+            self.respond(200, json.dumps({'bars': service.engine.bars_flushed}).encode())
+        else:
+            self.respond(404, b'{"error": "not found"}')
+
+    def respond(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the cost of a query
+        pass
+
+
+class SignalStreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            body = service.answer(line.decode(errors='replace'))
+            self.wfile.write((body or NOT_FOUND) + b'\n')
+            self.wfile.flush()
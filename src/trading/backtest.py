@@ -1,14 +1,24 @@
+import numpy as np
 import pandas as pd
 from src.utils.logger import get_logger
 from src.api.binance_client import BinanceClient
 from src.trading.strategy import TradingStrategy
+from src.trading.order_book import DepthRecording
+from src.trading.journal import TradeJournal
+from src.data.kline_store import KlineStore, klines_to_array
+from src.data.indicators import IndicatorStore
+from binance.helpers import interval_to_milliseconds
 from config import settings
 from datetime import datetime, timezone
 
 logger = get_logger(__name__)
 
 class Backtester:
-    def __init__(self, client: BinanceClient, strategy: TradingStrategy, symbol: str, interval: str, start_date: str, time_format: str):
+    def __init__(self, client: BinanceClient, strategy: TradingStrategy, symbol: str, interval: str, start_date: str, time_format: str, order_book: DepthRecording = None, journal: TradeJournal = None,
+                 stop_loss: float = None, take_profit: float = None, trailing_stop: float = None,
+                 maker_fee: float = 0.0, taker_fee: float = 0.0, slippage_bps: float = 0.0,
+                 intrabar_interval: str = None, kline_store: KlineStore = None,
+                 indicator_store: IndicatorStore = None, log_trades: bool = True):
         self.client = client
         self.strategy = strategy
         self.symbol = symbol
@@ -18,46 +28,281 @@ class Backtester:
         self.initial_capital = settings.INITIAL_CAPITAL
         self.capital = settings.INITIAL_CAPITAL
         self.position = 0
+        # Recorded depth data; when set, fills walk the book instead of using the close
+        self.order_book = order_book
+        # When set, trades go to the binary journal instead of one log line each
+        self.journal = journal
+        # Exits as fractions of the entry price (0.02 = 2%); the trailing stop follows the highest high
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        # Take-profits rest as limit orders (maker), everything else fills as a market order (taker)
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage_bps = slippage_bps
+        # Finer klines ('1m', '1s') loaded only for bars that touch both the stop and the target
+        self.intrabar_interval = intrabar_interval
+        self.kline_store = kline_store
+        # Stored fine klines, loaded on the first ambiguous bar, and the ones fetched
+        # during the run, stored together once it ends
+        self.intrabar_records = None
+        self.fetched_intrabar = []
+        # Precomputed indicator tables, used by strategies that define `indicator()`
+        self.indicator_store = indicator_store
+        # Parameter searches run thousands of backtests and turn per-trade logging off
+        self.log_trades = log_trades
+        self.entry_price = None
+        self.trades = []
 
     def format_timestamp(self, timestamp):
         if self.time_format == "human":
             return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S %Z")
         return timestamp
 
+    def fill_price(self, row, side, quantity):
+        price = row['close']
+        if self.order_book is None:
+            return self.slipped(price, side)
+        book = self.order_book.book_at(row.get('close_time', row['timestamp']))
+        average_price, filled, _ = book.sweep_cost(side, quantity)
+        if average_price is None or filled < quantity:
+            logger.warning(f"Recorded book too thin to fill {quantity} {self.symbol}, using close price")
+            return price
+        return average_price
+
+    def slipped(self, price, side):
+        """Market order price after `slippage_bps` of adverse slippage"""
+        slippage = price * self.slippage_bps / 10000
+        return price + slippage if side == 'BUY' else price - slippage
+
     def run(self):
         logger.info("Starting backtest...")
         klines = self.client.get_historical_klines(self.symbol, self.interval, self.start_date)
+        if klines and int(klines[-1][6]) >= int(datetime.now(timezone.utc).timestamp() * 1000):
+            # The most recent kline is still open
+            klines = klines[:-1]
         if not klines:
             logger.error("Could not fetch klines for backtesting.")
             return
 
-        signals = self.strategy.generate_signals(klines)
+        indicators = self.precomputed_indicators(klines)
+        if indicators is not None:
+            signals = self.strategy.generate_signals(klines, indicators=indicators)
+        else:
+            signals = self.strategy.generate_signals(klines)
         self.simulate_trades(signals)
         self.print_results(signals)
 
+    def precomputed_indicators(self, klines):
+        """
+        Stored indicator columns for the klines, None unless they are exactly what the
+        strategy would compute from these klines (see IndicatorStore.exact_columns)
+        """
+        if self.indicator_store is None or not hasattr(self.strategy, 'indicator'):
+            return None
+        indicator = self.strategy.indicator()
+        columns = self.indicator_store.exact_columns(self.symbol, self.interval, indicator, klines_to_array(klines))
+        if columns is not None:
+            logger.info(f"Using stored {indicator.key()} table")
+        return columns
+
+    @staticmethod
+    def price_column(signals, column):
+        if column not in signals:
+            return signals['close'].to_numpy(dtype=float)
+        return pd.to_numeric(signals[column]).to_numpy(dtype=float)
+
     def simulate_trades(self, signals):
-        logger.info("Simulating trades...")
-        for i, row in signals.iterrows():
-            if row['positions'] == 1.0: # Buy signal
-                if self.position == 0:
-                    self.position = self.capital / row['close']
-                    self.capital = 0
-                    formatted_time = self.format_timestamp(row['timestamp'])
-                    logger.info(f"Buying at {row['close']} on {formatted_time }")
-
-            elif row['positions'] == -1.0: # Sell signal
-                if self.position > 0:
-                    self.capital = self.position * row['close']
-                    self.position = 0
-                    formatted_time = self.format_timestamp(row['timestamp'])
-                    logger.info(f"Selling at {row['close']} on {formatted_time}")
+        """
+        Trade every BUY signal while flat and exit on the first of: stop-loss, trailing
+        stop, take-profit or a SELL signal.
+
+        BUY and SELL are the sign of `positions`: strategies whose signal flips straight
+        between -1 and 1 (MACD, VATS, VWAP) change position by +/-2.
+
+        The loop runs once per trade; the bar that ends a trade is found with array
+        searches over the high/low prices of the bars it spans.
+        """
+        if self.log_trades:
+            logger.info("Simulating trades...")
+        positions = np.sign(signals['positions'].to_numpy(dtype=float))
+        open_times = signals['timestamp'].to_numpy(dtype=np.int64)
+        opens = self.price_column(signals, 'open')
+        highs = self.price_column(signals, 'high')
+        lows = self.price_column(signals, 'low')
+        entries = np.flatnonzero(positions == 1.0)  # Buy signals
+        exits = np.flatnonzero(positions == -1.0)  # Sell signals
+
+        cursor = 0
+        while self.position == 0:
+            e = np.searchsorted(entries, cursor)
+            if e == len(entries):
+                break
+            i = entries[e]
+            row = signals.iloc[i]
+            price = self.fill_price(row, 'BUY', self.capital / row['close'])
+            self.buy(row, price)
+
+            x = np.searchsorted(exits, i, side='right')
+            signal_exit = exits[x] if x < len(exits) else len(signals) - 1
+            stop = self.find_exit(i, signal_exit, open_times, opens, highs, lows)
+            if stop is not None:
+                bar, reason, price = stop
+                self.sell(signals.iloc[bar], price, reason)
+            elif x < len(exits):
+                bar = signal_exit
+                row = signals.iloc[bar]
+                self.sell(row, self.fill_price(row, 'SELL', self.position), 'signal')
+            else:
+                break  # Still holding at the end of the data
+            # A stop or target fills inside the bar, so a BUY at the same close may re-enter
+            cursor = bar
+        self.store_intrabar_klines()
+
+    def find_exit(self, entry_bar, last_bar, open_times, opens, highs, lows):
+        """
+        First stop-loss, trailing stop or take-profit touched after `entry_bar`, up to and
+        including `last_bar`.
+
+        Returns:
+            (bar, reason, price) or None when no level is touched
+        """
+        if self.stop_loss is None and self.take_profit is None and self.trailing_stop is None:
+            return None
+        window = slice(entry_bar + 1, last_bar + 1)
+        high, low = highs[window], lows[window]
+        if not len(high):
+            return None
+
+        stop_level = np.full(len(high), -np.inf)
+        if self.stop_loss is not None:
+            stop_level[:] = self.entry_price * (1 - self.stop_loss)
+        if self.trailing_stop is not None:
+            # Highest price seen before each bar; the current bar's high may come after its low
+            peak = np.maximum.accumulate(np.concatenate([[self.entry_price], high[:-1]]))
+            trailing_level = peak * (1 - self.trailing_stop)
+            trailing = trailing_level > stop_level
+            stop_level = np.maximum(stop_level, trailing_level)
+        target_level = self.entry_price * (1 + self.take_profit) if self.take_profit is not None else np.inf
+
+        stop_hit = low <= stop_level
+        target_hit = high >= target_level
+        hit = stop_hit | target_hit
+        if not hit.any():
+            return None
+        k = int(np.argmax(hit))
+        bar = entry_bar + 1 + k
+
+        if stop_hit[k] and target_hit[k]:
+            # A bar opening beyond either level filled there at the open; only a bar
+            # opening between them needs finer data
+            if opens[bar] >= target_level:
+                first = 'take_profit'
+            elif opens[bar] <= stop_level[k]:
+                first = 'stop'
+            else:
+                first = self.resolve_bar(open_times[bar], stop_level[k], target_level)
+        else:
+            first = 'stop' if stop_hit[k] else 'take_profit'
+
+        if first == 'take_profit':
+            # Gapping above the target fills at the open
+            return bar, 'take_profit', max(opens[bar], target_level)
+        reason = 'trailing_stop' if self.trailing_stop is not None and trailing[k] else 'stop_loss'
+        # Gapping below the stop fills at the open
+        return bar, reason, self.slipped(min(opens[bar], stop_level[k]), 'SELL')
+
+    def resolve_bar(self, open_time, stop_level, target_level):
+        """
+        Which of the stop and target filled first in the bar opening at `open_time` that
+        touched both.
+
+        The bar is replayed with `intrabar_interval` klines when set. The stop is assumed
+        to come first without finer data, or when a fine bar touches both as well.
+        """
+        if self.intrabar_interval is None:
+            return 'stop'
+        fine = self.intrabar_klines(open_time)
+        if not len(fine):
+            logger.warning(f"No {self.intrabar_interval} klines for the bar at {open_time}, assuming the stop filled first")
+            return 'stop'
+        stop_hit = fine['low'] <= stop_level
+        target_hit = fine['high'] >= target_level
+        hit = stop_hit | target_hit
+        if not hit.any():
+            return 'stop'
+        k = int(np.argmax(hit))
+        return 'take_profit' if target_hit[k] and not stop_hit[k] else 'stop'
+
+    def intrabar_klines(self, open_time):
+        """`intrabar_interval` klines covering one bar, from the store if complete, else the API"""
+        bar_ms = interval_to_milliseconds(self.interval)
+        fine_ms = interval_to_milliseconds(self.intrabar_interval)
+        end_time = open_time + bar_ms
+
+        if self.kline_store is not None:
+            if self.intrabar_records is None:
+                self.intrabar_records = self.kline_store.load(self.symbol, self.intrabar_interval)
+            records = self.intrabar_records
+            lo, hi = np.searchsorted(records['open_time'], [open_time, end_time])
+            if hi - lo == bar_ms // fine_ms:
+                return records[lo:hi]
+
+        klines = self.client.get_historical_klines(self.symbol, self.intrabar_interval, open_time, end_time - 1)
+        if self.kline_store is not None:
+            self.fetched_intrabar.extend(klines)
+        return klines_to_array(klines)
+
+    def store_intrabar_klines(self):
+        """Merge the fine klines fetched during the run into the store in one write"""
+        if self.kline_store is None or not self.fetched_intrabar:
+            return
+        self.kline_store.append(self.symbol, self.intrabar_interval, self.fetched_intrabar)
+        self.fetched_intrabar = []
+        self.intrabar_records = None
+
+    def buy(self, row, price):
+        fee_rate = self.taker_fee
+        self.position = self.capital / (price * (1 + fee_rate))
+        fee = self.position * price * fee_rate
+        self.capital = 0
+        self.entry_price = price
+        self.record_trade(row, 'BUY', price, self.position, fee)
+
+    def sell(self, row, price, reason):
+        fee_rate = self.maker_fee if reason == 'take_profit' else self.taker_fee
+        fee = self.position * price * fee_rate
+        self.record_trade(row, 'SELL', price, self.position, fee, reason)
+        self.capital = self.position * price - fee
+        self.position = 0
+        self.entry_price = None
+
+    def record_trade(self, row, side, price, quantity, fee=0.0, reason='signal'):
+        self.trades.append({
+            'timestamp': row['timestamp'], 'side': side, 'price': price,
+            'quantity': quantity, 'fee': fee, 'reason': reason,
+        })
+        if self.journal is not None:
+            self.journal.record(row['timestamp'], self.symbol, side, price, quantity, fee=fee,
+                                strategy=type(self.strategy).__name__)
+            return
+        if not self.log_trades:
+            return
+        formatted_time = self.format_timestamp(row['timestamp'])
+        if reason != 'signal':
+            logger.info(f"Selling at {price} on {formatted_time} ({reason})")
+        else:
+            logger.info(f"{'Buying' if side == 'BUY' else 'Selling'} at {price} on {formatted_time}")
+
+    def final_capital(self, signals):
+        """Capital plus any open position valued at the last close"""
+        if self.position > 0:
+            return self.position * float(signals['close'].iloc[-1])
+        return self.capital
 
     def print_results(self, signals):
         logger.info("Backtest finished. Results:")
-        final_capital = self.capital
-        if self.position > 0:
-            last_close = signals['close'].iloc[-1]
-            final_capital = self.position * float(last_close)
+        final_capital = self.final_capital(signals)
 
         profit = final_capital - self.initial_capital
         profit_percentage = (profit / self.initial_capital) * 100
@@ -0,0 +1,305 @@
+import numpy as np
+import pandas as pd
+from src.data.kline_store import klines_to_array
+from src.trading.strategy import TradingStrategy
+from src.trading.vector_strategy import VectorStrategy, vectorize_strategy
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Member class name -> short name used for its signal column
+MEMBER_NAMES = {
+    'MovingAverageCrossoverStrategy': 'ma',
+    'RSIStrategy': 'rsi',
+    'BollingerBandsStrategy': 'bb',
+    'VATSStrategy': 'vats',
+    'MACDStrategy': 'macd',
+    'VWAPStrategy': 'vwap',
+    'YOLOStrategy': 'yolo',
+}
+
+
+class SharedIndicators:
+    """
+    Series derived from one parsed set of klines, each computed once.
+
+    Members of an ensemble ask for the rolling means, stds, sums, returns and EMAs they
+    need; a second member asking for the same series gets the cached one.
+    """
+
+    def __init__(self, records):
+        self.columns = {
+            name: pd.Series(records[name]) for name in ('open', 'high', 'low', 'close', 'volume')
+        }
+        self.cache = {}
+
+    def get(self, key, compute):
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def series(self, name):
+        """Kline column or a derived series stored with `derived`"""
+        if name in self.columns:
+            return self.columns[name]
+        return self.cache[name]
+
+    def derived(self, name, compute):
+        return self.get(name, compute)
+
+    def rolling_mean(self, name, window, min_periods=None):
+        # Computed once with min_periods=1; the window sums are the same for any min_periods
+        mean = self.get(('mean', name, window), lambda: self.series(name).rolling(window, min_periods=1).mean())
+        if min_periods == 1:
+            return mean
+        return self.get(('mean', name, window, min_periods), lambda: self._warmed_up(mean, name, window, min_periods))
+
+    def rolling_std(self, name, window):
+        return self.get(('std', name, window), lambda: self.series(name).rolling(window).std())
+
+    def rolling_sum(self, name, window):
+        return self.get(('sum', name, window), lambda: self.series(name).rolling(window).sum())
+
+    def ema(self, name, span):
+        return self.get(('ema', name, span), lambda: self.series(name).ewm(span=span, adjust=False).mean())
+
+    def delta(self):
+        return self.derived('delta', lambda: self.series('close').diff())
+
+    def returns(self):
+        return self.derived('returns', lambda: self.series('close').pct_change())
+
+    def _warmed_up(self, mean, name, window, min_periods):
+        valid = self.series(name).notna().astype(float).rolling(window, min_periods=1).sum()
+        return mean.where(valid >= (window if min_periods is None else min_periods))
+
+
+def ma_signals(strategy, shared):
+    short_mavg = shared.rolling_mean('close', strategy.short_window, min_periods=1)
+    long_mavg = shared.rolling_mean('close', strategy.long_window, min_periods=1)
+    signal = (short_mavg > long_mavg).to_numpy().astype(np.int8)
+    signal[:strategy.short_window] = 0
+    return signal
+
+
+def rsi_signals(strategy, shared):
+    delta = shared.delta()
+    shared.derived('gain', lambda: delta.where(delta > 0, 0))
+    shared.derived('loss', lambda: -delta.where(delta < 0, 0))
+    rs = shared.rolling_mean('gain', strategy.rsi_period) / shared.rolling_mean('loss', strategy.rsi_period)
+    rsi = (100 - (100 / (1 + rs))).to_numpy()
+    signal = np.zeros(len(rsi), dtype=np.int8)
+    signal[rsi > strategy.rsi_overbought] = -1
+    signal[rsi < strategy.rsi_oversold] = 1
+    return signal
+
+
+def bollinger_signals(strategy, shared):
+    middle = shared.rolling_mean('close', strategy.window)
+    std = shared.rolling_std('close', strategy.window)
+    close = shared.series('close')
+    signal = np.zeros(len(close), dtype=np.int8)
+    signal[(close < middle - strategy.num_std * std).to_numpy()] = 1
+    signal[(close > middle + strategy.num_std * std).to_numpy()] = -1
+    return signal
+
+
+def vats_signals(strategy, shared):
+    shared.returns()
+    rolling_mean = shared.rolling_mean('returns', strategy.lookback_period)
+    rolling_std = shared.rolling_std('returns', strategy.lookback_period)
+    score = np.where(rolling_std > 0, rolling_mean / rolling_std, 0)
+    signal = np.zeros(len(score))
+    signal[score > strategy.threshold] = 1
+    signal[score < -strategy.threshold] = -1
+    if strategy.max_volatility is not None:
+        signal[(rolling_std > strategy.max_volatility).to_numpy()] = 0
+    # HOLD keeps the last BUY/SELL
+    return pd.Series(signal).replace(0, np.nan).ffill().fillna(0).to_numpy().astype(np.int8)
+
+
+def macd_signals(strategy, shared):
+    macd_line = shared.derived(
+        ('macd', strategy.fast_period, strategy.slow_period),
+        lambda: shared.ema('close', strategy.fast_period) - shared.ema('close', strategy.slow_period),
+    )
+    signal_line = shared.ema(('macd', strategy.fast_period, strategy.slow_period), strategy.signal_period)
+    return np.sign(macd_line - signal_line).to_numpy().astype(np.int8)
+
+
+def vwap_signals(strategy, shared):
+    shared.derived('vp', lambda: (shared.series('high') + shared.series('low') + shared.series('close')) / 3
+                   * shared.series('volume'))
+    vwap = shared.rolling_sum('vp', strategy.window) / shared.rolling_sum('volume', strategy.window)
+    close = shared.series('close')
+    signal = np.zeros(len(close), dtype=np.int8)
+    signal[(close > vwap).to_numpy()] = 1
+    signal[(close < vwap).to_numpy()] = -1
+    return signal
+
+
+def yolo_signals(strategy, shared):
+    pct_change = shared.derived(
+        'pct_change', lambda: (shared.series('close') - shared.series('open')) / shared.series('open') * 100
+    ).to_numpy()
+    signal = np.zeros(len(pct_change), dtype=np.int8)
+    signal[pct_change <= -strategy.dip_threshold] = 1
+    signal[pct_change >= strategy.rip_threshold] = -1
+    return signal
+
+
+# Member class name -> function(strategy, SharedIndicators) returning its signal column
+SIGNAL_KERNELS = {
+    'MovingAverageCrossoverStrategy': ma_signals,
+    'RSIStrategy': rsi_signals,
+    'BollingerBandsStrategy': bollinger_signals,
+    'VATSStrategy': vats_signals,
+    'MACDStrategy': macd_signals,
+    'VWAPStrategy': vwap_signals,
+    'YOLOStrategy': yolo_signals,
+}
+
+
+def combine(signals, weights, threshold):
+    """
+    Weighted vote of member signals.
+
+    Args:
+        signals: Array of member signals, members along the last axis
+        weights: Weight per member
+        threshold: BUY when the weighted score is above it, SELL when below -threshold
+
+    Returns:
+        (score, signal) arrays; the score lies in [-1, 1]
+    """
+    score = signals @ weights / weights.sum()
+    signal = np.zeros(score.shape, dtype=np.int8)
+    signal[score > threshold] = 1
+    signal[score < -threshold] = -1
+    return score, signal
+
+
+def member_dict(members):
+    if isinstance(members, dict):
+        return dict(members)
+    named = {}
+    for member in members:
+        name = MEMBER_NAMES.get(type(member).__name__, type(member).__name__.lower())
+        while name in named:
+            name = f"{name}_{len(named)}"
+        named[name] = member
+    return named
+
+
+class EnsembleStrategy(TradingStrategy):
+    def __init__(self, members, weights=None, threshold=0.0):
+        """
+        Voting or weighted ensemble of the existing strategies, evaluated in one pass.
+
+        The klines are parsed once and every member reads its indicators from one
+        SharedIndicators cache, so members that need the same rolling mean, std or
+        return series share it. Each member's signal follows the rules of its own
+        `generate_signals`.
+
+        Args:
+            members: List of TradingStrategy instances, or dict of name -> instance
+            weights: Optional dict of name -> weight (default: one vote each)
+            threshold: BUY when the weighted score (in [-1, 1]) is above it, SELL below
+                -threshold; 0 is a plain majority vote
+        """
+        self.members = member_dict(members)
+        weights = weights or {}
+        self.weights = np.array([float(weights.get(name, 1.0)) for name in self.members])
+        self.threshold = threshold
+
+    def member_signals(self, klines):
+        """
+        Signal column of every member.
+
+        Returns:
+            (records, dict of member name -> int8 signal array)
+        """
+        records = klines_to_array(klines)
+        shared = SharedIndicators(records)
+        signals = {}
+        for name, member in self.members.items():
+            kernel = SIGNAL_KERNELS.get(type(member).__name__)
+            if kernel is not None:
+                signals[name] = kernel(member, shared)
+            else:
+                # No shared kernel, let the member parse the klines itself
+                signals[name] = member.generate_signals(klines)['signal'].to_numpy().astype(np.int8)
+        return records, signals
+
+    def generate_signals(self, klines):
+        logger.info(f"Generating trading signals for ensemble of {', '.join(self.members)}")
+        records, signals = self.member_signals(klines)
+        df = pd.DataFrame({
+            'timestamp': records['open_time'],
+            'open': records['open'],
+            'high': records['high'],
+            'low': records['low'],
+            'close': records['close'],
+            'volume': records['volume'],
+        })
+        for name, signal in signals.items():
+            df[f"{name}_signal"] = signal
+        df['score'], df['signal'] = combine(np.column_stack(list(signals.values())), self.weights, self.threshold)
+        df['positions'] = df['signal'].diff()
+        return df
+
+    def vectorize(self, n_symbols):
+        """Bar-by-bar equivalent for `n_symbols` symbols (see VectorEnsembleStrategy)"""
+        return VectorEnsembleStrategy(
+            n_symbols, {name: vectorize_strategy(member, n_symbols) for name, member in self.members.items()},
+            weights=dict(zip(self.members, self.weights)), threshold=self.threshold,
+        )
+
+
+class VectorEnsembleStrategy(VectorStrategy):
+    def __init__(self, n_symbols, members, weights=None, threshold=0.0):
+        """
+        Bar-by-bar EnsembleStrategy: every member VectorStrategy is updated from the same
+        bar matrix in one call and the member signals are combined like the batch version.
+
+        Args:
+            n_symbols: Number of symbols (rows)
+            members: Dict of name -> VectorStrategy allocated for n_symbols rows
+            weights: Optional dict of name -> weight (default: one vote each)
+            threshold: See EnsembleStrategy
+        """
+        super().__init__(n_symbols)
+        self.members = dict(members)
+        weights = weights or {}
+        self.weights = np.array([float(weights.get(name, 1.0)) for name in self.members])
+        self.threshold = threshold
+        self.score = np.zeros(n_symbols)
+
+    def _step(self, bars, mask):
+        for member in self.members.values():
+            member.update(bars, mask)
+        signals = np.column_stack([member.signal for member in self.members.values()]).astype(float)
+        score, signal = combine(signals, self.weights, self.threshold)
+        self.score = np.where(mask, score, self.score)
+        return signal
+
+    def get_params(self):
+        params = {name: member.get_params() for name, member in self.members.items()}
+        params['weights'] = self.weights.tolist()
+        params['threshold'] = self.threshold
+        return params
+
+    def get_state(self):
+        state = super().get_state()
+        # Weights are configuration (see get_params), not per-symbol state
+        del state['weights']
+        for name, member in self.members.items():
+            state.update({f"{name}/{key}": value for key, value in member.get_state().items()})
+        return state
+
+    def set_state(self, state, rows=None):
+        own = {key: value for key, value in state.items() if '/' not in key}
+        super().set_state(own, rows)
+        for name, member in self.members.items():
+            prefix = f"{name}/"
+            member.set_state({key[len(prefix):]: value for key, value in state.items() if key.startswith(prefix)}, rows)
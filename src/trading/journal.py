@@ -0,0 +1,121 @@
+import os
+import struct
+import numpy as np
+import pandas as pd
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fixed-width trade record; files are a small header followed by packed records
+TRADE_DTYPE = np.dtype([
+    ('timestamp', np.int64),   # ms since epoch
+    ('symbol', 'S16'),
+    ('side', np.int8),         # 1 = BUY, -1 = SELL
+    ('price', np.float64),
+    ('quantity', np.float64),
+    ('fee', np.float64),       # in the quote asset unless fee_asset is set
+    ('fee_asset', 'S8'),       # empty for the quote asset, e.g. b'BNB' otherwise
+    ('strategy', 'S32'),
+])
+
+MAGIC = b'CCTJ'
+VERSION = 2
+# magic, version, record size, padded to 16 bytes
+HEADER = struct.Struct('<4sHH8x')
+
+SIDES = {'BUY': 1, 'SELL': -1}
+
+
+def _check_header(f, path):
+    magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != TRADE_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a version {VERSION} trade journal")
+
+
+class TradeJournal:
+    def __init__(self, path, buffer_size=4096):
+        """
+        Append-only binary journal of trades.
+
+        Records are collected in a preallocated buffer and written in blocks. A torn
+        record left by a crash is truncated when the journal is reopened.
+
+        Args:
+            path: Journal file; created with a header if it does not exist
+            buffer_size: Number of records buffered before writing to disk
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with open(path, 'rb') as f:
+                _check_header(f, path)
+            torn = (os.path.getsize(path) - HEADER.size) % TRADE_DTYPE.itemsize
+            if torn:
+                logger.warning(f"Truncating {torn} bytes of a partial record from {path}")
+                os.truncate(path, os.path.getsize(path) - torn)
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION, TRADE_DTYPE.itemsize))
+
+        self.buffer = np.zeros(buffer_size, dtype=TRADE_DTYPE)
+        self.buffered = 0
+
+    def record(self, timestamp, symbol, side, price, quantity, fee=0.0, strategy='', fee_asset=''):
+        """Append one trade; `side` is 'BUY'/'SELL' or 1/-1"""
+        if self.buffered == len(self.buffer):
+            self.flush()
+        self.buffer[self.buffered] = (
+            timestamp, symbol, SIDES.get(side, side), price, quantity, fee, fee_asset, strategy
+        )
+        self.buffered += 1
+
+    def extend(self, trades):
+        """Append a TRADE_DTYPE array of trades in one go"""
+        self.flush()
+        self.file.write(np.ascontiguousarray(trades, dtype=TRADE_DTYPE).tobytes())
+
+    def flush(self):
+        if self.buffered:
+            self.file.write(self.buffer[:self.buffered].tobytes())
+            self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_journal(path):
+    """Memory-map a journal as a read-only TRADE_DTYPE array"""
+    with open(path, 'rb') as f:
+        _check_header(f, path)
+    count = (os.path.getsize(path) - HEADER.size) // TRADE_DTYPE.itemsize
+    if not count:
+        return np.empty(0, dtype=TRADE_DTYPE)
+    return np.memmap(path, dtype=TRADE_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def journal_to_dataframe(trades):
+    """Decode journal records into a DataFrame with readable symbols, sides and strategies"""
+    df = pd.DataFrame({name: np.asarray(trades[name]) for name in TRADE_DTYPE.names})
+    for column in ('symbol', 'fee_asset', 'strategy'):
+        df[column] = df[column].str.decode('ascii')
+    df['side'] = np.where(df['side'] > 0, 'BUY', 'SELL')
+    return df
+
+
+def export_journal(path, output_path):
+    """Export a journal to CSV"""
+    df = journal_to_dataframe(read_journal(path))
+    df.to_csv(output_path, index=False)
+    logger.info(f"Exported {len(df)} trades from {path} to {output_path}")
@@ -0,0 +1,451 @@
+import json
+import os
+import numpy as np
+from binance import ThreadedWebsocketManager
+from binance.helpers import interval_to_milliseconds, round_step_size
+from config import settings
+from src.utils.logger import get_logger
+from src.utils.latency import LatencyTracker
+from src.trading.vector_strategy import VectorStrategy, BAR_FIELDS, CLOSE
+
+logger = get_logger(__name__)
+
+# Binance accepts up to 1024 streams per combined connection; stay well below it
+STREAMS_PER_SOCKET = 200
+
+
+def order_fee(symbol, fills):
+    """
+    Commission of an order's fills for the trade journal.
+
+    Commissions in the base asset are converted to the quote asset at the fill price.
+    Commissions in a third asset (BNB) have no price here and are kept in that asset.
+
+    Returns:
+        (fee, fee_asset) with fee_asset '' for the quote asset
+    """
+    fee, other = 0.0, {}
+    for fill in fills:
+        commission = float(fill['commission'])
+        asset = fill.get('commissionAsset', '')
+        if not asset or symbol.endswith(asset):
+            fee += commission
+        elif symbol.startswith(asset):
+            fee += commission * float(fill['price'])
+        else:
+            other[asset] = other.get(asset, 0.0) + commission
+    if not other:
+        return fee, ''
+    if fee or len(other) > 1:
+        logger.warning(f"{symbol}: fees in several assets ({other}, {fee} quote), journaling {next(iter(other))} only")
+    fee_asset, fee = next(iter(other.items()))
+    return fee, fee_asset
+
+
+class LiveSignalEngine:
+    def __init__(self, strategy: VectorStrategy, symbols, interval, client=None, on_signal=None,
+                 snapshot_path=None, snapshot_every=1, broker=None, order_size=None,
+                 step_sizes=None, order_books=None, max_slippage_bps=10, latency=None, journal=None,
+                 indicator_store=None, on_flush=None):
+        """
+        Run one vectorized strategy across many symbols from a combined kline stream.
+
+        Closed bars are staged in a (n_symbols, 5) array. Once every symbol has reported
+        the bar (or the next bar starts), all of them are evaluated in one
+        `strategy.update` call.
+
+        Args:
+            strategy: VectorStrategy allocated for len(symbols) rows
+            symbols: List of symbols, e.g. ['BTCUSDT', 'ETHUSDT']
+            interval: Kline interval, e.g. '15m'
+            client: Optional BinanceClient used for warm-up
+            on_signal: Optional callback(symbol, position, close, open_time) for every
+                position change
+            snapshot_path: Optional .npz file the running state is saved to every
+                `snapshot_every` bars and on stop
+            snapshot_every: Number of flushed bars between snapshots
+            broker: Optional object with BinanceClient's `place_order` (BinanceClient,
+                PaperBroker) that BUY/SELL signals are routed to as market orders
+            order_size: Quote amount spent per BUY (default: settings.ORDER_SIZE)
+            step_sizes: Optional dict of symbol -> LOT_SIZE step size to round quantities to
+            order_books: Optional dict of symbol -> OrderBook used for pre-trade liquidity checks
+            max_slippage_bps: Largest acceptable sweep slippage for the liquidity check
+            latency: Optional LatencyTracker for the tick-to-order path (default: a new one)
+            journal: Optional TradeJournal every filled order is appended to
+            indicator_store: Optional IndicatorStore; strategies that can `seed` from their
+                stored indicator table start from its last row instead of warming up
+            on_flush: Optional callback(mask) run after every evaluation with the symbols
+                that were updated
+        """
+        if strategy.n_symbols != len(symbols):
+            raise ValueError(
+                f"Strategy was allocated for {strategy.n_symbols} symbols, got {len(symbols)}"
+            )
+        self.strategy = strategy
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.interval = interval
+        self.interval_ms = interval_to_milliseconds(interval)
+        self.client = client
+        self.on_signal = on_signal
+
+        self.staging = np.zeros((len(self.symbols), len(BAR_FIELDS)))
+        self.pending = np.zeros(len(self.symbols), dtype=bool)
+        self.pending_open_time = None
+        self.last_open_time = np.full(len(self.symbols), -1, dtype=np.int64)
+        # Base asset quantity held per symbol
+        self.position = np.zeros(len(self.symbols))
+        self.broker = broker
+        self.order_size = order_size if order_size is not None else settings.ORDER_SIZE
+        self.step_sizes = step_sizes or {}
+        self.order_books = order_books or {}
+        self.max_slippage_bps = max_slippage_bps
+        self.journal = journal
+        self.indicator_store = indicator_store
+        self.on_flush = on_flush
+        self.bars_flushed = 0
+
+        # Per-symbol timestamps of the staged bar, for latency tracking
+        self.latency = latency or LatencyTracker()
+        self.close_time = np.zeros(len(self.symbols), dtype=np.int64)
+        self.received_ns = np.zeros(len(self.symbols), dtype=np.int64)
+        self.evaluated_ns = 0
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.bars_since_snapshot = 0
+        self.twm = None
+
+    def streams(self):
+        return [f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols]
+
+    def handle_message(self, msg):
+        """Websocket callback for combined (multiplex) or single kline stream messages"""
+        received_ns = self.latency.now()
+        data = msg.get('data', msg)
+        if data.get('e') == 'error':
+            logger.error(f"Websocket error: {data.get('m')}")
+            return
+        if data.get('e') != 'kline':
+            return
+
+        kline = data['k']
+        if not kline['x']:  # Bar still open
+            if self.pending_open_time is not None and kline['t'] > self.pending_open_time:
+                # The next bar is running; symbols that have not closed the staged bar yet
+                # must not hold back the others for a whole interval
+                self.flush()
+            return
+        i = self.index.get(data['s'])
+        if i is None:
+            return
+        self.latency.record_since_close('close_to_receive', kline['T'])
+        self.stage_bar(i, kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'],
+                       close_time=kline['T'], received_ns=received_ns)
+
+    def stage_bar(self, i, open_time, open_, high, low, close, volume, close_time=None, received_ns=None):
+        if open_time <= self.last_open_time[i]:
+            return  # Duplicate or out-of-order bar
+        if self.pending_open_time is not None and open_time != self.pending_open_time:
+            # A new bar started before every symbol reported the previous one, or a late
+            # bar arrived after newer ones were staged: the staged batch goes first
+            self.flush()
+            if open_time <= self.last_open_time[i]:
+                return  # The symbol's newer bar was in that batch
+
+        self.staging[i] = (float(open_), float(high), float(low), float(close), float(volume))
+        self.pending[i] = True
+        self.pending_open_time = open_time
+        self.close_time[i] = close_time if close_time is not None else open_time + self.interval_ms - 1
+        self.received_ns[i] = received_ns if received_ns is not None else self.latency.now()
+        if self.pending.all():
+            self.flush()
+
+    def flush(self):
+        """Evaluate the strategy for every symbol with a staged bar"""
+        if not self.pending.any():
+            return None
+        open_time = self.pending_open_time
+        positions = self.strategy.update(self.staging, self.pending)
+        self.evaluated_ns = self.latency.now()
+        self.latency.record('receive_to_evaluate', self.evaluated_ns - self.received_ns[self.pending].max())
+        self.last_open_time[self.pending] = open_time
+
+        for i in np.flatnonzero(positions):
+            self.emit(i, positions[i], open_time)
+        if self.on_flush is not None:
+            self.on_flush(self.pending)
+
+        self.pending[:] = False
+        self.pending_open_time = None
+
+        self.bars_flushed += 1
+        self.bars_since_snapshot += 1
+        if self.snapshot_path and self.bars_since_snapshot >= self.snapshot_every:
+            self.save_snapshot()
+        self.latency.maybe_dump()
+        return positions
+
+    def emit(self, i, position, open_time):
+        symbol = self.symbols[i]
+        close = self.staging[i, CLOSE]
+        side = "BUY" if position > 0 else "SELL"
+        logger.info(f"{symbol}: {side} signal at {close} (bar {open_time})")
+        if self.on_signal is not None:
+            self.on_signal(symbol, int(position), close, open_time)
+        self.route_order(i, side, close)
+
+    def route_order(self, i, side, close):
+        """Turn a signal into a market order: BUY `order_size` worth when flat, SELL everything held"""
+        symbol = self.symbols[i]
+        if side == "BUY":
+            if self.position[i] > 0:
+                return None
+            quantity = self.order_size / close
+        else:
+            if self.position[i] <= 0:
+                return None
+            quantity = self.position[i]
+        if symbol in self.step_sizes:
+            quantity = round_step_size(quantity, self.step_sizes[symbol])
+        if quantity <= 0:
+            return None
+
+        book = self.order_books.get(symbol)
+        if book is not None and not book.check_liquidity(side, quantity, self.max_slippage_bps):
+            logger.warning(f"{symbol}: not enough liquidity for {side} {quantity}, order skipped")
+            return None
+
+        if self.broker is None:
+            # Signal-only mode: track the notional position
+            self.position[i] = quantity if side == "BUY" else 0.0
+            return None
+
+        submitted_ns = self.latency.now()
+        self.latency.record('evaluate_to_submit', submitted_ns - self.evaluated_ns)
+        order = self.broker.place_order(symbol, side, 'MARKET', quantity)
+        acked_ns = self.latency.now()
+        self.latency.record('submit_to_ack', acked_ns - submitted_ns)
+        self.latency.record('receive_to_ack', acked_ns - self.received_ns[i])
+        self.latency.record_since_close('close_to_ack', int(self.close_time[i]))
+        if order:
+            executed = float(order['executedQty'])
+            self.position[i] += executed if side == "BUY" else -executed
+            if self.journal is not None and executed > 0:
+                fee, fee_asset = order_fee(symbol, order.get('fills', []))
+                self.journal.record(
+                    order.get('transactTime', int(self.close_time[i])),
+                    symbol,
+                    side,
+                    float(order['cummulativeQuoteQty']) / executed,
+                    executed,
+                    fee=fee,
+                    strategy=type(self.strategy).__name__,
+                    fee_asset=fee_asset,
+                )
+                # A crash must not lose a trade that already happened
+                self.journal.flush()
+        return order
+
+    def last_close(self, symbol):
+        """Close of the most recent bar seen for `symbol`, None before the first bar"""
+        i = self.index[symbol]
+        if self.last_open_time[i] < 0 and not self.pending[i]:
+            return None
+        return self.staging[i, CLOSE]
+
+    def last_close_time(self, symbol):
+        """Close time (ms) of the most recent bar seen for `symbol`"""
+        return int(self.close_time[self.index[symbol]])
+
+    def save_snapshot(self, path=None):
+        """
+        Write strategy state, last bar times and positions to a compressed .npz file.
+
+        The file is written next to the target and renamed, so a crash never leaves a
+        partial snapshot behind.
+        """
+        path = path or self.snapshot_path
+        meta = {
+            'strategy': type(self.strategy).__name__,
+            'params': self.strategy.get_params(),
+            'interval': self.interval,
+        }
+        arrays = {f"strategy/{name}": value for name, value in self.strategy.get_state().items()}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                meta=np.array(json.dumps(meta)),
+                symbols=np.array(self.symbols),
+                last_open_time=self.last_open_time,
+                position=self.position,
+                **arrays,
+            )
+        os.replace(tmp_path, path)
+        self.bars_since_snapshot = 0
+        logger.info(f"Saved live snapshot for {len(self.symbols)} symbols to {path}")
+
+    def load_snapshot(self, path=None):
+        """
+        Restore state saved by `save_snapshot`.
+
+        Symbols are matched by name, so the symbol list may change between runs; symbols
+        missing from the snapshot start fresh.
+
+        Returns:
+            True if the snapshot was loaded, False if it is missing or incompatible
+        """
+        path = path or self.snapshot_path
+        if not path or not os.path.exists(path):
+            logger.info("No live snapshot found, starting from scratch")
+            return False
+
+        with np.load(path) as snapshot:
+            meta = json.loads(str(snapshot['meta']))
+            expected = {
+                'strategy': type(self.strategy).__name__,
+                'params': self.strategy.get_params(),
+                'interval': self.interval,
+            }
+            if meta != json.loads(json.dumps(expected)):
+                logger.warning(f"Snapshot {path} was taken with {meta}, expected {expected}. Ignoring it.")
+                return False
+
+            saved_index = {symbol: i for i, symbol in enumerate(snapshot['symbols'].tolist())}
+            target_rows = np.array([i for i, s in enumerate(self.symbols) if s in saved_index], dtype=np.int64)
+            source_rows = np.array([saved_index[s] for s in self.symbols if s in saved_index], dtype=np.int64)
+            state = {
+                key[len('strategy/'):]: snapshot[key]
+                for key in snapshot.files if key.startswith('strategy/')
+            }
+            self.strategy.set_state(state, rows=(target_rows, source_rows))
+            self.last_open_time[target_rows] = snapshot['last_open_time'][source_rows]
+            self.position[target_rows] = snapshot['position'][source_rows]
+
+        logger.info(f"Restored {len(target_rows)}/{len(self.symbols)} symbols from {path}")
+        return True
+
+    def resume(self, start_str):
+        """
+        Load the snapshot (if any) and fetch only the bars missed since it was taken.
+
+        Symbols without saved state are warmed up from `start_str` instead.
+        """
+        if self.client is None:
+            raise ValueError("A client is required to resume the engine")
+        self.load_snapshot()
+        self.seed_from_indicators()
+
+        history = {}
+        for i, symbol in enumerate(self.symbols):
+            if self.last_open_time[i] >= 0:
+                since = int(self.last_open_time[i]) + self.interval_ms
+            else:
+                since = start_str
+            klines = self.client.get_historical_klines(symbol, self.interval, since)
+            # The most recent kline is still open
+            history[symbol] = klines[:-1]
+
+        self.feed_history(history)
+
+    def seed_from_indicators(self):
+        """
+        Start symbols without saved state from the last row of their stored indicator table.
+
+        Returns:
+            Number of symbols seeded
+        """
+        if self.indicator_store is None or not hasattr(self.strategy, 'seed'):
+            return 0
+        indicator = self.strategy.indicator()
+        seeded = 0
+        for i, symbol in enumerate(self.symbols):
+            if self.last_open_time[i] >= 0:
+                continue
+            table = self.indicator_store.load(symbol, self.interval, indicator)
+            if not len(table):
+                continue
+            self.strategy.seed(i, table[-1], len(table))
+            self.last_open_time[i] = table['open_time'][-1]
+            seeded += 1
+        if seeded:
+            logger.info(f"Seeded {seeded}/{len(self.symbols)} symbols from stored {indicator.key()} tables")
+        return seeded
+
+    def warm_up(self, start_str):
+        """
+        Feed historical bars through the strategy so indicators are primed before going live.
+
+        Symbols are aligned on open time and stepped bar by bar, each step updating every
+        symbol that has data for that bar.
+        """
+        if self.client is None:
+            raise ValueError("A client is required to warm up the engine")
+
+        history = {}
+        for symbol in self.symbols:
+            klines = self.client.get_historical_klines(symbol, self.interval, start_str)
+            # The most recent kline is still open
+            history[symbol] = klines[:-1]
+
+        self.feed_history(history)
+
+    def feed_history(self, history):
+        """
+        Step the strategy through historical klines.
+
+        Args:
+            history: Dict of symbol -> list of raw klines as returned by the Binance API
+        """
+        open_times = sorted({kline[0] for klines in history.values() for kline in klines})
+        if not open_times:
+            logger.warning("No history to warm up from")
+            return
+        row_of = {open_time: row for row, open_time in enumerate(open_times)}
+
+        bars = np.zeros((len(open_times), len(self.symbols), len(BAR_FIELDS)))
+        present = np.zeros((len(open_times), len(self.symbols)), dtype=bool)
+        for symbol, klines in history.items():
+            i = self.index[symbol.upper()]
+            for kline in klines:
+                row = row_of[kline[0]]
+                bars[row, i] = [float(value) for value in kline[1:6]]
+                present[row, i] = True
+
+        for row, open_time in enumerate(open_times):
+            mask = present[row] & (open_time > self.last_open_time)
+            self.strategy.update(bars[row], mask)
+            self.last_open_time[mask] = open_time
+            # Keep the latest bar around for last_close
+            self.staging[mask] = bars[row, mask]
+
+        logger.info(f"Warmed up {len(self.symbols)} symbols over {len(open_times)} bars")
+
+    def start(self):
+        """Subscribe to the combined kline streams and block until stopped"""
+        # Kline streams are public, no credentials needed
+        self.twm = ThreadedWebsocketManager()
+        self.twm.start()
+
+        streams = self.streams()
+        for start in range(0, len(streams), STREAMS_PER_SOCKET):
+            self.twm.start_multiplex_socket(
+                callback=self.handle_message,
+                streams=streams[start:start + STREAMS_PER_SOCKET],
+            )
+        logger.info(f"Listening to {len(streams)} kline streams")
+        self.twm.join()
+
+    def stop(self):
+        self.flush()
+        self.latency.dump()
+        if self.journal is not None:
+            self.journal.flush()
+        if self.snapshot_path:
+            self.save_snapshot()
+        if self.twm is not None:
+            self.twm.stop()
+            self.twm = None
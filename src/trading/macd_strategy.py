@@ -1,6 +1,7 @@
 import pandas as pd
 from src.utils.logger import get_logger
 from src.trading.strategy import TradingStrategy
+from src.data.indicators import MACDIndicator
 
 logger = get_logger(__name__)
 
@@ -24,12 +25,17 @@ class MACDStrategy(TradingStrategy):
         """Calculate Exponential Moving Average"""
         return data.ewm(span=period, adjust=False).mean()
 
-    def generate_signals(self, klines):
+    def indicator(self):
+        return MACDIndicator(self.fast_period, self.slow_period, self.signal_period)
+
+    def generate_signals(self, klines, indicators=None):
         """
         Generate trading signals based on MACD crossover
         
         Args:
             klines: Raw kline data from Binance API
+            indicators: Optional precomputed columns aligned with `klines` (see
+                IndicatorStore.lookup); skips computing the EMAs
             
         Returns:
             DataFrame with MACD indicators and trading signals
@@ -46,15 +52,19 @@ class MACDStrategy(TradingStrategy):
         # Convert close price to numeric
         df['close'] = pd.to_numeric(df['close'])
         
-        # Calculate MACD components
-        df['ema_fast'] = self.calculate_ema(df['close'], self.fast_period)
-        df['ema_slow'] = self.calculate_ema(df['close'], self.slow_period)
-        
-        # MACD Line = Fast EMA - Slow EMA
-        df['macd_line'] = df['ema_fast'] - df['ema_slow']
-        
-        # Signal Line = 9-period EMA of MACD Line
-        df['signal_line'] = self.calculate_ema(df['macd_line'], self.signal_period)
+        if indicators is not None:
+            for column in ('ema_fast', 'ema_slow', 'macd_line', 'signal_line'):
+                df[column] = indicators[column]
+        else:
+            # Calculate MACD components
+            df['ema_fast'] = self.calculate_ema(df['close'], self.fast_period)
+            df['ema_slow'] = self.calculate_ema(df['close'], self.slow_period)
+
+            # MACD Line = Fast EMA - Slow EMA
+            df['macd_line'] = df['ema_fast'] - df['ema_slow']
+
+            # Signal Line = 9-period EMA of MACD Line
+            df['signal_line'] = self.calculate_ema(df['macd_line'], self.signal_period)
         
         # MACD Histogram (optional, for visualization)
         df['macd_histogram'] = df['macd_line'] - df['signal_line']
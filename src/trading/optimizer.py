@@ -0,0 +1,262 @@
+import argparse
+import itertools
+import logging
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from config import settings
+from src.trading.backtest import Backtester
+from src.trading.macd_strategy import MACDStrategy
+from src.trading.strategy import (
+    MovingAverageCrossoverStrategy, RSIStrategy, VATSStrategy, BollingerBandsStrategy, YOLOStrategy,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Strategy key -> (class, parameter grid)
+SEARCH_SPACES = {
+    "ma": (MovingAverageCrossoverStrategy, {
+        "short_window": [5, 10, 20, 30, 50],
+        "long_window": [20, 50, 100, 150, 200],
+    }),
+    "rsi": (RSIStrategy, {
+        "rsi_period": [7, 10, 14, 21, 28],
+        "rsi_overbought": [65, 70, 75, 80],
+        "rsi_oversold": [20, 25, 30, 35],
+    }),
+    "bb": (BollingerBandsStrategy, {
+        "window": [10, 14, 20, 30, 50],
+        "num_std": [1.5, 2, 2.5, 3],
+    }),
+    "vats": (VATSStrategy, {
+        "lookback_period": [10, 14, 20, 30, 40, 60],
+        "threshold": [0.1, 0.25, 0.5, 0.75, 1.0],
+        "max_volatility": [None, 0.005, 0.01, 0.02],
+    }),
+    "macd": (MACDStrategy, {
+        "fast_period": [6, 8, 10, 12, 16],
+        "slow_period": [20, 26, 30, 40],
+        "signal_period": [5, 7, 9, 12],
+    }),
+    "yolo": (YOLOStrategy, {
+        "dip_threshold": [1, 2, 3, 4, 5],
+        "rip_threshold": [1, 2, 3, 4, 5],
+    }),
+}
+
+# Strategy key -> predicate rejecting meaningless combinations
+CONSTRAINTS = {
+    "ma": lambda params: params["short_window"] < params["long_window"],
+    "macd": lambda params: params["fast_period"] < params["slow_period"],
+    "rsi": lambda params: params["rsi_oversold"] < params["rsi_overbought"],
+}
+
+# Klines of the search, set once per worker process by `init_worker`
+_klines = None
+
+
+def init_worker(klines):
+    global _klines
+    _klines = klines
+    # Strategies log every signal pass; a search runs thousands of them
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("src.trading.") and name != __name__:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def evaluate(task):
+    """
+    Backtest one candidate on the most recent `bars` klines.
+
+    Returns:
+        Profit in percent of the initial capital
+    """
+    strategy_class, params, bars, backtest_kwargs = task
+    klines = _klines[-bars:]
+    backtester = Backtester(None, strategy_class(**params), None, None, None, "unix",
+                            log_trades=False, **backtest_kwargs)
+    signals = backtester.strategy.generate_signals(klines)
+    backtester.simulate_trades(signals)
+    final_capital = backtester.final_capital(signals)
+    return (final_capital - backtester.initial_capital) / backtester.initial_capital * 100
+
+
+def parameter_grid(space, constraint=None):
+    """Every combination of the values in `space` accepted by `constraint`"""
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    if constraint is not None:
+        grid = [params for params in grid if constraint(params)]
+    return grid
+
+
+class SuccessiveHalving:
+    def __init__(self, strategy_class, space, klines, n_candidates=81, eta=3, min_bars=None, workers=1,
+                 constraint=None, seed=0, **backtest_kwargs):
+        """
+        Parameter search that backtests many candidates on short recent slices and only
+        the survivors on the full history.
+
+        Rung 0 runs `n_candidates` candidates sampled from the grid on the last `min_bars`
+        klines. Each following rung keeps the best 1/`eta` of the candidates and runs them
+        on `eta` times as many bars, up to the full history in the last rung. With the
+        defaults a search costs a few full-history backtests per rung instead of one per
+        grid point.
+
+        Args:
+            strategy_class: TradingStrategy subclass to instantiate with each candidate
+            space: Dict of parameter name -> list of values
+            klines: Raw klines; later slices are suffixes, so every rung scores the most recent market
+            n_candidates: Candidates sampled for the first rung (the whole grid if smaller)
+            eta: Reduction factor between rungs
+            min_bars: Bars of the first rung (default: enough rungs to end at the full history)
+            workers: Worker processes; 1 evaluates in this process
+            constraint: Optional predicate rejecting parameter combinations
+            seed: Seed of the candidate sampling
+            backtest_kwargs: Passed to every Backtester (stop_loss, taker_fee, ...)
+        """
+        self.strategy_class = strategy_class
+        self.space = space
+        self.klines = klines
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.workers = workers
+        self.constraint = constraint
+        self.seed = seed
+        self.backtest_kwargs = backtest_kwargs
+        if min_bars is None:
+            n_rungs = max(1, math.ceil(math.log(max(n_candidates, 1), eta)))
+            min_bars = len(klines) // eta ** (n_rungs - 1)
+        self.min_bars = max(1, min(min_bars, len(klines)))
+
+    def rung_bars(self):
+        """Bars of every rung, growing by `eta` and ending with the full history"""
+        bars = []
+        length = self.min_bars
+        while length < len(self.klines):
+            bars.append(length)
+            length *= self.eta
+        bars.append(len(self.klines))
+        return bars
+
+    def candidates(self):
+        grid = parameter_grid(self.space, self.constraint)
+        if len(grid) <= self.n_candidates:
+            return grid
+        return random.Random(self.seed).sample(grid, self.n_candidates)
+
+    def run(self):
+        """
+        Run every rung.
+
+        Returns:
+            Dict with best_params, best_score (profit %), rungs (one DataFrame of
+            candidates and scores per rung, best first), bars_evaluated and grid_bars
+            (the cost of backtesting the whole grid on the full history)
+        """
+        candidates = self.candidates()
+        grid_size = len(parameter_grid(self.space, self.constraint))
+        rungs = []
+        bars_evaluated = 0
+
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=(self.klines,))
+        else:
+            pool = None
+            levels = {name: logging.getLogger(name).level for name in list(logging.root.manager.loggerDict)}
+            init_worker(self.klines)
+
+        def evaluate_all(tasks):
+            if pool is None:
+                return [evaluate(task) for task in tasks]
+            return list(pool.map(evaluate, tasks, chunksize=max(1, len(tasks) // (4 * self.workers))))
+
+        try:
+            bars_per_rung = self.rung_bars()
+            for rung, bars in enumerate(bars_per_rung):
+                started = time.perf_counter()
+                tasks = [(self.strategy_class, params, bars, self.backtest_kwargs) for params in candidates]
+                scores = evaluate_all(tasks)
+                bars_evaluated += bars * len(candidates)
+
+                table = pd.DataFrame(candidates)
+                table["score"] = scores
+                table = table.sort_values("score", ascending=False, kind="stable").reset_index(drop=True)
+                rungs.append(table)
+                logger.info(
+                    f"Rung {rung}: {len(candidates)} candidates on {bars} bars in "
+                    f"{time.perf_counter() - started:.2f}s, best {table['score'].iloc[0]:.2f}%"
+                )
+
+                order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+                best_params, best_score = candidates[order[0]], scores[order[0]]
+                keep = max(1, math.ceil(len(candidates) / self.eta))
+                candidates = [candidates[i] for i in order[:keep]]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            else:
+                global _klines
+                _klines = None
+                for name, level in levels.items():
+                    logging.getLogger(name).setLevel(level)
+
+        return {
+            "best_params": best_params,
+            "best_score": float(best_score),
+            "rungs": rungs,
+            "bars_evaluated": bars_evaluated,
+            "grid_bars": grid_size * len(self.klines),
+        }
+
+
+def main():
+    from src.api.binance_client import get_binance_client
+    from src.data.compact import get_kline_store
+
+    parser = argparse.ArgumentParser(description="Search strategy parameters with successive halving")
+    parser.add_argument("--strategy", type=str, default="vats", choices=list(SEARCH_SPACES), help="Strategy to tune")
+    parser.add_argument("--symbol", type=str, default=settings.SYMBOL, help="Trading symbol")
+    parser.add_argument("--interval", type=str, default=settings.INTERVAL, help="Kline interval")
+    parser.add_argument("--start-date", type=str, default="1 year ago UTC", help="Start of the history")
+    parser.add_argument("--candidates", type=int, default=81, help="Candidates in the first rung (default: 81)")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the candidates per rung (default: 3)")
+    parser.add_argument("--min-bars", type=int, default=None, help="Bars of the first rung")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the candidate sampling")
+    parser.add_argument("--stop-loss", type=float, default=None, help="Stop-loss as a fraction of the entry price")
+    parser.add_argument("--take-profit", type=float, default=None, help="Take-profit as a fraction of the entry price")
+    parser.add_argument("--taker-fee", type=float, default=0.0, help="Taker fee rate")
+    parser.add_argument("--maker-fee", type=float, default=0.0, help="Maker fee rate")
+    args = parser.parse_args()
+
+    client = get_binance_client()
+    klines = get_kline_store(client).get_historical_klines(args.symbol, args.interval, args.start_date)
+    if not klines:
+        # The most recent downloaded kline is still open
+        klines = client.get_historical_klines(args.symbol, args.interval, args.start_date)[:-1]
+    if not klines:
+        logger.error(f"No klines for {args.symbol} {args.interval}")
+        return
+
+    strategy_class, space = SEARCH_SPACES[args.strategy]
+    search = SuccessiveHalving(
+        strategy_class, space, klines, n_candidates=args.candidates, eta=args.eta, min_bars=args.min_bars,
+        workers=args.workers, constraint=CONSTRAINTS.get(args.strategy), seed=args.seed,
+        stop_loss=args.stop_loss, take_profit=args.take_profit, taker_fee=args.taker_fee, maker_fee=args.maker_fee,
+    )
+    started = time.perf_counter()
+    result = search.run()
+    logger.info(f"Top candidates on the full history:\n{result['rungs'][-1].head(10).to_string()}")
+    logger.info(
+        f"Best parameters {result['best_params']}: {result['best_score']:.2f}% in "
+        f"{time.perf_counter() - started:.2f}s, {result['bars_evaluated'] / result['grid_bars']:.1%} "
+        f"of the bars of a full grid search"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import json
+import time
+from collections import deque
+import numpy as np
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Events kept while waiting for a snapshot; older ones are dropped (a gap just triggers another snapshot)
+MAX_BUFFERED_EVENTS = 10_000
+# Upper bound of the doubling delay between failed snapshot fetches, in seconds
+MAX_RETRY_DELAY = 60.0
+
+
+class BookSide:
+    """
+    One side of the book as two parallel arrays sorted by ascending price.
+
+    The best bid is the last element of the bid side, the best ask the first element
+    of the ask side.
+    """
+
+    def __init__(self):
+        self.prices = np.empty(0)
+        self.quantities = np.empty(0)
+
+    def load(self, levels):
+        levels = np.asarray(levels, dtype=float).reshape(-1, 2)
+        order = np.argsort(levels[:, 0])
+        self.prices = levels[order, 0]
+        self.quantities = levels[order, 1]
+        self.drop_empty()
+
+    def apply(self, levels):
+        """Apply [price, quantity] updates; a quantity of 0 removes the level"""
+        if not levels:
+            return
+        levels = np.asarray(levels, dtype=float).reshape(-1, 2)
+        # A diff touches a handful of levels: binary search each one instead of re-sorting the side
+        for price, quantity in levels:
+            i = np.searchsorted(self.prices, price)
+            exists = i < len(self.prices) and self.prices[i] == price
+            if exists and quantity > 0:
+                self.quantities[i] = quantity
+            elif exists:
+                self.prices = np.delete(self.prices, i)
+                self.quantities = np.delete(self.quantities, i)
+            elif quantity > 0:
+                self.prices = np.insert(self.prices, i, price)
+                self.quantities = np.insert(self.quantities, i, quantity)
+
+    def drop_empty(self):
+        keep = self.quantities > 0
+        self.prices, self.quantities = self.prices[keep], self.quantities[keep]
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class OrderBook:
+    def __init__(self, symbol):
+        """
+        Local order book maintained from a REST snapshot and diff-depth stream events.
+
+        Follows Binance's rules for a local book: events with `u` <= the snapshot's
+        lastUpdateId are dropped, the first applied event must straddle lastUpdateId + 1
+        and every following event must start right after the previous one. A gap marks
+        the book as out of sync until a new snapshot is loaded.
+
+        Args:
+            symbol: Trading pair, e.g. 'BTCUSDT'
+        """
+        self.symbol = symbol
+        self.bids = BookSide()
+        self.asks = BookSide()
+        self.last_update_id = None
+        self.synced = False
+        self.first_event = True
+        self.event_time = None
+
+    def load_snapshot(self, snapshot):
+        """
+        Reset the book from a depth snapshot.
+
+        Args:
+            snapshot: Response of GET /api/v3/depth with 'lastUpdateId', 'bids' and 'asks'
+        """
+        self.bids.load(snapshot['bids'])
+        self.asks.load(snapshot['asks'])
+        self.last_update_id = snapshot['lastUpdateId']
+        self.synced = True
+        self.first_event = True
+        logger.info(
+            f"Loaded {self.symbol} order book snapshot {self.last_update_id} "
+            f"({len(self.bids)} bids, {len(self.asks)} asks)"
+        )
+
+    def apply_diff(self, event):
+        """
+        Apply a depthUpdate event.
+
+        Returns:
+            True if the event was applied, False if it was stale or broke the sequence
+        """
+        if not self.synced:
+            return False
+
+        first_id, final_id = event['U'], event['u']
+        if final_id <= self.last_update_id:
+            return False  # Already contained in the snapshot
+
+        if self.first_event:
+            in_sequence = first_id <= self.last_update_id + 1
+        else:
+            in_sequence = first_id == self.last_update_id + 1
+        if not in_sequence:
+            logger.warning(
+                f"{self.symbol} depth gap: expected update {self.last_update_id + 1}, got {first_id}. "
+                f"Book needs a new snapshot."
+            )
+            self.synced = False
+            return False
+
+        self.bids.apply(event['b'])
+        self.asks.apply(event['a'])
+        self.last_update_id = final_id
+        self.event_time = event.get('E')
+        self.first_event = False
+        return True
+
+    def best_bid(self):
+        if not len(self.bids):
+            return None
+        return self.bids.prices[-1], self.bids.quantities[-1]
+
+    def best_ask(self):
+        if not len(self.asks):
+            return None
+        return self.asks.prices[0], self.asks.quantities[0]
+
+    def mid_price(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def depth_at(self, side, price):
+        """Quantity resting at exactly `price` on the 'BUY' (bid) or 'SELL' (ask) side"""
+        book_side = self.bids if side == 'BUY' else self.asks
+        i = np.searchsorted(book_side.prices, price)
+        if i < len(book_side) and book_side.prices[i] == price:
+            return book_side.quantities[i]
+        return 0.0
+
+    def sweep_cost(self, side, quantity):
+        """
+        Cost of a market order that walks the book.
+
+        Args:
+            side: 'BUY' consumes asks from the best price up, 'SELL' consumes bids down
+            quantity: Base asset quantity to fill
+
+        Returns:
+            (average_price, filled_quantity, quote_cost); average_price is None if nothing fills
+        """
+        if side == 'BUY':
+            prices, quantities = self.asks.prices, self.asks.quantities
+        else:
+            prices, quantities = self.bids.prices[::-1], self.bids.quantities[::-1]
+
+        cumulative = np.cumsum(quantities)
+        # Number of levels consumed completely
+        full = np.searchsorted(cumulative, quantity, side='left')
+        filled_before = cumulative[full - 1] if full > 0 else 0.0
+        cost = np.dot(prices[:full], quantities[:full])
+        filled = filled_before
+        if full < len(prices):
+            remainder = quantity - filled_before
+            cost += remainder * prices[full]
+            filled = quantity
+        if filled == 0:
+            return None, 0.0, 0.0
+        return cost / filled, filled, cost
+
+    def check_liquidity(self, side, quantity, max_slippage_bps=10):
+        """
+        Pre-trade check: can `quantity` fill completely within `max_slippage_bps` of the top of book?
+        """
+        top = self.best_ask() if side == 'BUY' else self.best_bid()
+        if top is None:
+            return False
+        average_price, filled, _ = self.sweep_cost(side, quantity)
+        if filled < quantity:
+            return False
+        slippage_bps = abs(average_price - top[0]) / top[0] * 10000
+        return slippage_bps <= max_slippage_bps
+
+
+class DepthStreamSync:
+    def __init__(self, client, symbol, limit=1000, retry_delay=1.0):
+        """
+        Keep an OrderBook in sync from a live diff-depth stream (<symbol>@depth@100ms).
+
+        Events received before the snapshot is loaded are buffered (up to
+        MAX_BUFFERED_EVENTS) and replayed on top of it; a sequence gap triggers a fresh
+        snapshot. While the book is out of sync every event retries the snapshot, with
+        the delay between failed fetches doubling up to MAX_RETRY_DELAY.
+
+        Args:
+            client: BinanceClient used to fetch depth snapshots
+            symbol: Trading pair, e.g. 'BTCUSDT'
+            limit: Number of levels in the snapshot
+            retry_delay: Seconds to wait after the first failed snapshot fetch
+        """
+        self.client = client
+        self.symbol = symbol
+        self.limit = limit
+        self.retry_delay = retry_delay
+        self.book = OrderBook(symbol)
+        self.buffer = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self.failures = 0
+        self.next_resync = 0.0
+
+    def stream(self):
+        return f"{self.symbol.lower()}@depth@100ms"
+
+    def resync(self):
+        snapshot = self.client.get_order_book(self.symbol, self.limit)
+        if not snapshot:
+            self.failures += 1
+            delay = min(self.retry_delay * 2 ** (self.failures - 1), MAX_RETRY_DELAY)
+            self.next_resync = time.monotonic() + delay
+            logger.warning(f"{self.symbol} depth snapshot failed, retrying in {delay:.1f}s")
+            return
+        self.failures = 0
+        self.book.load_snapshot(snapshot)
+        buffered = list(self.buffer)
+        self.buffer.clear()
+        for event in buffered:
+            self.book.apply_diff(event)
+
+    def handle_message(self, msg):
+        event = msg.get('data', msg)
+        if event.get('e') != 'depthUpdate':
+            return
+        if self.book.synced and (self.book.apply_diff(event) or self.book.synced):
+            return
+        # Fetch the snapshot only after the stream has started buffering
+        self.buffer.append(event)
+        if time.monotonic() >= self.next_resync:
+            self.resync()
+
+
+class DepthRecording:
+    def __init__(self, symbol, snapshot, events):
+        """
+        Recorded snapshot plus diff events, replayed to reconstruct the book at any time.
+
+        Args:
+            symbol: Trading pair, e.g. 'BTCUSDT'
+            snapshot: Depth snapshot dict (see OrderBook.load_snapshot)
+            events: depthUpdate events sorted by event time 'E'
+        """
+        self.symbol = symbol
+        self.snapshot = snapshot
+        self.events = events
+        self.event_times = np.array([event['E'] for event in events], dtype=np.int64)
+        self.book = None
+        self.cursor = 0
+
+    @classmethod
+    def load(cls, symbol, snapshot_path, updates_path):
+        """Load a JSON snapshot and a JSON-lines file with one depthUpdate event per line"""
+        with open(snapshot_path) as f:
+            snapshot = json.load(f)
+        with open(updates_path) as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        return cls(symbol, snapshot, events)
+
+    def book_at(self, timestamp):
+        """Return the book with every event up to and including `timestamp` (ms) applied"""
+        if self.book is None or (
+            self.cursor > 0 and self.event_times[self.cursor - 1] > timestamp
+        ):
+            self.book = OrderBook(self.symbol)
+            self.book.load_snapshot(self.snapshot)
+            self.cursor = 0
+
+        end = np.searchsorted(self.event_times, timestamp, side='right')
+        for event in self.events[self.cursor:end]:
+            self.book.apply_diff(event)
+        self.cursor = max(self.cursor, end)
+        return self.book
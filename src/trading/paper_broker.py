@@ -0,0 +1,93 @@
+import itertools
+import time
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PaperBroker:
+    def __init__(self, quote_balance=10000, fee_rate=0.001, quote_asset='USDT', price_source=None, ack_delay=0,
+                 time_source=None):
+        """
+        Simulated exchange with the same `place_order` interface as BinanceClient.
+
+        Market orders fill completely at the price returned by `price_source(symbol)`,
+        e.g. LiveSignalEngine.last_close, and the response mimics Binance's FULL order
+        response so callers cannot tell the difference.
+
+        Args:
+            quote_balance: Starting balance of the quote asset
+            fee_rate: Commission per fill, charged in the quote asset
+            quote_asset: Quote asset of the traded symbols
+            price_source: Callable returning the current price for a symbol
+            ack_delay: Seconds to wait before acknowledging, to mimic exchange round trips
+            time_source: Optional callable returning the fill time (ms) for a symbol, e.g.
+                LiveSignalEngine.last_close_time in replays (default: the wall clock)
+        """
+        self.quote_asset = quote_asset
+        self.fee_rate = fee_rate
+        self.price_source = price_source
+        self.ack_delay = ack_delay
+        self.time_source = time_source
+        self.balances = {quote_asset: float(quote_balance)}
+        self.orders = []
+        self._order_ids = itertools.count(1)
+
+    def base_asset(self, symbol):
+        return symbol[:-len(self.quote_asset)] if symbol.endswith(self.quote_asset) else symbol
+
+    def place_order(self, symbol, side, type, quantity):
+        logger.info(f"Paper {side} order for {quantity} of {symbol}")
+        price = self.price_source(symbol) if self.price_source is not None else None
+        if price is None:
+            logger.error(f"No price available for {symbol}, order rejected")
+            return None
+
+        quantity = float(quantity)
+        base = self.base_asset(symbol)
+        notional = quantity * price
+        commission = notional * self.fee_rate
+        if side == 'BUY':
+            if self.balances[self.quote_asset] < notional + commission:
+                logger.error(f"Insufficient {self.quote_asset} balance for {symbol} order")
+                return None
+            self.balances[self.quote_asset] -= notional + commission
+            self.balances[base] = self.balances.get(base, 0.0) + quantity
+        else:
+            if self.balances.get(base, 0.0) < quantity:
+                logger.error(f"Insufficient {base} balance for {symbol} order")
+                return None
+            self.balances[base] -= quantity
+            self.balances[self.quote_asset] += notional - commission
+
+        order = {
+            'symbol': symbol,
+            'orderId': next(self._order_ids),
+            'transactTime': self.time_source(symbol) if self.time_source is not None else int(time.time() * 1000),
+            'side': side,
+            'type': type,
+            'status': 'FILLED',
+            'executedQty': str(quantity),
+            'cummulativeQuoteQty': str(notional),
+            'fills': [{
+                'price': str(price),
+                'qty': str(quantity),
+                'commission': str(commission),
+                'commissionAsset': self.quote_asset,
+            }],
+        }
+        self.orders.append(order)
+        if self.ack_delay:
+            time.sleep(self.ack_delay)
+        return order
+
+    def get_account_balance(self):
+        return {asset: amount for asset, amount in self.balances.items() if amount > 0}
+
+    def equity(self):
+        """Quote balance plus holdings valued at the current price"""
+        total = self.balances[self.quote_asset]
+        for asset, amount in self.balances.items():
+            if asset != self.quote_asset and amount > 0:
+                total += amount * self.price_source(asset + self.quote_asset)
+        return total
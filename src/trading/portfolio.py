@@ -0,0 +1,205 @@
+import warnings
+import numpy as np
+import pandas as pd
+from config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def align_closes(history):
+    """
+    Align close prices of several symbols on their open times.
+
+    Args:
+        history: Dict of symbol -> list of raw klines
+
+    Returns:
+        (timestamps, symbols, closes) with closes of shape (bars, symbols); bars a symbol
+        has no data for are NaN
+    """
+    symbols = list(history)
+    series = {
+        symbol: pd.Series(
+            pd.to_numeric([kline[4] for kline in klines]),
+            index=[int(kline[0]) for kline in klines],
+        )
+        for symbol, klines in history.items()
+    }
+    closes = pd.DataFrame(series).sort_index()
+    return closes.index.to_numpy(), symbols, closes[symbols].to_numpy(dtype=float)
+
+
+def signal_matrix(strategy, history, timestamps):
+    """
+    Run a TradingStrategy per symbol and turn its entries/exits into holdings.
+
+    A positive `positions` value enters a long position and a negative one exits, like
+    the Backtester; the result is 1 while a symbol is held and 0 otherwise.
+
+    Returns:
+        Array of shape (len(timestamps), len(history))
+    """
+    holdings = np.zeros((len(timestamps), len(history)))
+    for j, (symbol, klines) in enumerate(history.items()):
+        signals = strategy.generate_signals(klines)
+        events = np.sign(signals['positions'].to_numpy(dtype=float))
+        # Entries set 1, exits set 0, everything else keeps the previous state
+        state = pd.Series(np.where(events > 0, 1.0, np.where(events < 0, 0.0, np.nan))).ffill().fillna(0)
+        rows = np.searchsorted(timestamps, signals['timestamp'].astype(np.int64).to_numpy())
+        holdings[rows, j] = state.to_numpy()
+    return holdings
+
+
+class PortfolioBacktester:
+    ALLOCATIONS = ('equal', 'volatility')
+
+    def __init__(self, closes, holdings, allocation='equal', max_positions=None, rebalance_every=1,
+                 lookback=96, fee_rate=0.0, initial_capital=None, timestamps=None, symbols=None):
+        """
+        Long-only portfolio backtest over aligned bars x symbols arrays.
+
+        Target weights are set at rebalance bars (every `rebalance_every` bars and whenever
+        the set of held symbols changes) and drift with prices in between. Everything is
+        computed with 2D array operations, no per-bar loop.
+
+        Args:
+            closes: Close prices, shape (bars, symbols); NaN where a symbol has no data
+            holdings: 1 where the strategy wants to hold the symbol, shape (bars, symbols)
+            allocation: 'equal' weight or 'volatility' (inverse volatility) weighting
+            max_positions: Hold at most this many symbols, preferring the strongest
+                trailing return over `lookback` bars
+            rebalance_every: Bars between scheduled rebalances
+            lookback: Bars used for volatility and trailing return
+            fee_rate: Fee charged on traded notional at every rebalance
+            initial_capital: Starting equity (default: settings.INITIAL_CAPITAL)
+            timestamps: Optional open times of the bars, used to index the results
+            symbols: Optional symbol names, used to label the results
+        """
+        if allocation not in self.ALLOCATIONS:
+            raise ValueError(f"Unknown allocation '{allocation}'. Available: {', '.join(self.ALLOCATIONS)}")
+        self.closes = np.asarray(closes, dtype=float)
+        self.holdings = np.asarray(holdings, dtype=float) > 0
+        self.allocation = allocation
+        self.max_positions = max_positions
+        self.rebalance_every = rebalance_every
+        self.lookback = lookback
+        self.fee_rate = fee_rate
+        self.initial_capital = initial_capital if initial_capital is not None else settings.INITIAL_CAPITAL
+        self.timestamps = timestamps
+        self.symbols = symbols
+
+    @classmethod
+    def from_strategy(cls, strategy, history, **kwargs):
+        """Build a backtest from raw klines per symbol and any TradingStrategy"""
+        timestamps, symbols, closes = align_closes(history)
+        holdings = signal_matrix(strategy, history, timestamps)
+        return cls(closes, holdings, timestamps=timestamps, symbols=symbols, **kwargs)
+
+    def target_weights(self, returns):
+        available = ~np.isnan(self.closes)
+        selected = self.holdings & available
+
+        if self.max_positions is not None:
+            # Rank by trailing return and keep the strongest `max_positions` symbols
+            trailing = pd.DataFrame(self.closes).pct_change(self.lookback, fill_method=None).to_numpy()
+            score = np.where(selected, np.nan_to_num(trailing, nan=-np.inf), -np.inf)
+            rank = np.argsort(np.argsort(-score, axis=1, kind='stable'), axis=1)
+            selected &= rank < self.max_positions
+
+        if self.allocation == 'volatility':
+            volatility = pd.DataFrame(returns).rolling(self.lookback, min_periods=2).std().to_numpy()
+            with np.errstate(divide='ignore'):
+                raw = np.where(selected & (volatility > 0), 1 / volatility, 0.0)
+            # Symbols without volatility history yet get the median inverse volatility
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # Bars where nothing is held
+                fallback = np.nanmedian(np.where(raw > 0, raw, np.nan), axis=1, keepdims=True)
+            raw = np.where(selected & (raw == 0), np.nan_to_num(fallback, nan=1.0), raw)
+        else:
+            raw = selected.astype(float)
+
+        total = raw.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, raw / total, 0.0), selected
+
+    def run(self):
+        """
+        Returns:
+            Dict with 'equity' (Series), 'weights' (DataFrame of target weights in force per
+            bar) and summary statistics
+        """
+        logger.info(
+            f"Running portfolio backtest: {self.closes.shape[0]} bars x {self.closes.shape[1]} symbols, "
+            f"{self.allocation} allocation"
+        )
+        n_bars = self.closes.shape[0]
+        previous = np.vstack([self.closes[:1], self.closes[:-1]])
+        returns = np.nan_to_num(self.closes / previous - 1)
+
+        targets, selected = self.target_weights(returns)
+
+        # Rebalance on schedule and whenever the held set changes
+        changed = np.any(selected[1:] != selected[:-1], axis=1)
+        rebalance = np.zeros(n_bars, dtype=bool)
+        rebalance[::self.rebalance_every] = True
+        rebalance[1:] |= changed
+        rebalance[0] = rebalance[0] and selected[0].any()
+
+        # Weights set at the close of a rebalance bar apply from the next bar on
+        weights = pd.DataFrame(np.where(rebalance[:, None], targets, np.nan)).ffill().fillna(0).to_numpy()
+        effective = np.vstack([np.zeros((1, weights.shape[1])), weights[:-1]])
+
+        # Price growth of every symbol since the start of the current weight segment
+        growth = np.cumprod(1 + returns, axis=0)
+        segment_start = np.where(rebalance[:, None], growth, np.nan)
+        segment_start = pd.DataFrame(segment_start).ffill().to_numpy()
+        segment_start = np.vstack([np.ones((1, growth.shape[1])), segment_start[:-1]])
+        segment_start = np.where(np.isnan(segment_start), 1.0, segment_start)
+        relative = growth / segment_start
+
+        # Value multiple of the segment: idle cash plus drifted holdings
+        drifted = effective * relative
+        multiple = 1 - effective.sum(axis=1) + drifted.sum(axis=1)
+
+        # Fees on the notional traded to move from drifted to new target weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            drifted_weights = np.where(multiple[:, None] > 0, drifted / multiple[:, None], 0.0)
+        turnover = np.where(rebalance, np.abs(weights - drifted_weights).sum(axis=1), 0.0)
+        cost = 1 - self.fee_rate * turnover
+
+        # Equity = capital at the segment start x multiple within the segment
+        segment_end = np.where(rebalance, multiple * cost, 1.0)
+        carried = np.concatenate([[1.0], np.cumprod(segment_end)[:-1]])
+        equity = self.initial_capital * carried * multiple * np.where(rebalance, cost, 1.0)
+
+        index = self.timestamps if self.timestamps is not None else np.arange(n_bars)
+        equity = pd.Series(equity, index=index, name='equity')
+        results = {
+            'equity': equity,
+            'weights': pd.DataFrame(weights, index=index, columns=self.symbols),
+            'turnover': float(turnover.sum()),
+            'rebalances': int(rebalance.sum()),
+        }
+        results.update(self.summary(equity))
+        self.print_results(results)
+        return results
+
+    def summary(self, equity):
+        final_capital = float(equity.iloc[-1])
+        drawdown = equity / equity.cummax() - 1
+        return {
+            'final_capital': final_capital,
+            'profit': final_capital - self.initial_capital,
+            'profit_percentage': (final_capital / self.initial_capital - 1) * 100,
+            'max_drawdown_percentage': float(drawdown.min()) * 100,
+        }
+
+    def print_results(self, results):
+        logger.info("Portfolio backtest finished. Results:")
+        logger.info(f"Initial Capital: {self.initial_capital}")
+        logger.info(f"Final Capital: {results['final_capital']:.2f}")
+        logger.info(f"Profit: {results['profit']:.2f}")
+        logger.info(f"Profit Percentage: {results['profit_percentage']:.2f}%")
+        logger.info(f"Max Drawdown: {results['max_drawdown_percentage']:.2f}%")
+        logger.info(f"Rebalances: {results['rebalances']}, Turnover: {results['turnover']:.2f}")
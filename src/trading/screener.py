@@ -0,0 +1,154 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from binance.helpers import interval_to_milliseconds
+from config import settings
+from src.trading.vector_strategy import (
+    CLOSE, VectorStrategy, VectorRSIStrategy, VectorVATSStrategy, VectorBollingerBandsStrategy,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MarketScreener(VectorStrategy):
+    # Ranking column -> whether the most interesting symbols have the lowest values
+    RANKINGS = {
+        'rsi': True,                 # most oversold first
+        'vats_score': False,         # strongest risk-adjusted trend first
+        'bollinger_position': True,  # furthest below the lower band first
+    }
+
+    def __init__(self, n_symbols, rsi_period=14, lookback_period=20, threshold=0.5, window=20, num_std=2):
+        """
+        RSI, VATS score and Bollinger position for every symbol, updated together each bar.
+
+        Wraps the vectorized RSI, VATS and Bollinger strategies (same arithmetic as
+        RSIStrategy, VATSStrategy and BollingerBandsStrategy), so one update covers the
+        whole market with array operations. It never signals; LiveSignalEngine can drive
+        it like any VectorStrategy.
+        """
+        super().__init__(n_symbols)
+        self.rsi_period = rsi_period
+        self.lookback_period = lookback_period
+        self.threshold = threshold
+        self.window = window
+        self.num_std = num_std
+        self.rsi_strategy = VectorRSIStrategy(n_symbols, rsi_period)
+        self.vats_strategy = VectorVATSStrategy(n_symbols, lookback_period, threshold)
+        self.bollinger_strategy = VectorBollingerBandsStrategy(n_symbols, window, num_std)
+        self.close = np.full(n_symbols, np.nan)
+
+    def strategies(self):
+        return {'rsi': self.rsi_strategy, 'vats': self.vats_strategy, 'bollinger': self.bollinger_strategy}
+
+    def _step(self, bars, mask):
+        for strategy in self.strategies().values():
+            strategy.update(bars, mask)
+        self.close = np.where(mask, bars[:, CLOSE], self.close)
+        return np.zeros(self.n_symbols, dtype=np.int8)
+
+    def get_state(self):
+        state = super().get_state()
+        # The wrapped strategies hold the indicator state, namespaced like VectorEnsembleStrategy
+        for name, strategy in self.strategies().items():
+            state.update({f"{name}/{key}": value for key, value in strategy.get_state().items()})
+        return state
+
+    def set_state(self, state, rows=None):
+        own = {key: value for key, value in state.items() if '/' not in key}
+        super().set_state(own, rows)
+        for name, strategy in self.strategies().items():
+            prefix = f"{name}/"
+            strategy.set_state({key[len(prefix):]: value for key, value in state.items() if key.startswith(prefix)}, rows)
+
+    def bollinger_position(self):
+        """Close relative to the bands: 0 at the lower band, 1 at the upper band"""
+        bollinger = self.bollinger_strategy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.close - bollinger.lower_band) / (bollinger.upper_band - bollinger.lower_band)
+
+    def table(self, symbols):
+        """Current indicator values, one row per symbol"""
+        return pd.DataFrame({
+            'close': self.close,
+            'rsi': self.rsi_strategy.rsi,
+            'vats_score': np.where(np.isnan(self.vats_strategy.rolling_std), np.nan, self.vats_strategy.vats_score),
+            'rolling_std': self.vats_strategy.rolling_std,
+            'bollinger_position': self.bollinger_position(),
+            'middle_band': self.bollinger_strategy.middle_band,
+        }, index=pd.Index(symbols, name='symbol'))
+
+    def rankings(self, symbols, top=10):
+        """Dict of ranking column -> top `top` symbols by that column, symbols without a value left out"""
+        table = self.table(symbols)
+        return {
+            column: table.dropna(subset=[column]).sort_values(column, ascending=ascending).head(top)
+            for column, ascending in self.RANKINGS.items()
+        }
+
+
+def load_recent(client, symbols, interval, bars, workers=16):
+    """
+    Fetch the last `bars` closed klines of every symbol in parallel.
+
+    Returns:
+        Dict of symbol -> raw klines
+    """
+    start = int(time.time() * 1000) - (bars + 1) * interval_to_milliseconds(interval)
+
+    def fetch(symbol):
+        # The most recent kline is still open
+        return symbol, client.get_historical_klines(symbol, interval, start)[:-1]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(fetch, symbols))
+
+
+def log_rankings(rankings):
+    for column, table in rankings.items():
+        logger.info(f"Top symbols by {column}:\n{table.to_string(float_format=lambda value: f'{value:.4f}')}")
+
+
+def main():
+    from src.api.binance_client import get_binance_client
+    from src.trading.live_engine import LiveSignalEngine
+
+    parser = argparse.ArgumentParser(description="Rank every pair of a quote asset by RSI, VATS and Bollinger position")
+    parser.add_argument("--quote-asset", type=str, default="USDT", help="Quote asset of the screened pairs")
+    parser.add_argument("--interval", type=str, default=settings.INTERVAL, help="Kline interval")
+    parser.add_argument("--bars", type=int, default=100, help="Bars of history loaded per symbol (default: 100)")
+    parser.add_argument("--top", type=int, default=10, help="Rows per ranking (default: 10)")
+    parser.add_argument("--follow", action="store_true", help="Keep running and re-rank on every bar close")
+    args = parser.parse_args()
+
+    client = get_binance_client()
+    symbols = client.get_trading_symbols(args.quote_asset)
+    if not symbols:
+        logger.error(f"No {args.quote_asset} pairs found")
+        return
+    logger.info(f"Screening {len(symbols)} {args.quote_asset} pairs")
+
+    screener = MarketScreener(len(symbols))
+    engine = LiveSignalEngine(
+        screener, symbols, args.interval, client=client,
+        on_flush=lambda mask: log_rankings(screener.rankings(engine.symbols, args.top)),
+    )
+    started = time.perf_counter()
+    engine.feed_history(load_recent(client, symbols, args.interval, args.bars))
+    logger.info(f"Loaded and screened history in {time.perf_counter() - started:.2f}s")
+    log_rankings(screener.rankings(engine.symbols, args.top))
+
+    if args.follow:
+        try:
+            engine.start()
+        except KeyboardInterrupt:
+            logger.info("Stopping screener")
+        finally:
+            engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from src.utils.logger import get_logger
 from abc import ABC, abstractmethod
+from src.data.indicators import RSIIndicator
 
 logger = get_logger(__name__)
 
@@ -47,7 +48,10 @@ class RSIStrategy(TradingStrategy):
         self.rsi_overbought = rsi_overbought
         self.rsi_oversold = rsi_oversold
 
-    def generate_signals(self, klines):
+    def indicator(self):
+        return RSIIndicator(self.rsi_period)
+
+    def generate_signals(self, klines, indicators=None):
         logger.info("Generating trading signals for RSI Strategy")
         df = pd.DataFrame(klines,
                           columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time',
@@ -56,12 +60,16 @@ class RSIStrategy(TradingStrategy):
                                    'ignore'])
         df["close"] = pd.to_numeric(df["close"])
 
-        # Calculate RSI
-        delta = df["close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        rs = gain / loss
-        df["rsi"] = 100 - (100 / (1 + rs))
+        if indicators is not None:
+            # Precomputed from the stored history (see IndicatorStore)
+            df["rsi"] = indicators["rsi"]
+        else:
+            # Calculate RSI
+            delta = df["close"].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
+            rs = gain / loss
+            df["rsi"] = 100 - (100 / (1 + rs))
 
         df["signal"] = 0
         df.loc[df["rsi"] > self.rsi_overbought, "signal"] = -1  # Sell signal
@@ -0,0 +1,359 @@
+import inspect
+import numpy as np
+from abc import ABC, abstractmethod
+from src.data.indicators import MACDIndicator
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Column layout of the per-bar input matrix passed to VectorStrategy.update
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class RollingWindow:
+    """
+    Ring buffer holding the last `size` values for every symbol (one row per symbol).
+
+    Sums are recomputed from the buffer instead of being kept as running totals, so
+    long-running engines do not accumulate floating point drift.
+    """
+
+    def __init__(self, n_symbols, size):
+        self.size = size
+        self.values = np.zeros((n_symbols, size))
+        self.count = np.zeros(n_symbols, dtype=np.int64)
+
+    def push(self, x, mask):
+        rows = np.flatnonzero(mask)
+        self.values[rows, self.count[rows] % self.size] = x[rows]
+        self.count[rows] += 1
+
+    def filled(self):
+        return np.minimum(self.count, self.size)
+
+    def full(self):
+        return self.count >= self.size
+
+    def sum(self):
+        return self.values.sum(axis=1)
+
+    def mean(self):
+        # Partially filled rows are averaged over the values pushed so far (min_periods=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sum() / self.filled()
+
+    def std(self):
+        # Sample standard deviation (ddof=1, like pandas); only meaningful once full
+        mean = self.values.mean(axis=1)
+        return np.sqrt(((self.values - mean[:, None]) ** 2).sum(axis=1) / (self.size - 1))
+
+
+class VectorStrategy(ABC):
+    """
+    Incremental strategy evaluated for many symbols at once.
+
+    All indicator state lives in NumPy arrays with one row per symbol, so a bar close
+    for every symbol is processed by a single vectorized `update` call. Signals follow
+    the same rules as the matching batch TradingStrategy.
+    """
+
+    def __init__(self, n_symbols):
+        self.n_symbols = n_symbols
+        self.signal = np.zeros(n_symbols, dtype=np.int8)
+        self.bars = np.zeros(n_symbols, dtype=np.int64)
+
+    @abstractmethod
+    def _step(self, bars, mask):
+        """
+        Update indicator state for the rows selected by `mask`.
+
+        Args:
+            bars: Float array of shape (n_symbols, 5) with OPEN/HIGH/LOW/CLOSE/VOLUME columns
+            mask: Boolean array selecting the symbols that closed a bar
+
+        Returns:
+            Array of new signals (1, -1 or 0) for every row; rows outside `mask` are ignored
+        """
+        raise NotImplementedError
+
+    def update(self, bars, mask=None):
+        """
+        Feed one closed bar per symbol and return the position changes.
+
+        Args:
+            bars: Float array of shape (n_symbols, 5), see BAR_FIELDS
+            mask: Optional boolean array of symbols that have a new bar (default: all)
+
+        Returns:
+            Array of position changes (signal.diff()) per symbol, 0 for masked-out rows
+        """
+        if mask is None:
+            mask = np.ones(self.n_symbols, dtype=bool)
+        new_signal = self._step(bars, mask).astype(np.int8)
+        positions = np.where(mask & (self.bars > 0), new_signal - self.signal, 0)
+        self.signal = np.where(mask, new_signal, self.signal).astype(np.int8)
+        self.bars += mask
+        return positions
+
+    def get_params(self):
+        """Constructor parameters (without n_symbols), used to validate snapshots"""
+        names = inspect.signature(type(self).__init__).parameters
+        return {name: getattr(self, name) for name in names if name not in ('self', 'n_symbols')}
+
+    def get_state(self):
+        """
+        Collect the running state (indicator arrays, rolling buffers, last signal).
+
+        Returns:
+            Dict of name -> array; every array has one row per symbol
+        """
+        state = {}
+        for name, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                state[name] = value
+            elif isinstance(value, RollingWindow):
+                state[f"{name}.values"] = value.values
+                state[f"{name}.count"] = value.count
+        return state
+
+    def set_state(self, state, rows=None):
+        """
+        Restore state produced by `get_state`.
+
+        Args:
+            state: Dict of name -> array as returned by get_state
+            rows: Optional (target_rows, source_rows) index arrays to restore only some symbols
+        """
+        for key, value in state.items():
+            owner, name = self, key
+            if '.' in key:
+                window, name = key.split('.')
+                owner = getattr(self, window)
+            if rows is None:
+                setattr(owner, name, np.array(value))
+            else:
+                target_rows, source_rows = rows
+                current = getattr(owner, name, None)
+                if current is None:
+                    continue
+                current[target_rows] = value[source_rows]
+
+
+class VectorMovingAverageCrossover(VectorStrategy):
+    def __init__(self, n_symbols, short_window, long_window):
+        super().__init__(n_symbols)
+        self.short_window = short_window
+        self.long_window = long_window
+        self.short_closes = RollingWindow(n_symbols, short_window)
+        self.long_closes = RollingWindow(n_symbols, long_window)
+
+    def _step(self, bars, mask):
+        close = bars[:, CLOSE]
+        self.short_closes.push(close, mask)
+        self.long_closes.push(close, mask)
+        self.short_mavg = self.short_closes.mean()
+        self.long_mavg = self.long_closes.mean()
+        # The batch strategy leaves the first `short_window` bars flat
+        crossed = (self.short_mavg > self.long_mavg) & (self.bars >= self.short_window)
+        return crossed.astype(np.int8)
+
+
+class VectorRSIStrategy(VectorStrategy):
+    def __init__(self, n_symbols, rsi_period=14, rsi_overbought=70, rsi_oversold=30):
+        super().__init__(n_symbols)
+        self.rsi_period = rsi_period
+        self.rsi_overbought = rsi_overbought
+        self.rsi_oversold = rsi_oversold
+        self.gains = RollingWindow(n_symbols, rsi_period)
+        self.losses = RollingWindow(n_symbols, rsi_period)
+        self.last_close = np.full(n_symbols, np.nan)
+        self.rsi = np.full(n_symbols, np.nan)
+
+    def _step(self, bars, mask):
+        close = bars[:, CLOSE]
+        # The first bar has no delta; pandas counts it as a zero gain/loss
+        delta = np.where(self.bars > 0, close - self.last_close, 0.0)
+        self.gains.push(np.maximum(delta, 0.0), mask)
+        self.losses.push(np.maximum(-delta, 0.0), mask)
+        self.last_close = np.where(mask, close, self.last_close)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rs = self.gains.sum() / self.losses.sum()
+            rsi = 100 - (100 / (1 + rs))
+        rsi = np.where(self.gains.full(), rsi, np.nan)
+        self.rsi = np.where(mask, rsi, self.rsi)
+
+        signal = np.zeros(self.n_symbols, dtype=np.int8)
+        signal[self.rsi > self.rsi_overbought] = -1
+        signal[self.rsi < self.rsi_oversold] = 1
+        return signal
+
+
+class VectorVATSStrategy(VectorStrategy):
+    def __init__(self, n_symbols, lookback_period=20, threshold=0.5, max_volatility=None):
+        super().__init__(n_symbols)
+        self.lookback_period = lookback_period
+        self.threshold = threshold
+        self.max_volatility = max_volatility
+        self.returns = RollingWindow(n_symbols, lookback_period)
+        self.last_close = np.full(n_symbols, np.nan)
+        self.rolling_std = np.full(n_symbols, np.nan)
+        self.vats_score = np.zeros(n_symbols)
+
+    def _step(self, bars, mask):
+        close = bars[:, CLOSE]
+        self.returns.push(close / self.last_close - 1, mask & (self.bars > 0))
+        self.last_close = np.where(mask, close, self.last_close)
+
+        full = self.returns.full()
+        rolling_mean = np.where(full, self.returns.mean(), np.nan)
+        rolling_std = np.where(full, self.returns.std(), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            score = np.where(rolling_std > 0, rolling_mean / rolling_std, 0.0)
+        self.rolling_std = np.where(mask, rolling_std, self.rolling_std)
+        self.vats_score = np.where(mask, score, self.vats_score)
+
+        raw = np.zeros(self.n_symbols, dtype=np.int8)
+        raw[self.vats_score > self.threshold] = 1
+        raw[self.vats_score < -self.threshold] = -1
+        if self.max_volatility is not None:
+            raw[self.rolling_std > self.max_volatility] = 0
+        # Like the batch version, HOLD keeps the last BUY/SELL (forward fill)
+        return np.where(raw != 0, raw, self.signal)
+
+
+class VectorBollingerBandsStrategy(VectorStrategy):
+    def __init__(self, n_symbols, window=20, num_std=2):
+        super().__init__(n_symbols)
+        self.window = window
+        self.num_std = num_std
+        self.closes = RollingWindow(n_symbols, window)
+        self.middle_band = np.full(n_symbols, np.nan)
+        self.upper_band = np.full(n_symbols, np.nan)
+        self.lower_band = np.full(n_symbols, np.nan)
+
+    def _step(self, bars, mask):
+        close = bars[:, CLOSE]
+        self.closes.push(close, mask)
+        full = self.closes.full()
+        middle = np.where(full, self.closes.mean(), np.nan)
+        std = np.where(full, self.closes.std(), np.nan)
+        self.middle_band = np.where(mask, middle, self.middle_band)
+        self.upper_band = np.where(mask, middle + self.num_std * std, self.upper_band)
+        self.lower_band = np.where(mask, middle - self.num_std * std, self.lower_band)
+
+        signal = np.zeros(self.n_symbols, dtype=np.int8)
+        signal[close < self.lower_band] = 1
+        signal[close > self.upper_band] = -1
+        return signal
+
+
+class VectorMACDStrategy(VectorStrategy):
+    def __init__(self, n_symbols, fast_period=12, slow_period=26, signal_period=9):
+        super().__init__(n_symbols)
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.ema_fast = np.zeros(n_symbols)
+        self.ema_slow = np.zeros(n_symbols)
+        self.macd_line = np.zeros(n_symbols)
+        self.signal_line = np.zeros(n_symbols)
+
+    def _ema(self, previous, value, period, mask):
+        # ewm(span=period, adjust=False): the first value seeds the average
+        alpha = 2 / (period + 1)
+        updated = np.where(self.bars > 0, alpha * value + (1 - alpha) * previous, value)
+        return np.where(mask, updated, previous)
+
+    def indicator(self):
+        return MACDIndicator(self.fast_period, self.slow_period, self.signal_period)
+
+    def seed(self, i, row, bars):
+        """Restore symbol `i` from the last row of its indicator table, covering `bars` bars"""
+        self.ema_fast[i] = row['ema_fast']
+        self.ema_slow[i] = row['ema_slow']
+        self.macd_line[i] = row['macd_line']
+        self.signal_line[i] = row['signal_line']
+        self.signal[i] = np.sign(row['macd_line'] - row['signal_line'])
+        self.bars[i] = bars
+
+    def _step(self, bars, mask):
+        close = bars[:, CLOSE]
+        self.ema_fast = self._ema(self.ema_fast, close, self.fast_period, mask)
+        self.ema_slow = self._ema(self.ema_slow, close, self.slow_period, mask)
+        self.macd_line = self.ema_fast - self.ema_slow
+        self.signal_line = self._ema(self.signal_line, self.macd_line, self.signal_period, mask)
+        return np.sign(self.macd_line - self.signal_line)
+
+
+class VectorVWAPStrategy(VectorStrategy):
+    def __init__(self, n_symbols, window=20):
+        super().__init__(n_symbols)
+        self.window = window
+        self.vp = RollingWindow(n_symbols, window)
+        self.volume = RollingWindow(n_symbols, window)
+        self.vwap = np.full(n_symbols, np.nan)
+
+    def _step(self, bars, mask):
+        typical_price = (bars[:, HIGH] + bars[:, LOW] + bars[:, CLOSE]) / 3
+        self.vp.push(typical_price * bars[:, VOLUME], mask)
+        self.volume.push(bars[:, VOLUME], mask)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = np.where(self.vp.full(), self.vp.sum() / self.volume.sum(), np.nan)
+        self.vwap = np.where(mask, vwap, self.vwap)
+
+        signal = np.zeros(self.n_symbols, dtype=np.int8)
+        signal[bars[:, CLOSE] > self.vwap] = 1
+        signal[bars[:, CLOSE] < self.vwap] = -1
+        return signal
+
+
+class VectorYOLOStrategy(VectorStrategy):
+    def __init__(self, n_symbols, dip_threshold=3.0, rip_threshold=3.0):
+        super().__init__(n_symbols)
+        self.dip_threshold = dip_threshold
+        self.rip_threshold = rip_threshold
+
+    def _step(self, bars, mask):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct_change = (bars[:, CLOSE] - bars[:, OPEN]) / bars[:, OPEN] * 100
+        signal = np.zeros(self.n_symbols, dtype=np.int8)
+        signal[pct_change <= -self.dip_threshold] = 1
+        signal[pct_change >= self.rip_threshold] = -1
+        return signal
+
+
+# Batch strategy class name -> (vector class, constructor parameters copied from the instance)
+VECTOR_STRATEGIES = {
+    'MovingAverageCrossoverStrategy': (VectorMovingAverageCrossover, ('short_window', 'long_window')),
+    'RSIStrategy': (VectorRSIStrategy, ('rsi_period', 'rsi_overbought', 'rsi_oversold')),
+    'VATSStrategy': (VectorVATSStrategy, ('lookback_period', 'threshold', 'max_volatility')),
+    'BollingerBandsStrategy': (VectorBollingerBandsStrategy, ('window', 'num_std')),
+    'MACDStrategy': (VectorMACDStrategy, ('fast_period', 'slow_period', 'signal_period')),
+    'VWAPStrategy': (VectorVWAPStrategy, ('window',)),
+    'YOLOStrategy': (VectorYOLOStrategy, ('dip_threshold', 'rip_threshold')),
+}
+
+
+def vectorize_strategy(strategy, n_symbols):
+    """
+    Build the VectorStrategy equivalent of a batch TradingStrategy instance.
+
+    Args:
+        strategy: Configured TradingStrategy (e.g. from main.get_strategy)
+        n_symbols: Number of symbols (rows) to allocate state for
+
+    Returns:
+        VectorStrategy with the same parameters
+    """
+    if hasattr(strategy, 'vectorize'):
+        # Composite strategies (EnsembleStrategy) vectorize their members themselves
+        return strategy.vectorize(n_symbols)
+    name = type(strategy).__name__
+    if name not in VECTOR_STRATEGIES:
+        raise ValueError(f"No vectorized implementation for strategy '{name}'")
+    vector_class, param_names = VECTOR_STRATEGIES[name]
+    params = {param: getattr(strategy, param) for param in param_names}
+    logger.info(f"Vectorizing {name} for {n_symbols} symbols")
+    return vector_class(n_symbols, **params)
@@ -1,4 +1,5 @@
 import pandas as pd
+from src.data.indicators import VWAPIndicator
 from src.trading.strategy import TradingStrategy
 from src.utils.logger import get_logger
 
@@ -18,7 +19,10 @@ class VWAPStrategy(TradingStrategy):
         """
         self.window = window
 
-    def generate_signal(self, klines):
+    def indicator(self):
+        return VWAPIndicator(self.window)
+
+    def generate_signals(self, klines, indicators=None):
         logger.info("Generating trading signals for VWAP Strategy")
 
         df = pd.DataFrame(klines, columns=[
@@ -31,17 +35,21 @@ class VWAPStrategy(TradingStrategy):
         for col in ['high', 'low', 'close', 'volume']:
             df[col] = pd.to_numeric(df[col])
 
-        # Typical Price = (High + Low + Close) / 3
-        df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
+        if indicators is not None:
+            # Precomputed from the stored history (see IndicatorStore)
+            df['vwap'] = indicators['vwap']
+        else:
+            # Typical Price = (High + Low + Close) / 3
+            df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
 
-        df['vp'] = df['typical_price'] * df['volume']
+            df['vp'] = df['typical_price'] * df['volume']
 
-        # Rolling VWAP Calculation: sum ( Volume * Price ) / sum ( Volume )
-        df['rolling_vp_sum'] = df['vp'].rolling(window=self.window).sum()
-        df['rolling_vol_sum'] = df['volume'].rolling(window=self.window).sum()
+            # Rolling VWAP Calculation: sum ( Volume * Price ) / sum ( Volume )
+            df['rolling_vp_sum'] = df['vp'].rolling(window=self.window).sum()
+            df['rolling_vol_sum'] = df['volume'].rolling(window=self.window).sum()
 
-        # Actual VWAP Calculation based on rolling components
-        df['vwap'] = df['rolling_vp_sum'] / df['rolling_vol_sum']
+            # Actual VWAP Calculation based on rolling components
+            df['vwap'] = df['rolling_vp_sum'] / df['rolling_vol_sum']
 
         """
         Generating final signals
@@ -0,0 +1,127 @@
+import time
+import numpy as np
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LogHistogram:
+    """
+    Fixed-size log-linear histogram of nanosecond durations.
+
+    Every power of two is split into 2**sub_bucket_bits linear sub-buckets, so values are
+    kept to within ~6% (4 bits) using a few hundred counters regardless of how many
+    values are recorded. Values below 2**sub_bucket_bits are counted exactly.
+    """
+
+    def __init__(self, sub_bucket_bits=4, max_exponent=40):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_buckets = 1 << sub_bucket_bits
+        self.max_exponent = max_exponent
+        self.counts = np.zeros((max_exponent - sub_bucket_bits + 2) * self.sub_buckets, dtype=np.int64)
+        self.total = 0
+        self.max_value = 0
+
+    def bucket(self, value):
+        if value < self.sub_buckets:
+            return max(value, 0)
+        exponent = min(value.bit_length() - 1, self.max_exponent)
+        shift = exponent - self.sub_bucket_bits
+        sub_bucket = min(value >> shift, 2 * self.sub_buckets - 1) - self.sub_buckets
+        return (shift + 1) * self.sub_buckets + sub_bucket
+
+    def upper_bound(self, bucket):
+        """Highest value that falls into `bucket`"""
+        if bucket < self.sub_buckets:
+            return bucket
+        shift = bucket // self.sub_buckets - 1
+        sub_bucket = bucket % self.sub_buckets
+        return ((self.sub_buckets + sub_bucket + 1) << shift) - 1
+
+    def record(self, value):
+        value = int(value)
+        self.counts[self.bucket(value)] += 1
+        self.total += 1
+        if value > self.max_value:
+            self.max_value = value
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (0-100), 0 when empty"""
+        if not self.total:
+            return 0
+        rank = max(int(np.ceil(q / 100 * self.total)), 1)
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self.upper_bound(bucket), self.max_value)
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total = 0
+        self.max_value = 0
+
+
+class LatencyTracker:
+    # Segments of the tick-to-order path, in the order they happen
+    SEGMENTS = (
+        'close_to_receive',     # exchange bar close -> websocket message received
+        'receive_to_evaluate',  # message received -> strategy evaluated for the bar
+        'evaluate_to_submit',   # strategy evaluated -> order handed to the broker
+        'submit_to_ack',        # order handed to the broker -> place_order returned
+        'receive_to_ack',       # message received -> place_order returned
+        'close_to_ack',         # exchange bar close -> place_order returned (tick-to-order)
+    )
+
+    def __init__(self, dump_interval=60, exchange_clock=True):
+        """
+        Latency histograms for every stage between a candle closing and the order ack.
+
+        Args:
+            dump_interval: Seconds between periodic log dumps (None disables them)
+            exchange_clock: Whether bar close times are comparable with the local clock;
+                replays disable this since their close times are historical
+        """
+        self.histograms = {segment: LogHistogram() for segment in self.SEGMENTS}
+        self.dump_interval = dump_interval
+        self.exchange_clock = exchange_clock
+        self.last_dump = time.monotonic()
+
+    @staticmethod
+    def now():
+        return time.perf_counter_ns()
+
+    def record(self, segment, duration_ns):
+        self.histograms[segment].record(duration_ns)
+
+    def record_since_close(self, segment, close_time_ms):
+        """Record wall-clock time elapsed since an exchange timestamp (ms)"""
+        if self.exchange_clock:
+            self.histograms[segment].record(time.time_ns() - close_time_ms * 1_000_000)
+
+    def report(self):
+        """Dict of segment -> {'count', 'p50_us', 'p99_us', 'p99.9_us', 'max_us'}"""
+        report = {}
+        for segment, histogram in self.histograms.items():
+            report[segment] = {
+                'count': histogram.total,
+                'p50_us': histogram.percentile(50) / 1000,
+                'p99_us': histogram.percentile(99) / 1000,
+                'p99.9_us': histogram.percentile(99.9) / 1000,
+                'max_us': histogram.max_value / 1000,
+            }
+        return report
+
+    def dump(self):
+        for segment, stats in self.report().items():
+            if stats['count']:
+                logger.info(
+                    f"Latency {segment}: n={stats['count']} p50={stats['p50_us']:.1f}us "
+                    f"p99={stats['p99_us']:.1f}us p99.9={stats['p99.9_us']:.1f}us max={stats['max_us']:.1f}us"
+                )
+        self.last_dump = time.monotonic()
+
+    def maybe_dump(self):
+        if self.dump_interval is not None and time.monotonic() - self.last_dump >= self.dump_interval:
+            self.dump()
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
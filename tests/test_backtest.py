@@ -4,6 +4,15 @@ from src.trading.backtest import Backtester
 from src.trading.strategy import TradingStrategy
 from src.api.binance_client import BinanceClient
 from config import settings
+from src.trading.order_book import DepthRecording
+from src.data.kline_store import KlineStore
+from src.data.indicators import IndicatorStore
+from src.trading.macd_strategy import MACDStrategy
+from src.trading.strategy import RSIStrategy
+from src.trading.vwap_strategy import VWAPStrategy
+from tests.test_compact import random_klines
+import numpy as np
+import tempfile
 import pandas as pd
 
 class TestBacktester(unittest.TestCase):
@@ -36,5 +45,303 @@ class TestBacktester(unittest.TestCase):
         self.strategy.generate_signals.assert_called_once()
         # More specific assertions can be added here to check the final capital, profit, etc.
 
+
+class TestBacktesterOrderBook(unittest.TestCase):
+    def setUp(self):
+        snapshot = {'lastUpdateId': 1, 'bids': [['50100', '0.1'], ['50000', '10']],
+                    'asks': [['50300', '0.1'], ['50400', '10']]}
+        self.backtester = Backtester(MagicMock(spec=BinanceClient), MagicMock(), 'BTCUSDT', '15m',
+                                     '1 day ago UTC', 'unix', order_book=DepthRecording('BTCUSDT', snapshot, []))
+
+    def test_fills_walk_recorded_book(self):
+        self.backtester.capital = 50300 * 0.1 + 50400 * 0.1
+        signals = pd.DataFrame({
+            'timestamp': [1625097600000, 1625098500000],
+            'close': [50200.0, 50200.0],
+            'positions': [1.0, -1.0]
+        })
+        self.backtester.simulate_trades(signals)
+        # Buying walks the asks, selling walks the bids, both worse than the close
+        self.assertLess(self.backtester.capital, 50200 * 0.2)
+        self.assertEqual(self.backtester.position, 0)
+
+
+
+def reference_trades(signals):
+    """The original per-row simulation: buy on 1 when flat, sell on -1 when holding"""
+    capital, position = settings.INITIAL_CAPITAL, 0
+    for _, row in signals.iterrows():
+        if row['positions'] == 1.0 and position == 0:
+            position, capital = capital / row['close'], 0
+        elif row['positions'] == -1.0 and position > 0:
+            capital, position = position * row['close'], 0
+    return capital, position
+
+
+class TestBacktesterExits(unittest.TestCase):
+    def make_backtester(self, **kwargs):
+        return Backtester(MagicMock(spec=BinanceClient), MagicMock(), 'BTCUSDT', '15m',
+                          '1 day ago UTC', 'unix', **kwargs)
+
+    def bars(self, highs, lows, positions, opens=None):
+        closes = [(h + l) / 2 for h, l in zip(highs, lows)]
+        return pd.DataFrame({
+            'timestamp': [1000 * i for i in range(len(highs))],
+            'open': opens if opens is not None else closes,
+            'high': highs,
+            'low': lows,
+            'close': closes,
+            'positions': positions,
+        })
+
+    def test_matches_signal_only_simulation(self):
+        rng = np.random.default_rng(3)
+        signals = pd.DataFrame({
+            'timestamp': np.arange(500),
+            'close': 100 + rng.normal(0, 1, 500).cumsum(),
+            'positions': rng.choice([-1.0, 0.0, 0.0, 1.0], 500),
+        })
+        backtester = self.make_backtester()
+        backtester.simulate_trades(signals)
+        capital, position = reference_trades(signals)
+        self.assertAlmostEqual(backtester.capital, capital)
+        self.assertAlmostEqual(backtester.position, position)
+
+    def test_signal_flips_enter_and_exit(self):
+        # SELL -> BUY and BUY -> SELL flips change the position by 2
+        signals = pd.DataFrame({
+            'timestamp': [0, 1000, 2000, 3000, 4000],
+            'close': [100.0, 100.0, 100.0, 110.0, 120.0],
+            'positions': [np.nan, -1.0, 2.0, 0.0, -2.0],
+        })
+        backtester = self.make_backtester()
+        backtester.simulate_trades(signals)
+        self.assertEqual([(trade['timestamp'], trade['side']) for trade in backtester.trades],
+                         [(2000, 'BUY'), (4000, 'SELL')])
+        self.assertAlmostEqual(backtester.capital, settings.INITIAL_CAPITAL * 1.2)
+
+    def test_stop_loss_fills_at_level(self):
+        signals = self.bars([100, 101, 99, 96], [100, 99, 97, 90], [1.0, 0, 0, 0], opens=[100, 100, 98, 96])
+        backtester = self.make_backtester(stop_loss=0.05)
+        backtester.simulate_trades(signals)
+        exit_trade = backtester.trades[-1]
+        self.assertEqual(exit_trade['reason'], 'stop_loss')
+        self.assertEqual(exit_trade['timestamp'], 3000)
+        self.assertAlmostEqual(exit_trade['price'], 95.0)
+        self.assertAlmostEqual(backtester.capital, settings.INITIAL_CAPITAL * 0.95)
+
+    def test_stop_gap_fills_at_open(self):
+        signals = self.bars([100, 101, 92], [100, 99, 88], [1.0, 0, 0], opens=[100, 100, 91])
+        backtester = self.make_backtester(stop_loss=0.05)
+        backtester.simulate_trades(signals)
+        self.assertAlmostEqual(backtester.trades[-1]['price'], 91.0)
+
+    def test_gap_beyond_a_level_decides_bars_touching_both(self):
+        # Opens above the target: take-profit at the open, even though the low hits the stop
+        signals = self.bars([100, 116], [100, 90], [1.0, 0], opens=[100, 115])
+        backtester = self.make_backtester(stop_loss=0.05, take_profit=0.1, intrabar_interval='1m')
+        backtester.resolve_bar = MagicMock()
+        backtester.simulate_trades(signals)
+        self.assertEqual(backtester.trades[-1]['reason'], 'take_profit')
+        self.assertAlmostEqual(backtester.trades[-1]['price'], 115.0)
+        backtester.resolve_bar.assert_not_called()
+
+        # Opens below the stop: stop-loss at the open, even though the high hits the target
+        signals = self.bars([100, 116], [100, 90], [1.0, 0], opens=[100, 92])
+        backtester = self.make_backtester(stop_loss=0.05, take_profit=0.1, intrabar_interval='1m')
+        backtester.resolve_bar = MagicMock()
+        backtester.simulate_trades(signals)
+        self.assertEqual(backtester.trades[-1]['reason'], 'stop_loss')
+        self.assertAlmostEqual(backtester.trades[-1]['price'], 92.0)
+        backtester.resolve_bar.assert_not_called()
+
+    def test_take_profit_before_sell_signal(self):
+        signals = self.bars([100, 104, 111, 120], [100, 100, 103, 110], [1.0, 0, 0, -1.0])
+        backtester = self.make_backtester(take_profit=0.1, maker_fee=0.001)
+        backtester.simulate_trades(signals)
+        exit_trade = backtester.trades[-1]
+        self.assertEqual(exit_trade['reason'], 'take_profit')
+        self.assertAlmostEqual(exit_trade['price'], 110.0)
+        self.assertAlmostEqual(backtester.capital, settings.INITIAL_CAPITAL * 1.1 * 0.999)
+        self.assertEqual(len(backtester.trades), 2)
+
+    def test_trailing_stop_follows_highs(self):
+        signals = self.bars([100, 110, 120, 119, 115], [100, 105, 115, 115, 107], [1.0, 0, 0, 0, 0],
+                            opens=[100, 105, 115, 119, 115])
+        backtester = self.make_backtester(trailing_stop=0.05)
+        backtester.simulate_trades(signals)
+        exit_trade = backtester.trades[-1]
+        self.assertEqual(exit_trade['reason'], 'trailing_stop')
+        self.assertEqual(exit_trade['timestamp'], 4000)
+        self.assertAlmostEqual(exit_trade['price'], 120 * 0.95)
+
+    def test_ambiguous_bar_assumes_stop_first(self):
+        signals = self.bars([100, 120], [100, 80], [1.0, 0])
+        backtester = self.make_backtester(stop_loss=0.05, take_profit=0.05)
+        backtester.simulate_trades(signals)
+        self.assertEqual(backtester.trades[-1]['reason'], 'stop_loss')
+
+    def test_reenters_after_stop(self):
+        signals = self.bars([100, 100, 100, 100], [100, 90, 100, 100], [1.0, 1.0, 0, -1.0])
+        backtester = self.make_backtester(stop_loss=0.05)
+        backtester.simulate_trades(signals)
+        self.assertEqual([t['side'] for t in backtester.trades], ['BUY', 'SELL', 'BUY', 'SELL'])
+        self.assertEqual(backtester.trades[2]['timestamp'], 1000)
+
+    def test_fees_and_slippage(self):
+        signals = self.bars([100, 100], [100, 100], [1.0, -1.0])
+        backtester = self.make_backtester(taker_fee=0.001, slippage_bps=10)
+        backtester.simulate_trades(signals)
+        buy, sell = backtester.trades
+        self.assertAlmostEqual(buy['price'], 100.1)
+        self.assertAlmostEqual(sell['price'], 99.9)
+        expected = settings.INITIAL_CAPITAL / (100.1 * 1.001) * 99.9 * 0.999
+        self.assertAlmostEqual(backtester.capital, expected)
+
+
+
+def minute_klines(open_time, highs, lows):
+    return [[open_time + 60000 * i, str(l), str(h), str(l), str(h), '1', open_time + 60000 * (i + 1) - 1,
+             '1', 1, '1', '1', '0'] for i, (h, l) in enumerate(zip(highs, lows))]
+
+
+class TestBacktesterIntrabar(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp_dir.name)
+        self.client = MagicMock(spec=BinanceClient)
+        # Bar 1 (15m, open 900000) touches both the 5% stop and the 5% target
+        self.signals = pd.DataFrame({
+            'timestamp': [0, 900000],
+            'open': [100.0, 100.0],
+            'high': [100.0, 110.0],
+            'low': [100.0, 90.0],
+            'close': [100.0, 100.0],
+            'positions': [1.0, 0.0],
+        })
+        # Rally to the target in the third minute, sell-off in the tenth
+        highs = [101, 103, 106] + [104] * 12
+        lows = [99, 100, 102] + [101] * 6 + [90] + [95] * 5
+        self.minutes = minute_klines(900000, highs, lows)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_backtester(self, **kwargs):
+        return Backtester(self.client, MagicMock(), 'BTCUSDT', '15m', '1 day ago UTC', 'unix',
+                          stop_loss=0.05, take_profit=0.05, **kwargs)
+
+    def test_resolves_from_store_without_api_calls(self):
+        self.store.append('BTCUSDT', '1m', self.minutes)
+        backtester = self.make_backtester(intrabar_interval='1m', kline_store=self.store)
+        backtester.simulate_trades(self.signals)
+        self.assertEqual(backtester.trades[-1]['reason'], 'take_profit')
+        self.client.get_historical_klines.assert_not_called()
+
+    def test_fetches_only_the_ambiguous_bar(self):
+        self.client.get_historical_klines.return_value = self.minutes
+        backtester = self.make_backtester(intrabar_interval='1m', kline_store=self.store)
+        backtester.simulate_trades(self.signals)
+        self.assertEqual(backtester.trades[-1]['reason'], 'take_profit')
+        self.client.get_historical_klines.assert_called_once_with('BTCUSDT', '1m', 900000, 1799999)
+        # Fetched klines are kept for the next run
+        self.assertEqual(len(self.store.load('BTCUSDT', '1m')), 15)
+
+    def test_store_is_read_and_written_once_per_run(self):
+        # Two ambiguous bars, neither stored yet
+        signals = pd.DataFrame({
+            'timestamp': [0, 900000, 1800000, 2700000],
+            'open': [100.0, 100.0, 100.0, 100.0],
+            'high': [100.0, 110.0, 100.0, 110.0],
+            'low': [100.0, 90.0, 100.0, 90.0],
+            'close': [100.0, 100.0, 100.0, 100.0],
+            'positions': [1.0, 0.0, 1.0, 0.0],
+        })
+        highs = [101, 103, 106] + [104] * 12
+        lows = [99, 100, 102] + [101] * 6 + [90] + [95] * 5
+        self.client.get_historical_klines.side_effect = lambda symbol, interval, start, end: minute_klines(start, highs, lows)
+        store = MagicMock(wraps=self.store)
+        backtester = self.make_backtester(intrabar_interval='1m', kline_store=store)
+        backtester.simulate_trades(signals)
+        self.assertEqual([trade['reason'] for trade in backtester.trades[1::2]], ['take_profit', 'take_profit'])
+        self.assertEqual(store.load.call_count, 1)
+        self.assertEqual(store.append.call_count, 1)
+        self.assertEqual(len(self.store.load('BTCUSDT', '1m')), 30)
+
+    def test_stop_first_inside_the_bar(self):
+        lows = [99, 94] + [100] * 13
+        highs = [101, 100] + [106] * 13
+        self.client.get_historical_klines.return_value = minute_klines(900000, highs, lows)
+        backtester = self.make_backtester(intrabar_interval='1m')
+        backtester.simulate_trades(self.signals)
+        self.assertEqual(backtester.trades[-1]['reason'], 'stop_loss')
+
+
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestBacktesterIndicatorTables(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp_dir.name)
+        self.indicators = IndicatorStore(self.store)
+        self.klines = random_klines(600, interval_ms=900000)
+        self.store.append('BTCUSDT', '15m', self.klines)
+        for strategy in (MACDStrategy(), RSIStrategy(), VWAPStrategy()):
+            self.indicators.update('BTCUSDT', '15m', strategy.indicator())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_backtest(self, strategy, klines, indicator_store=None):
+        client = MagicMock(spec=BinanceClient)
+        # The API also returns the kline that is still open
+        still_open = list(klines[-1])
+        still_open[0], still_open[6] = klines[-1][0] + 900000, 2 ** 62
+        client.get_historical_klines.return_value = klines + [still_open]
+        backtester = Backtester(client, strategy, 'BTCUSDT', '15m', '1 day ago UTC', 'unix',
+                                indicator_store=indicator_store, log_trades=False)
+        backtester.run()
+        return backtester
+
+    @staticmethod
+    def spy(strategy):
+        """Record (whether stored columns were used, signals) for every generate_signals call"""
+        calls = []
+        generate_signals = strategy.generate_signals
+
+        def wrapper(klines, indicators=None):
+            signals = generate_signals(klines, indicators=indicators)
+            calls.append((indicators is not None, signals))
+            return signals
+
+        strategy.generate_signals = wrapper
+        return strategy, calls
+
+    def test_cached_and_fresh_runs_trade_identically(self):
+        for strategy_class in (MACDStrategy, RSIStrategy, VWAPStrategy):
+            # From the first stored bar, and a date range starting later in the stored history
+            for klines in (self.klines, self.klines[200:]):
+                with self.subTest(strategy=strategy_class.__name__, bars=len(klines)):
+                    strategy, cached_calls = self.spy(strategy_class())
+                    cached = self.run_backtest(strategy, klines, self.indicators)
+                    strategy, fresh_calls = self.spy(strategy_class())
+                    fresh = self.run_backtest(strategy, klines)
+                    # Windowed tables answer any range, the MACD EMAs only from their first row
+                    recursive = strategy.indicator().recursive
+                    self.assertEqual([used for used, _ in cached_calls], [len(klines) == len(self.klines) or not recursive])
+                    # The open kline is left out
+                    self.assertEqual(len(fresh_calls[0][1]), len(klines))
+                    np.testing.assert_array_equal(cached_calls[0][1]['signal'], fresh_calls[0][1]['signal'])
+                    self.assertTrue(fresh.trades)
+                    self.assertEqual(cached.trades, fresh.trades)
+                    self.assertEqual(cached.capital, fresh.capital)
+
+    def test_date_range_backtest_reads_the_table(self):
+        strategy, calls = self.spy(RSIStrategy())
+        backtester = self.run_backtest(strategy, self.klines[-96:], self.indicators)
+        self.assertEqual([used for used, _ in calls], [True])
+        fresh = RSIStrategy().generate_signals(self.klines[-96:])
+        np.testing.assert_allclose(calls[0][1]['rsi'], fresh['rsi'], rtol=1e-12)
+        self.assertEqual(backtester.capital, self.run_backtest(RSIStrategy(), self.klines[-96:]).capital)
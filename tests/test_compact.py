@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.data.compact import CompactKlineStore, decode_klines, encode_klines, read_compact
+from src.data.kline_store import KLINE_DTYPE, klines_to_array
+
+
+def random_klines(n, start=1_700_000_000_000, interval_ms=60000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.round(30000 + rng.normal(0, 20, n).cumsum(), 2)
+    open_ = np.round(np.concatenate([[close[0]], close[:-1]]) + rng.integers(-3, 4, n) / 100, 2)
+    high = np.round(np.maximum(open_, close) + rng.integers(0, 1000, n) / 100, 2)
+    low = np.round(np.minimum(open_, close) - rng.integers(0, 1000, n) / 100, 2)
+    volume = np.round(rng.uniform(0, 50, n), 5)
+    quote = np.round(volume * close, 8)
+    open_times = start + interval_ms * np.arange(n)
+    open_times[n // 2:] += 5 * interval_ms  # A gap
+    return [
+        [int(t), f"{o:.2f}", f"{h:.2f}", f"{l:.2f}", f"{c:.2f}", f"{v:.5f}", int(t) + interval_ms - 1,
+         f"{q:.8f}", int(rng.integers(0, 5000)), f"{v / 2:.5f}", f"{q / 2:.8f}", '0']
+        for t, o, h, l, c, v, q in zip(open_times, open_, high, low, close, volume, quote)
+    ]
+
+
+class TestFixedPointEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.records = klines_to_array(random_klines(2000))
+
+    def test_round_trip_is_exact_at_tick_precision(self):
+        meta, encoded = encode_klines(self.records, '1m', 0.01, 0.00001)
+        decoded = decode_klines(meta, encoded)
+        for name in ('open_time', 'close_time', 'number_of_trades', 'open', 'high', 'low', 'close', 'volume'):
+            np.testing.assert_array_equal(decoded[name], self.records[name], err_msg=name)
+        for name in ('quote_asset_volume', 'taker_buy_quote_asset_volume', 'taker_buy_base_asset_volume'):
+            np.testing.assert_allclose(decoded[name], self.records[name], rtol=1e-12, err_msg=name)
+
+    def test_encoding_is_compact(self):
+        _, encoded = encode_klines(self.records, '1m', 0.01, 0.00001)
+        # Regular close times collapse to single bytes, price moves fit in two
+        self.assertEqual(encoded.dtype['duration_delta'], np.int8)
+        self.assertEqual(encoded.dtype['close_delta'], np.int16)
+        self.assertLess(encoded.itemsize, KLINE_DTYPE.itemsize / 2)
+
+    def test_values_finer_than_the_tick_are_not_rounded(self):
+        self.records['close'][10] = 30000.123
+        self.records['volume'][11] = 1.0000001
+        meta, encoded = encode_klines(self.records, '1m', 0.01, 0.00001)
+        self.assertEqual(meta['price_scale'], 1000)
+        self.assertEqual(meta['qty_scale'], 10 ** 7)
+        decoded = decode_klines(meta, encoded)
+        np.testing.assert_array_equal(decoded['close'], self.records['close'])
+        np.testing.assert_array_equal(decoded['volume'], self.records['volume'])
+
+    def test_decode_selected_columns(self):
+        meta, encoded = encode_klines(self.records, '1m', 0.01, 0.00001)
+        decoded = decode_klines(meta, encoded, columns=['close'])
+        np.testing.assert_array_equal(decoded['close'], self.records['close'])
+        self.assertFalse(decoded['volume'].any())
+
+
+class TestCompactKlineStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filters = {'BTCUSDT': {'tick_size': 0.01, 'step_size': 0.00001}}
+        self.store = CompactKlineStore(self.tmp_dir.name, filters=self.filters)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_append_and_memory_map(self):
+        klines = random_klines(300)
+        self.store.append('BTCUSDT', '1m', klines[:200])
+        self.store.append('BTCUSDT', '1m', klines[150:])
+        records = self.store.load('BTCUSDT', '1m')
+        np.testing.assert_array_equal(records, klines_to_array(klines))
+
+        meta, encoded = read_compact(self.store.path('BTCUSDT', '1m'))
+        self.assertIsInstance(encoded, np.memmap)
+        self.assertEqual(meta['count'], 300)
+        self.assertLess(os.path.getsize(self.store.path('BTCUSDT', '1m')), 300 * KLINE_DTYPE.itemsize / 2)
+
+    def test_file_tick_size_does_not_round_new_klines(self):
+        klines = random_klines(20)
+        self.store.append('BTCUSDT', '1m', klines[:10])
+        # The symbol's tick size has since become finer
+        klines[15][4] = '30001.125'
+        self.store.append('BTCUSDT', '1m', klines[10:])
+        self.assertEqual(self.store.load('BTCUSDT', '1m')['close'][15], 30001.125)
+
+    def test_serves_klines_like_the_api(self):
+        klines = random_klines(10)
+        self.store.append('BTCUSDT', '1m', klines)
+        served = self.store.get_historical_klines('BTCUSDT', '1m', klines[2][0], klines[4][0])
+        self.assertEqual([kline[0] for kline in served], [kline[0] for kline in klines[2:5]])
+        self.assertEqual(float(served[0][4]), float(klines[2][4]))
+
+    def test_missing_filters(self):
+        with self.assertRaises(ValueError):
+            self.store.append('ETHUSDT', '1m', random_klines(3))
+        self.assertEqual(len(self.store.load('ETHUSDT', '1m')), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
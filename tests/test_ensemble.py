@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from src.data.kline_store import klines_to_array
+from src.trading.ensemble import EnsembleStrategy, SharedIndicators, VectorEnsembleStrategy
+from src.trading.macd_strategy import MACDStrategy
+from src.trading.strategy import (
+    MovingAverageCrossoverStrategy, RSIStrategy, BollingerBandsStrategy, VATSStrategy, YOLOStrategy,
+)
+from src.trading.vector_strategy import vectorize_strategy
+from src.trading.vwap_strategy import VWAPStrategy
+from tests.test_vector_strategy import make_klines
+
+
+def members():
+    return [
+        MovingAverageCrossoverStrategy(5, 20),
+        RSIStrategy(rsi_period=14),
+        BollingerBandsStrategy(window=20),
+        VATSStrategy(lookback_period=20, threshold=0.1, max_volatility=0.02),
+        MACDStrategy(5, 20, 9),
+        VWAPStrategy(window=20),
+        YOLOStrategy(dip_threshold=1, rip_threshold=1),
+    ]
+
+
+class TestEnsembleStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.klines = make_klines(300, 7)
+        self.ensemble = EnsembleStrategy(members())
+
+    def test_member_signals_match_their_strategies(self):
+        _, signals = self.ensemble.member_signals(self.klines)
+        for name, member in self.ensemble.members.items():
+            expected = member.generate_signals(self.klines)['signal'].to_numpy()
+            np.testing.assert_array_equal(signals[name], expected, err_msg=name)
+
+    def test_weighted_vote(self):
+        ensemble = EnsembleStrategy(
+            {'rsi': RSIStrategy(), 'macd': MACDStrategy(5, 20, 9), 'vwap': VWAPStrategy()},
+            weights={'macd': 2.0}, threshold=0.5,
+        )
+        df = ensemble.generate_signals(self.klines)
+        score = (df['rsi_signal'] + 2 * df['macd_signal'] + df['vwap_signal']) / 4
+        np.testing.assert_allclose(df['score'], score)
+        np.testing.assert_array_equal(df['signal'], np.where(score > 0.5, 1, np.where(score < -0.5, -1, 0)))
+        np.testing.assert_array_equal(df['positions'].iloc[1:], np.diff(df['signal']))
+
+    def test_bar_by_bar_matches_batch(self):
+        batch = self.ensemble.generate_signals(self.klines)
+        vector = vectorize_strategy(self.ensemble, 1)
+        self.assertIsInstance(vector, VectorEnsembleStrategy)
+        signals, scores = [], []
+        for kline in self.klines:
+            vector.update(np.array([[float(value) for value in kline[1:6]]]))
+            signals.append(int(vector.signal[0]))
+            scores.append(vector.score[0])
+        np.testing.assert_array_equal(signals, batch['signal'])
+        np.testing.assert_allclose(scores, batch['score'])
+
+    def test_state_round_trip(self):
+        vector = self.ensemble.vectorize(2)
+        bars = np.array([[float(value) for value in kline[1:6]] for kline in self.klines])
+        for bar in bars[:100]:
+            vector.update(np.vstack([bar, bar]))
+        restored = self.ensemble.vectorize(2)
+        restored.set_state(vector.get_state())
+        self.assertEqual(restored.get_params(), vector.get_params())
+        for bar in bars[100:]:
+            vector.update(np.vstack([bar, bar]))
+            restored.update(np.vstack([bar, bar]))
+        np.testing.assert_array_equal(restored.signal, vector.signal)
+        np.testing.assert_allclose(restored.score, vector.score)
+
+    def test_one_pass_computes_each_shared_indicator_once(self):
+        computed, requested = [], []
+        get = SharedIndicators.get
+
+        def counting_get(shared, key, compute):
+            requested.append(key)
+            return get(shared, key, lambda: computed.append(key) or compute())
+
+        parse = MagicMock(wraps=klines_to_array)
+        for member in self.ensemble.members.values():
+            member.generate_signals = MagicMock(side_effect=AssertionError("member parsed the klines"))
+        with patch.object(SharedIndicators, 'get', counting_get), \
+                patch('src.trading.ensemble.klines_to_array', parse):
+            self.ensemble.generate_signals(self.klines)
+
+        parse.assert_called_once()
+        self.assertEqual(len(computed), len(set(computed)))
+        # The MA long average and the Bollinger middle band share one rolling mean of the closes
+        self.assertEqual(computed.count(('mean', 'close', 20)), 1)
+        self.assertGreater(requested.count(('mean', 'close', 20)), 1)
+        self.assertGreater(len(requested), len(computed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+import numpy as np
+from src.data.indicators import IndicatorStore, MACDIndicator, RSIIndicator, VWAPIndicator, parse_indicators
+from src.data.kline_store import KlineStore, klines_to_array
+from src.trading.live_engine import LiveSignalEngine
+from src.trading.macd_strategy import MACDStrategy
+from src.trading.vector_strategy import VectorMACDStrategy
+from tests.test_compact import random_klines
+
+
+class TestIndicatorStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp_dir.name)
+        self.indicators = IndicatorStore(self.store)
+        self.klines = random_klines(600)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def full_table(self, indicator):
+        return indicator.compute(klines_to_array(self.klines))
+
+    def test_incremental_updates_match_full_computation(self):
+        for indicator in (MACDIndicator(12, 26, 9), RSIIndicator(14), VWAPIndicator(20)):
+            with self.subTest(indicator=indicator.key()):
+                self.store.save('BTCUSDT', '1m', klines_to_array([]))
+                for end in (100, 101, 350, 600):
+                    self.store.append('BTCUSDT', '1m', self.klines[:end])
+                    table = self.indicators.update('BTCUSDT', '1m', indicator)
+                expected = self.full_table(indicator)
+                self.assertEqual(len(table), 600)
+                for column in indicator.columns:
+                    np.testing.assert_allclose(table[column], expected[column], rtol=1e-9, err_msg=column)
+
+    def test_only_new_bars_are_computed(self):
+        indicator = MACDIndicator()
+        self.store.append('BTCUSDT', '1m', self.klines[:500])
+        self.indicators.update('BTCUSDT', '1m', indicator)
+        self.store.append('BTCUSDT', '1m', self.klines[500:])
+
+        computed = []
+        compute = indicator.compute
+        indicator.compute = lambda records, seed=None: computed.append(len(records)) or compute(records, seed)
+        self.indicators.update('BTCUSDT', '1m', indicator)
+        self.assertEqual(computed, [100])
+
+    def test_rebuilds_when_history_changes(self):
+        indicator = RSIIndicator()
+        self.store.append('BTCUSDT', '1m', self.klines[300:])
+        self.indicators.update('BTCUSDT', '1m', indicator)
+        # Older history prepended by a sync
+        self.store.append('BTCUSDT', '1m', self.klines[:300])
+        table = self.indicators.update('BTCUSDT', '1m', indicator)
+        np.testing.assert_allclose(table['rsi'], self.full_table(indicator)['rsi'], rtol=1e-9)
+
+    def test_strategies_read_stored_columns(self):
+        strategy = MACDStrategy()
+        self.store.append('BTCUSDT', '1m', self.klines)
+        self.indicators.update('BTCUSDT', '1m', strategy.indicator())
+
+        window = self.klines[-200:]
+        columns = self.indicators.lookup('BTCUSDT', '1m', strategy.indicator(), [kline[0] for kline in window])
+        stored = strategy.generate_signals(window, indicators=columns)
+        full = strategy.generate_signals(self.klines).iloc[-200:]
+        np.testing.assert_allclose(stored['signal_line'], full['signal_line'], rtol=1e-9)
+        np.testing.assert_array_equal(stored['signal'].to_numpy(), full['signal'].to_numpy())
+
+        missing = self.indicators.lookup('BTCUSDT', '1m', strategy.indicator(), [window[-1][0] + 60000])
+        self.assertIsNone(missing)
+
+    def test_live_engine_seeds_from_table(self):
+        self.store.append('BTCUSDT', '1m', self.klines[:-1])
+        self.indicators.update('BTCUSDT', '1m', MACDIndicator())
+
+        seeded = LiveSignalEngine(VectorMACDStrategy(1), ['BTCUSDT'], '1m', indicator_store=self.indicators)
+        self.assertEqual(seeded.seed_from_indicators(), 1)
+        self.assertEqual(seeded.last_open_time[0], self.klines[-2][0])
+        seeded.feed_history({'BTCUSDT': self.klines[-1:]})
+
+        replayed = LiveSignalEngine(VectorMACDStrategy(1), ['BTCUSDT'], '1m')
+        replayed.feed_history({'BTCUSDT': self.klines})
+        np.testing.assert_allclose(seeded.strategy.signal_line, replayed.strategy.signal_line, rtol=1e-9)
+        self.assertEqual(seeded.strategy.signal[0], replayed.strategy.signal[0])
+
+    def test_parse_indicators(self):
+        indicators = parse_indicators('macd:5:10:3, vwap:30')
+        self.assertEqual([indicator.key() for indicator in indicators], ['macd_5_10_3', 'vwap_30'])
+        with self.assertRaises(ValueError):
+            parse_indicators('ichimoku:9')
+
+
+if __name__ == '__main__':
+    unittest.main()
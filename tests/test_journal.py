@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from src.trading.backtest import Backtester
+from src.trading.journal import TradeJournal, TRADE_DTYPE, read_journal, journal_to_dataframe, export_journal
+
+
+class TestTradeJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'trades.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip_across_buffer_flushes(self):
+        with TradeJournal(self.path, buffer_size=2) as journal:
+            for i in range(5):
+                journal.record(1000 + i, 'BTCUSDT', 'BUY' if i % 2 == 0 else 'SELL', 100.0 + i, 0.5, fee=0.1,
+                               strategy='RSIStrategy')
+        trades = read_journal(self.path)
+        self.assertEqual(len(trades), 5)
+        np.testing.assert_array_equal(trades['timestamp'], np.arange(1000, 1005))
+        np.testing.assert_array_equal(trades['side'], [1, -1, 1, -1, 1])
+        np.testing.assert_allclose(trades['price'], 100.0 + np.arange(5))
+
+        df = journal_to_dataframe(trades)
+        self.assertEqual(df['symbol'].tolist(), ['BTCUSDT'] * 5)
+        self.assertEqual(df['side'].iloc[1], 'SELL')
+        self.assertEqual(df['strategy'].iloc[0], 'RSIStrategy')
+
+    def test_reopen_appends_and_truncates_torn_record(self):
+        with TradeJournal(self.path) as journal:
+            journal.record(1, 'ETHUSDT', 'BUY', 10.0, 1.0)
+        with open(self.path, 'ab') as f:
+            f.write(b'\x01' * 7)  # A crash halfway through a record
+
+        with TradeJournal(self.path) as journal:
+            trades = np.zeros(2, dtype=TRADE_DTYPE)
+            trades['timestamp'] = [2, 3]
+            trades['symbol'] = b'ETHUSDT'
+            trades['side'] = -1
+            journal.extend(trades)
+
+        np.testing.assert_array_equal(read_journal(self.path)['timestamp'], [1, 2, 3])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a journal at all')
+        with self.assertRaises(ValueError):
+            read_journal(self.path)
+
+    def test_export_csv(self):
+        with TradeJournal(self.path) as journal:
+            journal.record(1, 'BTCUSDT', 'BUY', 100.0, 2.0, fee=0.2)
+            journal.record(2, 'BTCUSDT', 'SELL', 101.0, 2.0, fee=0.0004, fee_asset='BNB')
+        output = os.path.join(self.tmpdir, 'trades.csv')
+        export_journal(self.path, output)
+        df = pd.read_csv(output)
+        self.assertEqual(df.loc[0, 'symbol'], 'BTCUSDT')
+        self.assertEqual(df.loc[0, 'side'], 'BUY')
+        self.assertAlmostEqual(df.loc[0, 'fee'], 0.2)
+        self.assertEqual(df['fee_asset'].fillna('').tolist(), ['', 'BNB'])
+
+    def test_backtester_records_trades(self):
+        signals = pd.DataFrame({
+            'timestamp': [1, 2, 3],
+            'close': [100.0, 110.0, 120.0],
+            'positions': [1.0, 0.0, -1.0],
+        })
+        with TradeJournal(self.path) as journal:
+            strategy = MagicMock()
+            backtester = Backtester(MagicMock(), strategy, 'BTCUSDT', '1h', '', 'unix', journal=journal)
+            backtester.simulate_trades(signals)
+        trades = read_journal(self.path)
+        np.testing.assert_array_equal(trades['timestamp'], [1, 3])
+        np.testing.assert_array_equal(trades['side'], [1, -1])
+        np.testing.assert_allclose(trades['price'], [100.0, 120.0])
+        self.assertAlmostEqual(trades['quantity'][1], backtester.initial_capital / 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.data.kline_store import KlineStore, klines_to_array, array_to_klines
+
+
+def make_klines(open_times, interval_ms=60000):
+    return [[t, '100.5', '101', '100', '100.25', '3.5', t + interval_ms - 1, '350', 7, '1.5', '150', '0']
+            for t in open_times]
+
+
+class TestKlineStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        klines = make_klines([0, 60000])
+        records = klines_to_array(klines)
+        self.assertEqual(records['close'].tolist(), [100.25, 100.25])
+        self.assertEqual(records['number_of_trades'].tolist(), [7, 7])
+        self.assertEqual(array_to_klines(records)[1][0], 60000)
+        self.assertEqual(len(array_to_klines(records)[0]), 12)
+
+    def test_append_sorts_and_deduplicates(self):
+        self.store.append('BTCUSDT', '1m', make_klines([120000, 0]))
+        merged = self.store.append('BTCUSDT', '1m', make_klines([60000, 120000]))
+        self.assertEqual(merged['open_time'].tolist(), [0, 60000, 120000])
+        self.assertEqual(self.store.load('BTCUSDT', '1m')['open_time'].tolist(), [0, 60000, 120000])
+
+    def test_appending_a_tail_keeps_the_stored_bytes(self):
+        self.store.append('BTCUSDT', '1m', make_klines(np.arange(1000) * 60000))
+        path = self.store.path('BTCUSDT', '1m')
+        with open(path, 'rb') as f:
+            before = f.read()
+        inode = os.stat(path).st_ino
+
+        merged = self.store.append('BTCUSDT', '1m', make_klines(np.arange(1000, 1010) * 60000))
+        self.assertEqual(os.stat(path).st_ino, inode)  # Not replaced by a rewritten copy
+        with open(path, 'rb') as f:
+            after = f.read()
+        header_size = len(before) - 1000 * merged.dtype.itemsize
+        self.assertEqual(after[header_size:len(before)], before[header_size:])
+        self.assertEqual(len(after), len(before) + 10 * merged.dtype.itemsize)
+        np.testing.assert_array_equal(merged['open_time'], np.arange(1010) * 60000)
+        np.testing.assert_array_equal(np.load(path)['open_time'], np.arange(1010) * 60000)
+
+    def test_overlapping_append_falls_back_to_merge(self):
+        self.store.append('BTCUSDT', '1m', make_klines([0, 60000, 120000]))
+        self.assertFalse(self.store.append_tail('BTCUSDT', '1m', klines_to_array(make_klines([120000, 180000]))))
+        merged = self.store.append('BTCUSDT', '1m', make_klines([120000, 180000]))
+        self.assertEqual(merged['open_time'].tolist(), [0, 60000, 120000, 180000])
+
+    def test_get_historical_klines_range(self):
+        self.store.append('BTCUSDT', '1m', make_klines(np.arange(10) * 60000))
+        klines = self.store.get_historical_klines('BTCUSDT', '1m', 120000, 240000)
+        self.assertEqual([kline[0] for kline in klines], [120000, 180000, 240000])
+        self.assertEqual(self.store.get_historical_klines('ETHUSDT', '1m', 0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from src.utils.latency import LogHistogram, LatencyTracker
+
+
+class TestLogHistogram(unittest.TestCase):
+
+    def test_small_values_are_exact(self):
+        histogram = LogHistogram()
+        for value in range(10):
+            histogram.record(value)
+        self.assertEqual(histogram.percentile(50), 4)
+        self.assertEqual(histogram.percentile(100), 9)
+
+    def test_percentiles_within_bucket_precision(self):
+        rng = np.random.default_rng(1)
+        values = rng.lognormal(mean=11, sigma=1, size=20000).astype(np.int64)
+        histogram = LogHistogram()
+        for value in values:
+            histogram.record(value)
+        for q in (50, 99, 99.9):
+            expected = np.percentile(values, q)
+            self.assertAlmostEqual(histogram.percentile(q) / expected, 1, delta=0.07)
+        self.assertEqual(histogram.percentile(100), values.max())
+
+    def test_memory_is_fixed(self):
+        histogram = LogHistogram()
+        size = histogram.counts.nbytes
+        histogram.record(2 ** 50)
+        histogram.record(1)
+        self.assertEqual(histogram.counts.nbytes, size)
+        self.assertEqual(histogram.total, 2)
+
+    def test_tracker_report(self):
+        tracker = LatencyTracker(dump_interval=None, exchange_clock=False)
+        tracker.record('submit_to_ack', 2_000_000)
+        tracker.record_since_close('close_to_ack', 0)
+        report = tracker.report()
+        self.assertEqual(report['submit_to_ack']['count'], 1)
+        self.assertAlmostEqual(report['submit_to_ack']['p50_us'], 2000, delta=130)
+        self.assertEqual(report['close_to_ack']['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
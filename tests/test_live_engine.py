@@ -0,0 +1,173 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from src.trading.live_engine import LiveSignalEngine, order_fee
+from src.trading.vector_strategy import VectorYOLOStrategy, VectorMACDStrategy
+
+
+def kline_message(symbol, open_time, open_, close, closed=True):
+    return {
+        'stream': f"{symbol.lower()}@kline_15m",
+        'data': {
+            'e': 'kline',
+            's': symbol,
+            'k': {'t': open_time, 'T': open_time + 899999, 'o': str(open_), 'h': str(max(open_, close)), 'l': str(min(open_, close)),
+                  'c': str(close), 'v': '10', 'x': closed},
+        },
+    }
+
+
+class TestLiveSignalEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.on_signal = MagicMock()
+        self.symbols = ['BTCUSDT', 'ETHUSDT']
+        self.engine = LiveSignalEngine(
+            VectorYOLOStrategy(2, dip_threshold=3, rip_threshold=3),
+            self.symbols,
+            '15m',
+            on_signal=self.on_signal,
+        )
+
+    def test_streams(self):
+        self.assertEqual(self.engine.streams(), ['btcusdt@kline_15m', 'ethusdt@kline_15m'])
+
+    def test_flushes_when_all_symbols_reported(self):
+        self.engine.handle_message(kline_message('BTCUSDT', 0, 100, 101))
+        self.assertEqual(self.engine.strategy.bars.tolist(), [0, 0])
+        self.engine.handle_message(kline_message('ETHUSDT', 0, 100, 101))
+        self.assertEqual(self.engine.strategy.bars.tolist(), [1, 1])
+
+    def test_ignores_open_bars(self):
+        self.engine.handle_message(kline_message('BTCUSDT', 0, 100, 90, closed=False))
+        self.assertFalse(self.engine.pending.any())
+
+    def test_open_bar_of_next_interval_flushes_silent_symbols(self):
+        self.engine.handle_message(kline_message('BTCUSDT', 0, 100, 101))
+        # ETHUSDT never sends its close; BTCUSDT's next bar is already updating
+        self.engine.handle_message(kline_message('BTCUSDT', 900000, 101, 102, closed=False))
+        self.assertEqual(self.engine.strategy.bars.tolist(), [1, 0])
+        self.assertFalse(self.engine.pending.any())
+        # Updates of the staged bar itself do not flush
+        self.engine.handle_message(kline_message('ETHUSDT', 900000, 100, 101))
+        self.engine.handle_message(kline_message('BTCUSDT', 900000, 101, 102, closed=False))
+        self.assertEqual(self.engine.pending.tolist(), [False, True])
+
+    def test_next_bar_flushes_stragglers(self):
+        self.engine.handle_message(kline_message('BTCUSDT', 0, 100, 101))
+        self.engine.handle_message(kline_message('BTCUSDT', 900000, 101, 90))
+        self.assertEqual(self.engine.strategy.bars.tolist(), [1, 0])
+        self.assertEqual(self.engine.pending_open_time, 900000)
+
+    def test_late_close_of_an_older_bar(self):
+        self.engine.handle_message(kline_message('BTCUSDT', 0, 100, 101))
+        self.engine.handle_message(kline_message('BTCUSDT', 900000, 101, 102))
+        # ETHUSDT's first close arrives after BTCUSDT staged the next bar
+        self.engine.handle_message(kline_message('ETHUSDT', 0, 100, 101))
+        np.testing.assert_array_equal(self.engine.last_open_time, [900000, -1])
+        self.assertEqual(self.engine.strategy.bars.tolist(), [2, 0])
+        self.assertEqual(self.engine.pending_open_time, 0)
+        self.engine.handle_message(kline_message('ETHUSDT', 900000, 101, 102))
+        np.testing.assert_array_equal(self.engine.last_open_time, [900000, 0])
+        self.assertEqual(self.engine.pending_open_time, 900000)
+
+    def test_late_close_of_a_symbol_staged_with_a_newer_bar(self):
+        self.engine.handle_message(kline_message('ETHUSDT', 900000, 100, 101))
+        self.engine.handle_message(kline_message('ETHUSDT', 0, 100, 101))
+        # The newer bar is evaluated, the older one dropped
+        self.assertEqual(self.engine.strategy.bars.tolist(), [0, 1])
+        np.testing.assert_array_equal(self.engine.last_open_time, [-1, 900000])
+        self.assertFalse(self.engine.pending.any())
+
+    def test_emits_position_changes(self):
+        for symbol in self.symbols:
+            self.engine.handle_message(kline_message(symbol, 0, 100, 101))
+        self.engine.handle_message(kline_message('BTCUSDT', 900000, 100, 90))
+        self.engine.handle_message(kline_message('ETHUSDT', 900000, 100, 100))
+        self.on_signal.assert_called_once_with('BTCUSDT', 1, 90.0, 900000)
+
+    def test_feed_history_aligns_symbols(self):
+        history = {
+            'BTCUSDT': [[0, '1', '1', '1', '1', '1'], [900000, '1', '1', '1', '1', '1']],
+            'ETHUSDT': [[900000, '1', '1', '1', '1', '1']],
+        }
+        self.engine.feed_history(history)
+        self.assertEqual(self.engine.strategy.bars.tolist(), [2, 1])
+        np.testing.assert_array_equal(self.engine.last_open_time, [900000, 900000])
+
+
+
+class TestOrderFee(unittest.TestCase):
+
+    def test_fees_are_journaled_in_the_quote_asset(self):
+        fills = [{'price': '100', 'commission': '0.1', 'commissionAsset': 'USDT'},
+                 {'price': '101', 'commission': '0.001', 'commissionAsset': 'BTC'}]
+        fee, fee_asset = order_fee('BTCUSDT', fills)
+        self.assertAlmostEqual(fee, 0.1 + 0.101)
+        self.assertEqual(fee_asset, '')
+
+    def test_third_asset_fees_keep_their_asset(self):
+        fills = [{'price': '100', 'commission': '0.0002', 'commissionAsset': 'BNB'}] * 2
+        fee, fee_asset = order_fee('BTCUSDT', fills)
+        self.assertAlmostEqual(fee, 0.0004)
+        self.assertEqual(fee_asset, 'BNB')
+
+
+class TestLiveSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'snapshot.npz')
+        rng = np.random.default_rng(0)
+        closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, 60))
+        self.history = {
+            'BTCUSDT': [[i * 900000, c, c, c, c, '1'] for i, c in enumerate(closes)],
+            'ETHUSDT': [[i * 900000, c / 2, c / 2, c / 2, c / 2, '1'] for i, c in enumerate(closes)],
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_engine(self, symbols, client=None):
+        return LiveSignalEngine(VectorMACDStrategy(len(symbols)), symbols, '15m', client=client,
+                                snapshot_path=self.path)
+
+    def test_snapshot_round_trip(self):
+        engine = self.make_engine(['BTCUSDT', 'ETHUSDT'])
+        engine.feed_history(self.history)
+        engine.save_snapshot()
+
+        restored = self.make_engine(['ETHUSDT', 'BTCUSDT', 'BNBUSDT'])
+        self.assertTrue(restored.load_snapshot())
+        np.testing.assert_allclose(restored.strategy.ema_slow[:2], engine.strategy.ema_slow[::-1])
+        np.testing.assert_array_equal(restored.strategy.bars, [60, 60, 0])
+        self.assertEqual(restored.last_open_time[2], -1)
+
+    def test_incompatible_snapshot_is_ignored(self):
+        engine = self.make_engine(['BTCUSDT'])
+        engine.save_snapshot()
+        other = LiveSignalEngine(VectorMACDStrategy(1, fast_period=5), ['BTCUSDT'], '15m', snapshot_path=self.path)
+        self.assertFalse(other.load_snapshot())
+
+    def test_resume_fetches_only_missed_bars(self):
+        engine = self.make_engine(['BTCUSDT'])
+        engine.feed_history({'BTCUSDT': self.history['BTCUSDT'][:40]})
+        engine.save_snapshot()
+
+        client = MagicMock()
+        # The last kline returned is still open and is dropped
+        client.get_historical_klines.return_value = self.history['BTCUSDT'][40:] + [[60 * 900000, 1, 1, 1, 1, 1]]
+        resumed = self.make_engine(['BTCUSDT'], client=client)
+        resumed.resume('1 day ago UTC')
+        client.get_historical_klines.assert_called_once_with('BTCUSDT', '15m', 40 * 900000)
+
+        full = self.make_engine(['BTCUSDT'])
+        full.feed_history({'BTCUSDT': self.history['BTCUSDT']})
+        np.testing.assert_allclose(resumed.strategy.signal_line, full.strategy.signal_line)
+        self.assertEqual(resumed.strategy.bars[0], 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from src.data.kline_store import klines_to_array
+from src.service.market_data import SEQUENCE, KlineRing, MarketDataClient, MarketDataServer, segment_name
+from tests.test_compact import random_klines
+
+
+READER = """
+import json, sys
+from src.service.market_data import MarketDataClient
+client = MarketDataClient(sys.argv[1])
+records = client.klines('BTCUSDT', '1m', 5)
+print(json.dumps([records['close'].tolist(), records.base is not None]))
+client.close()
+"""
+
+CRASHED_SERVER = """
+import sys
+from multiprocessing import resource_tracker
+from unittest.mock import MagicMock
+from src.service.market_data import KlineRing, MarketDataServer, segment_name
+# A server killed together with its resource tracker leaves its segment behind
+stale = KlineRing(segment_name('BTCUSDT', '1m', sys.argv[1]), capacity=4, create=True)
+resource_tracker.unregister(stale.shm._name, 'shared_memory')
+stale.shm.close()
+server = MarketDataServer(MagicMock(), ['BTCUSDT'], ['1m'], capacity=8, prefix=sys.argv[1])
+server.open()
+print(server.rings['BTCUSDT', '1m'].capacity)
+server.stop()
+"""
+
+
+def kline_message(symbol, interval, open_time, close, closed=True):
+    return {'stream': f"{symbol.lower()}@kline_{interval}", 'data': {'e': 'kline', 's': symbol, 'k': {
+        't': open_time, 'T': open_time + 59999, 'i': interval, 'o': close, 'h': close, 'l': close, 'c': close,
+        'v': '1', 'q': '1', 'n': 1, 'V': '0', 'Q': '0', 'x': closed,
+    }}}
+
+
+class TestKlineRing(unittest.TestCase):
+
+    def setUp(self):
+        self.prefix = f"test{os.getpid()}"
+        self.ring = KlineRing(segment_name('BTCUSDT', '1m', self.prefix), capacity=8, create=True)
+        self.records = klines_to_array(random_klines(20, interval_ms=60000))
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_latest_bars_are_contiguous_after_wrapping(self):
+        for start in range(0, 20, 3):
+            self.ring.append(self.records[start:start + 3])
+        self.assertEqual(self.ring.count, 20)
+        self.assertEqual(len(self.ring), 8)
+        np.testing.assert_array_equal(self.ring.view(), self.records[-8:])
+        np.testing.assert_array_equal(self.ring.view(3), self.records[-3:])
+        np.testing.assert_array_equal(self.ring.read(5), self.records[-5:])
+        # A view aliases the shared memory, a read is a copy
+        self.assertTrue(np.shares_memory(self.ring.view(3), self.ring.slots))
+        self.assertFalse(np.shares_memory(self.ring.read(3), self.ring.slots))
+
+    def test_old_and_duplicate_bars_are_ignored(self):
+        self.ring.append(self.records[:5])
+        self.assertEqual(self.ring.append(self.records[3:6]), 1)
+        self.assertEqual(self.ring.last_open_time(), self.records['open_time'][5])
+
+    def test_other_processes_map_the_ring(self):
+        self.ring.append(self.records)
+        # A separate interpreter, like a bot process started on its own
+        output = subprocess.run([sys.executable, '-c', READER, self.prefix], capture_output=True, text=True,
+                                 check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        closes, is_view = json.loads(output.stdout.strip().splitlines()[-1])
+        self.assertEqual(closes, self.records['close'][-5:].tolist())
+        self.assertTrue(is_view)
+        # The reader exiting must not unlink the segment
+        reader = KlineRing(self.ring.name)
+        self.assertEqual(reader.count, 20)
+        reader.close()
+
+    def test_wait_times_out(self):
+        self.assertEqual(self.ring.wait(0, timeout=0.01), 0)
+
+    def test_reads_give_up_on_a_writer_that_died_mid_write(self):
+        self.ring.append(self.records[:5])
+        self.ring.header[SEQUENCE] += 1
+        with self.assertRaises(TimeoutError):
+            self.ring.read(timeout=0.01)
+        with self.assertRaises(TimeoutError):
+            self.ring.view(timeout=0.01)
+        self.ring.header[SEQUENCE] += 1
+        np.testing.assert_array_equal(self.ring.read(), self.records[:5])
+
+
+class TestMarketDataServer(unittest.TestCase):
+
+    def setUp(self):
+        self.klines = random_klines(40, interval_ms=60000)[:15]
+        self.client = MagicMock()
+        self.client.get_historical_klines.side_effect = lambda symbol, interval, start: [
+            kline for kline in self.klines if kline[0] >= start
+        ]
+        self.prefix = f"test{os.getpid()}"
+        self.server = MarketDataServer(self.client, ['BTCUSDT'], ['1m'], capacity=100, prefix=self.prefix)
+        self.server.open()
+        self.reader = MarketDataClient(self.prefix)
+
+    def tearDown(self):
+        self.reader.close()
+        self.server.stop()
+
+    def test_history_and_stream_reach_readers(self):
+        self.server.load_history(self.klines[0][0])
+        # The last downloaded kline is still open
+        self.assertEqual(len(self.reader.klines('BTCUSDT', '1m')), 14)
+        last = self.klines[14][0]
+        self.server.handle_message(kline_message('BTCUSDT', '1m', last, '123.5', closed=False))
+        self.server.handle_message(kline_message('BTCUSDT', '1m', last, '123.5'))
+        records = self.reader.klines('BTCUSDT', '1m', 2)
+        self.assertEqual(records['open_time'][-1], last)
+        self.assertEqual(records['close'][-1], 123.5)
+        self.assertEqual(self.reader.get_historical_klines('BTCUSDT', '1m', last)[0][4], 123.5)
+        self.assertEqual(self.client.get_historical_klines.call_count, 1)
+
+    def test_stream_gap_is_backfilled(self):
+        self.server.load_history(self.klines[0][0])
+        self.klines = random_klines(40, interval_ms=60000)[:21]
+        self.server.handle_message(kline_message('BTCUSDT', '1m', self.klines[20][0], '1'))
+        np.testing.assert_array_equal(
+            self.reader.klines('BTCUSDT', '1m')['open_time'], [kline[0] for kline in self.klines]
+        )
+
+    def test_stale_segments_are_replaced_quietly(self):
+        output = subprocess.run([sys.executable, '-c', CRASHED_SERVER, f"stale{os.getpid()}"], capture_output=True,
+                                text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.strip().splitlines()[-1], '8')
+        # No resource tracker tracebacks or leak warnings
+        self.assertNotIn('resource_tracker', output.stderr)
+        self.assertNotIn('Traceback', output.stderr)
+
+    def test_rings_are_sized_from_the_history(self):
+        server = MarketDataServer(self.client, ['ETHUSDT'], ['1m', '15m'], prefix=self.prefix)
+        with self.assertRaises(ValueError):
+            server.open()
+        server.open('2 hours ago UTC')
+        try:
+            self.assertIn(server.rings['ETHUSDT', '1m'].capacity, (120, 121))
+            self.assertIn(server.rings['ETHUSDT', '15m'].capacity, (8, 9))
+        finally:
+            server.stop()
+
+    def test_history_prefers_the_kline_store(self):
+        store = MagicMock()
+        store.load.return_value = klines_to_array(self.klines[:10])
+        self.server.kline_store = store
+        self.server.load_history(self.klines[0][0])
+        self.client.get_historical_klines.assert_called_once_with('BTCUSDT', '1m', self.klines[10][0])
+        self.assertEqual(len(self.reader.klines('BTCUSDT', '1m')), 14)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import logging
+import unittest
+from src.trading.optimizer import (
+    SEARCH_SPACES, CONSTRAINTS, SuccessiveHalving, evaluate, init_worker, parameter_grid,
+)
+from src.trading.strategy import VATSStrategy
+from tests.test_vector_strategy import make_klines
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+
+    def setUp(self):
+        self.klines = make_klines(900, 3)
+        # init_worker quiets the strategy loggers; keep that from leaking into other tests
+        self.levels = {name: logging.getLogger(name).level for name in list(logging.root.manager.loggerDict)}
+        self.space = {"lookback_period": [5, 10, 20], "threshold": [0.05, 0.2, 0.5], "max_volatility": [None, 0.02]}
+
+    def tearDown(self):
+        for name in list(logging.root.manager.loggerDict):
+            logging.getLogger(name).setLevel(self.levels.get(name, logging.NOTSET))
+
+    def test_grid_respects_constraint(self):
+        strategy_class, space = SEARCH_SPACES["macd"]
+        grid = parameter_grid(space, CONSTRAINTS["macd"])
+        self.assertTrue(all(params["fast_period"] < params["slow_period"] for params in grid))
+        self.assertEqual(len(parameter_grid(self.space)), 18)
+
+    def test_rungs_shrink_and_end_on_full_history(self):
+        search = SuccessiveHalving(VATSStrategy, self.space, self.klines, n_candidates=18, eta=3, min_bars=100)
+        self.assertEqual(search.rung_bars(), [100, 300, 900])
+        result = search.run()
+        self.assertEqual([len(table) for table in result["rungs"]], [18, 6, 2])
+        self.assertEqual(result["bars_evaluated"], 18 * 100 + 6 * 300 + 2 * 900)
+        self.assertLess(result["bars_evaluated"], result["grid_bars"] / 2)
+        # Survivors are the best of the previous rung
+        survivors = result["rungs"][0].head(6).drop(columns="score")
+        self.assertEqual(
+            sorted(map(str, survivors.to_dict("records"))),
+            sorted(map(str, result["rungs"][1].drop(columns="score").to_dict("records"))),
+        )
+
+    def test_best_candidate_is_scored_on_full_history(self):
+        result = SuccessiveHalving(VATSStrategy, self.space, self.klines, n_candidates=9, eta=3, seed=1).run()
+        init_worker(self.klines)
+        score = evaluate((VATSStrategy, result["best_params"], len(self.klines), {}))
+        self.assertAlmostEqual(result["best_score"], score)
+        self.assertEqual(result["best_score"], result["rungs"][-1]["score"].max())
+        self.assertIn(result["best_params"]["max_volatility"], (None, 0.02))
+
+    def test_parallel_workers_match_in_process(self):
+        kwargs = dict(n_candidates=6, eta=2, min_bars=300, taker_fee=0.001)
+        serial = SuccessiveHalving(VATSStrategy, self.space, self.klines, workers=1, **kwargs).run()
+        parallel = SuccessiveHalving(VATSStrategy, self.space, self.klines, workers=2, **kwargs).run()
+        self.assertEqual(serial["best_params"], parallel["best_params"])
+        self.assertAlmostEqual(serial["best_score"], parallel["best_score"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from src.trading import order_book
+from src.trading.order_book import BookSide, OrderBook, DepthRecording, DepthStreamSync
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def setUp(self):
+        self.recording = DepthRecording.load(
+            'BTCUSDT',
+            os.path.join(DATA_DIR, 'btcusdt_depth_snapshot.json'),
+            os.path.join(DATA_DIR, 'btcusdt_depth_updates.jsonl'),
+        )
+
+    def test_snapshot_top_of_book(self):
+        book = self.recording.book_at(0)
+        self.assertEqual(book.best_bid(), (40000.0, 1.5))
+        self.assertEqual(book.best_ask(), (40001.0, 1.0))
+        self.assertEqual(book.mid_price(), 40000.5)
+
+    def test_replay_applies_updates_in_sequence(self):
+        book = self.recording.book_at(1700000000200)
+        # The first event is already in the snapshot and must be dropped
+        self.assertEqual(book.depth_at('BUY', 40000.0), 1.5)
+        self.assertEqual(book.best_bid(), (40000.5, 0.5))
+        self.assertEqual(book.best_ask(), (40001.5, 0.75))
+        self.assertEqual(book.depth_at('BUY', 39999.0), 0.0)
+        self.assertEqual(book.depth_at('SELL', 40002.0), 2.5)
+        self.assertEqual(book.last_update_id, 1006)
+        self.assertTrue(book.synced)
+
+    def test_book_at_rewinds(self):
+        self.recording.book_at(1700000000300)
+        book = self.recording.book_at(1700000000100)
+        self.assertEqual(book.last_update_id, 1003)
+        self.assertEqual(book.best_ask(), (40002.0, 2.0))
+
+    def test_sequence_gap_marks_out_of_sync(self):
+        book = self.recording.book_at(1700000000300)
+        applied = book.apply_diff({'E': 1700000000400, 'U': 1010, 'u': 1011, 'b': [], 'a': []})
+        self.assertFalse(applied)
+        self.assertFalse(book.synced)
+
+    def test_sweep_cost(self):
+        book = self.recording.book_at(0)
+        average_price, filled, cost = book.sweep_cost('BUY', 2.0)
+        self.assertEqual(filled, 2.0)
+        self.assertEqual(cost, 40001.0 + 40002.0)
+        self.assertEqual(average_price, 40001.5)
+
+        average_price, filled, cost = book.sweep_cost('SELL', 10.0)
+        self.assertEqual(filled, 6.5)
+
+    def test_check_liquidity(self):
+        book = OrderBook('BTCUSDT')
+        book.load_snapshot({'lastUpdateId': 1, 'bids': [['100', '1']], 'asks': [['101', '1'], ['110', '10']]})
+        self.assertTrue(book.check_liquidity('BUY', 1.0, max_slippage_bps=1))
+        self.assertFalse(book.check_liquidity('BUY', 2.0, max_slippage_bps=10))
+        self.assertFalse(book.check_liquidity('SELL', 2.0, max_slippage_bps=1000))
+
+
+class TestBookSide(unittest.TestCase):
+
+    def test_updates_match_a_price_map(self):
+        rng = np.random.default_rng(3)
+        side = BookSide()
+        side.load([[price, 1.0] for price in range(0, 100, 2)])
+        expected = {float(price): 1.0 for price in range(0, 100, 2)}
+        for _ in range(200):
+            levels = [[float(rng.integers(100)), float(rng.choice([0, 0.5, 2]))] for _ in range(3)]
+            side.apply(levels)
+            for price, quantity in levels:
+                if quantity > 0:
+                    expected[price] = quantity
+                else:
+                    expected.pop(price, None)
+            self.assertEqual(side.prices.tolist(), sorted(expected))
+            self.assertEqual(side.quantities.tolist(), [expected[price] for price in sorted(expected)])
+
+
+class TestDepthStreamSync(unittest.TestCase):
+
+    def setUp(self):
+        self.recording = DepthRecording.load(
+            'BTCUSDT',
+            os.path.join(DATA_DIR, 'btcusdt_depth_snapshot.json'),
+            os.path.join(DATA_DIR, 'btcusdt_depth_updates.jsonl'),
+        )
+        self.client = MagicMock()
+
+    def test_failed_snapshot_is_retried_on_later_events(self):
+        self.client.get_order_book.side_effect = [None, self.recording.snapshot]
+        sync = DepthStreamSync(self.client, 'BTCUSDT', retry_delay=0)
+        for event in self.recording.events[:3]:
+            sync.handle_message({'stream': sync.stream(), 'data': event})
+        self.assertEqual(self.client.get_order_book.call_count, 2)
+        self.assertTrue(sync.book.synced)
+        self.assertEqual(len(sync.buffer), 0)
+        self.assertEqual(sync.book.last_update_id, 1006)
+        sync.handle_message(self.recording.events[3])
+        self.assertEqual(sync.book.last_update_id, 1007)
+
+    def test_retries_back_off_and_the_buffer_is_capped(self):
+        self.client.get_order_book.return_value = None
+        event = self.recording.events[1]
+        with patch.object(order_book, 'MAX_BUFFERED_EVENTS', 5), patch('src.trading.order_book.time') as clock:
+            sync = DepthStreamSync(self.client, 'BTCUSDT', retry_delay=1.0)
+            # One event every 100ms for 3 seconds
+            for tick in range(31):
+                clock.monotonic.return_value = tick / 10
+                sync.handle_message(event)
+        # Fetched at 0s, 1s and 3s
+        self.assertEqual(self.client.get_order_book.call_count, 3)
+        self.assertEqual(len(sync.buffer), 5)
+        self.assertFalse(sync.book.synced)
+
+
+if __name__ == '__main__':
+    unittest.main()
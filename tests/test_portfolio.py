@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from src.trading.portfolio import PortfolioBacktester, align_closes, signal_matrix
+from src.trading.strategy import MovingAverageCrossoverStrategy
+
+
+def reference_equity(closes, weights_by_bar, rebalance, fee_rate, capital):
+    """Bar-by-bar simulation holding share quantities between rebalances"""
+    cash, shares, equity = capital, np.zeros(closes.shape[1]), []
+    for t in range(len(closes)):
+        value = cash + np.nansum(shares * closes[t])
+        if rebalance[t]:
+            target = weights_by_bar[t] * value
+            current = np.nan_to_num(shares * closes[t])
+            value -= fee_rate * np.abs(target - current).sum()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                shares = np.nan_to_num(weights_by_bar[t] * value / closes[t])
+            cash = value - np.nansum(shares * closes[t])
+        equity.append(value)
+    return np.array(equity)
+
+
+class TestPortfolioBacktester(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, (300, 5)), axis=0)
+        self.closes[:40, 4] = np.nan  # Listed later
+        self.holdings = (rng.random((300, 5)) > 0.3).astype(float)
+        self.holdings = np.repeat(self.holdings[::10], 10, axis=0)
+
+    def assert_matches_reference(self, **kwargs):
+        backtester = PortfolioBacktester(self.closes, self.holdings, initial_capital=1000, **kwargs)
+        results = backtester.run()
+        weights = results['weights'].to_numpy()
+        rebalance = np.r_[True, np.any(weights[1:] != weights[:-1], axis=1)] | (np.arange(300) % kwargs.get('rebalance_every', 1) == 0)
+        expected = reference_equity(self.closes, weights, rebalance, kwargs.get('fee_rate', 0.0), 1000)
+        np.testing.assert_allclose(results['equity'].to_numpy(), expected, rtol=1e-9)
+        return results
+
+    def test_equal_weight_matches_reference(self):
+        results = self.assert_matches_reference(rebalance_every=20, fee_rate=0.001)
+        held = results['weights'].to_numpy()
+        self.assertTrue(np.allclose(held.sum(axis=1)[held.sum(axis=1) > 0], 1))
+
+    def test_max_positions(self):
+        results = self.assert_matches_reference(max_positions=2, rebalance_every=5, lookback=10)
+        self.assertLessEqual((results['weights'].to_numpy() > 0).sum(axis=1).max(), 2)
+
+    def test_volatility_weights(self):
+        results = self.assert_matches_reference(allocation='volatility', lookback=20)
+        self.assertEqual(results['weights'].iloc[:40, 4].sum(), 0)
+
+    def test_unknown_allocation(self):
+        with self.assertRaises(ValueError):
+            PortfolioBacktester(self.closes, self.holdings, allocation='kelly')
+
+    def test_from_strategy(self):
+        history = {
+            symbol: [[i * 60000, '0', '0', '0', str(close), '0', 0, '0', 0, '0', '0', '0']
+                     for i, close in enumerate(self.closes[40:, j])]
+            for j, symbol in enumerate(['AUSDT', 'BUSDT'])
+        }
+        timestamps, symbols, closes = align_closes(history)
+        self.assertEqual(closes.shape, (260, 2))
+        holdings = signal_matrix(MovingAverageCrossoverStrategy(5, 20), history, timestamps)
+        self.assertTrue(set(np.unique(holdings)) <= {0.0, 1.0})
+        results = PortfolioBacktester.from_strategy(MovingAverageCrossoverStrategy(5, 20), history).run()
+        self.assertEqual(list(results['weights'].columns), ['AUSDT', 'BUSDT'])
+
+
+if __name__ == '__main__':
+    unittest.main()
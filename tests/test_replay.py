@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.trading.journal import TradeJournal, read_journal
+from src.trading.live_engine import LiveSignalEngine
+from src.trading.paper_broker import PaperBroker
+from src.trading.replay import KlineReplay
+from src.trading.vector_strategy import VectorYOLOStrategy
+
+MINUTE = 60000
+
+
+def make_history(closes_by_symbol):
+    history = {}
+    for symbol, closes in closes_by_symbol.items():
+        history[symbol] = [
+            [i * MINUTE, str(o), str(max(o, c)), str(min(o, c)), str(c), '10', (i + 1) * MINUTE - 1, '0', 1, '0', '0', '0']
+            for i, (o, c) in enumerate(zip(closes[:-1], closes[1:]))
+        ]
+    return history
+
+
+class TestKlineReplay(unittest.TestCase):
+
+    def setUp(self):
+        # Candle 2 dumps 10% (YOLO buys), the following rips sell
+        self.history = make_history({
+            'BTCUSDT': [100, 100, 90, 99, 110, 121],
+            'ETHUSDT': [10, 10, 10, 10, 10, 10],
+        })
+        self.engine = LiveSignalEngine(VectorYOLOStrategy(2), ['BTCUSDT', 'ETHUSDT'], '1m', order_size=90)
+        self.broker = PaperBroker(1000, fee_rate=0, price_source=self.engine.last_close)
+        self.engine.broker = self.broker
+
+    def test_replay_routes_orders_to_paper_broker(self):
+        report = KlineReplay(self.engine, self.history).run()
+        self.assertEqual(report['events'], 10)
+        self.assertEqual(report['bars'], 5)
+        self.assertGreater(report['events_per_sec'], 0)
+
+        self.assertEqual([order['side'] for order in self.broker.orders], ['BUY', 'SELL'])
+        self.assertEqual(float(self.broker.orders[0]['fills'][0]['price']), 90.0)
+        self.assertEqual(float(self.broker.orders[1]['fills'][0]['price']), 99.0)
+        self.assertAlmostEqual(self.broker.balances['USDT'], 1009.0)
+        self.assertAlmostEqual(self.broker.equity(), 1009.0)
+        np.testing.assert_allclose(self.engine.position, [0, 0], atol=1e-12)
+
+        latency = report['latency']
+        self.assertEqual(latency['submit_to_ack']['count'], 2)
+        self.assertEqual(latency['receive_to_evaluate']['count'], 5)
+        self.assertEqual(latency['close_to_ack']['count'], 0)
+
+    def test_journaled_trades_carry_bar_times(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'trades.journal')
+            self.engine.journal = TradeJournal(path)
+            self.broker.time_source = self.engine.last_close_time
+            KlineReplay(self.engine, self.history).run()
+            # Written as the orders are acknowledged, without closing the journal
+            trades = read_journal(path)
+            np.testing.assert_array_equal(trades['timestamp'], [2 * MINUTE - 1, 3 * MINUTE - 1])
+            np.testing.assert_array_equal(trades['side'], [1, -1])
+            del trades
+            self.engine.journal.close()
+
+    def test_messages_are_interleaved_by_close_time(self):
+        close_times = [close_time for close_time, _ in KlineReplay(self.engine, self.history).messages()]
+        self.assertEqual(close_times, sorted(close_times))
+
+
+class TestPaperBroker(unittest.TestCase):
+
+    def test_rejects_orders_without_balance(self):
+        broker = PaperBroker(100, price_source=lambda symbol: 50.0)
+        self.assertIsNone(broker.place_order('BTCUSDT', 'BUY', 'MARKET', 3))
+        self.assertIsNone(broker.place_order('BTCUSDT', 'SELL', 'MARKET', 1))
+        order = broker.place_order('BTCUSDT', 'BUY', 'MARKET', 1)
+        self.assertEqual(order['status'], 'FILLED')
+        self.assertAlmostEqual(broker.balances['USDT'], 100 - 50 * 1.001)
+        self.assertAlmostEqual(broker.equity(), 100 - 50 * 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from src.trading.live_engine import LiveSignalEngine
+from src.trading.screener import MarketScreener, load_recent
+from src.trading.strategy import RSIStrategy, VATSStrategy, BollingerBandsStrategy
+from tests.test_vector_strategy import make_klines
+
+
+class TestMarketScreener(unittest.TestCase):
+
+    def setUp(self):
+        self.symbols = [f"SYM{i}USDT" for i in range(5)]
+        self.history = {symbol: make_klines(80, seed) for seed, symbol in enumerate(self.symbols)}
+        self.screener = MarketScreener(len(self.symbols), rsi_period=14, lookback_period=10, window=20)
+        self.engine = LiveSignalEngine(self.screener, self.symbols, '1m')
+        self.engine.feed_history(self.history)
+
+    def test_matches_batch_indicators(self):
+        table = self.screener.table(self.symbols)
+        for symbol, klines in self.history.items():
+            rsi = RSIStrategy(rsi_period=14).generate_signals(klines)
+            vats = VATSStrategy(lookback_period=10).generate_signals(klines)
+            bands = BollingerBandsStrategy(window=20).generate_signals(klines).iloc[-1]
+            self.assertAlmostEqual(table.loc[symbol, 'rsi'], rsi['rsi'].iloc[-1])
+            self.assertAlmostEqual(table.loc[symbol, 'vats_score'], vats['vats_score'].iloc[-1])
+            position = (bands['close'] - bands['lower_band']) / (bands['upper_band'] - bands['lower_band'])
+            self.assertAlmostEqual(table.loc[symbol, 'bollinger_position'], position)
+
+    def test_rankings_are_sorted(self):
+        rankings = self.screener.rankings(self.symbols, top=3)
+        self.assertEqual(len(rankings['rsi']), 3)
+        self.assertTrue(rankings['rsi']['rsi'].is_monotonic_increasing)
+        self.assertTrue(rankings['vats_score']['vats_score'].is_monotonic_decreasing)
+        self.assertTrue(rankings['bollinger_position']['bollinger_position'].is_monotonic_increasing)
+
+    def test_incremental_refresh_matches_reload(self):
+        extra = {symbol: make_klines(81, seed)[-1:] for seed, symbol in enumerate(self.symbols)}
+        kline = extra[self.symbols[0]][0]
+        for symbol, klines in extra.items():
+            k = klines[0]
+            self.engine.stage_bar(self.engine.index[symbol], k[0], k[1], k[2], k[3], k[4], k[5])
+
+        reloaded = MarketScreener(len(self.symbols), rsi_period=14, lookback_period=10, window=20)
+        LiveSignalEngine(reloaded, self.symbols, '1m').feed_history(
+            {symbol: make_klines(81, seed) for seed, symbol in enumerate(self.symbols)}
+        )
+        pd.testing.assert_frame_equal(self.screener.table(self.symbols), reloaded.table(self.symbols))
+        self.assertEqual(self.engine.last_open_time[0], kline[0])
+
+    def test_snapshot_restores_indicator_state(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'screener.npz')
+            self.engine.save_snapshot(path)
+            restored = MarketScreener(len(self.symbols), rsi_period=14, lookback_period=10, window=20)
+            engine = LiveSignalEngine(restored, self.symbols, '1m')
+            self.assertTrue(engine.load_snapshot(path))
+        pd.testing.assert_frame_equal(restored.table(self.symbols), self.screener.table(self.symbols))
+        # Following bars continue from the restored windows
+        for screener in (self.screener, restored):
+            screener.update(np.tile([100.0, 101.0, 99.0, 100.5, 10.0], (len(self.symbols), 1)))
+        pd.testing.assert_frame_equal(restored.table(self.symbols), self.screener.table(self.symbols))
+
+    def test_new_symbols_without_history_are_left_out(self):
+        screener = MarketScreener(2)
+        screener.update(np.array([[1, 1, 1, 1, 1], [1, 1, 1, 1, 1]], dtype=float), np.array([True, False]))
+        rankings = screener.rankings(['AUSDT', 'BUSDT'])
+        self.assertNotIn('BUSDT', rankings['rsi'].index)
+
+    def test_full_market_refresh_is_one_vectorized_pass(self):
+        n = 500
+        screener = MarketScreener(n)
+        rng = np.random.default_rng(0)
+        closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, (60, n)), axis=0)
+        for row in closes[:-1]:
+            screener.update(np.repeat(row[:, None], 5, axis=1))
+
+        calls = []
+        for strategy in (screener.rsi_strategy, screener.vats_strategy, screener.bollinger_strategy):
+            update = strategy.update
+            strategy.update = lambda bars, mask, update=update: calls.append(bars.shape) or update(bars, mask)
+        screener.update(np.repeat(closes[-1][:, None], 5, axis=1))
+        rankings = screener.rankings([str(i) for i in range(n)])
+        # Each indicator is updated once for the whole market, not once per symbol
+        self.assertEqual(calls, [(n, 5)] * 3)
+        self.assertEqual(len(rankings['rsi']), 10)
+
+    def test_load_recent_drops_open_bar(self):
+        client = MagicMock()
+        client.get_historical_klines.side_effect = lambda symbol, interval, start: [[1], [2], [3]]
+        history = load_recent(client, ['AUSDT', 'BUSDT'], '1m', 2)
+        self.assertEqual(history, {'AUSDT': [[1], [2]], 'BUSDT': [[1], [2]]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import http.client
+import json
+import os
+import socket
+import tempfile
+import unittest
+from src.service.signal_server import SignalService
+from src.trading.live_engine import LiveSignalEngine
+from src.trading.vector_strategy import VectorMACDStrategy
+from tests.test_live_engine import kline_message
+
+
+class TestSignalService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp_dir.name, 'signals.sock')
+        self.engine = LiveSignalEngine(VectorMACDStrategy(2, 3, 6, 2), ['BTCUSDT', 'ETHUSDT'], '15m')
+        self.service = SignalService(self.engine, port=0, unix_socket=self.socket_path)
+        self.service.start()
+
+    def tearDown(self):
+        self.service.stop()
+        self.tmp_dir.cleanup()
+
+    def feed(self, closes):
+        for bar, close in enumerate(closes):
+            for symbol in self.engine.symbols:
+                self.engine.handle_message(kline_message(symbol, bar * 900000, close, close))
+
+    def get(self, connection, path):
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_http_answers_follow_the_engine(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.service.port)
+        status, answer = self.get(connection, '/signal/BTCUSDT')
+        self.assertEqual(status, 200)
+        self.assertEqual(answer['signal'], 'HOLD')
+        self.assertIsNone(answer['open_time'])
+
+        self.feed([100, 101, 103, 106, 110])
+        # Same keep-alive connection
+        status, answer = self.get(connection, '/signal/btcusdt')
+        self.assertEqual(answer['signal'], 'BUY')
+        self.assertEqual(answer['open_time'], 4 * 900000)
+        self.assertEqual(answer['bar']['close'], 110)
+        self.assertAlmostEqual(answer['indicators']['macd_line'], float(self.engine.strategy.macd_line[0]))
+
+        status, answers = self.get(connection, '/signals')
+        self.assertEqual(sorted(answers), ['BTCUSDT', 'ETHUSDT'])
+        status, _ = self.get(connection, '/signal/DOGEUSDT')
+        self.assertEqual(status, 404)
+        connection.close()
+
+    def test_unix_socket_line_protocol(self):
+        self.feed([100, 99, 97, 94, 90])
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(self.socket_path)
+            stream = client.makefile('rwb')
+            for query in (b'ETHUSDT\n', b'*\n', b'NOPE\n'):
+                stream.write(query)
+                stream.flush()
+            answer, everything, unknown = (json.loads(stream.readline()) for _ in range(3))
+        self.assertEqual(answer['signal'], 'SELL')
+        self.assertEqual(everything['BTCUSDT']['signal'], 'SELL')
+        self.assertIn('error', unknown)
+
+    def test_answers_are_preencoded(self):
+        self.feed([100, 101])
+        self.assertIs(self.service.answer('BTCUSDT'), self.service.answer('btcusdt'))
+        self.assertIsNone(self.service.answer('DOGEUSDT'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import tempfile
+import time
+import unittest
+import numpy as np
+from src.data.kline_store import KlineStore
+from src.data.sync import KlineSync, find_gaps, scan_series
+from tests.test_kline_store import make_klines
+
+MINUTE = 60000
+
+
+class FakeClient:
+    """Serves klines from a fixed series, optionally failing or missing some ranges"""
+
+    def __init__(self, open_times, missing=(), failing=()):
+        self.open_times = [t for t in open_times if t not in missing]
+        self.failing = set(failing)
+        self.calls = []
+
+    def get_historical_klines(self, symbol, interval, start_str, end_str=None, raise_errors=False):
+        self.calls.append((start_str, end_str))
+        if start_str in self.failing:
+            raise RuntimeError("rate limited")
+        end = end_str if end_str is not None else float('inf')
+        return make_klines([t for t in self.open_times if start_str <= t <= end])
+
+
+class TestGapDetection(unittest.TestCase):
+
+    def test_find_gaps(self):
+        gaps = find_gaps([0, MINUTE, 4 * MINUTE, 5 * MINUTE, 7 * MINUTE], MINUTE)
+        self.assertEqual(gaps.tolist(), [[2 * MINUTE, 3 * MINUTE], [6 * MINUTE, 6 * MINUTE]])
+
+    def test_scan_series(self):
+        report = scan_series([0, MINUTE, MINUTE, 4 * MINUTE, 3 * MINUTE], MINUTE)
+        self.assertEqual(report['duplicates'], 1)
+        self.assertEqual(report['out_of_order'], 1)
+        self.assertEqual(report['missing_bars'], 2)
+
+
+class TestKlineSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = KlineStore(self.tmp_dir.name)
+        now = int(time.time() * 1000) // MINUTE * MINUTE
+        self.start = now - 100 * MINUTE
+        self.open_times = list(range(self.start, now - MINUTE, MINUTE))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_repairs_gaps_and_fetches_tail(self):
+        stored = self.open_times[:10] + self.open_times[15:50]
+        self.store.append('BTCUSDT', '1m', make_klines(stored))
+        client = FakeClient(self.open_times)
+
+        result = KlineSync(client, self.store).sync('BTCUSDT', '1m', self.start)
+        self.assertEqual(result['repaired'], 1)
+        self.assertEqual(result['open_gaps'], [])
+        self.assertEqual(self.store.load('BTCUSDT', '1m')['open_time'].tolist(), self.open_times)
+        self.assertIn((self.open_times[10], self.open_times[14]), client.calls)
+
+    def test_second_sync_only_fetches_new_bars(self):
+        client = FakeClient(self.open_times)
+        KlineSync(client, self.store).sync('BTCUSDT', '1m', self.start)
+
+        client.calls = []
+        result = KlineSync(client, self.store).sync('BTCUSDT', '1m', self.start)
+        self.assertEqual(client.calls, [(self.open_times[-1] + MINUTE, None)])
+        self.assertEqual(result['fetched'], 0)
+
+    def test_exchange_outage_is_remembered(self):
+        outage = self.open_times[20:25]
+        client = FakeClient(self.open_times, missing=outage)
+        self.store.append('BTCUSDT', '1m', make_klines([t for t in self.open_times if t not in outage]))
+
+        syncer = KlineSync(client, self.store)
+        syncer.sync('BTCUSDT', '1m', self.start)
+        self.assertEqual(syncer.manifest['BTCUSDT/1m']['known_gaps'], [[outage[0], outage[-1]]])
+
+        client.calls = []
+        KlineSync(client, self.store).sync('BTCUSDT', '1m', self.start)
+        self.assertEqual(len(client.calls), 1)
+
+    def test_failed_request_is_retried(self):
+        stored = self.open_times[:10] + self.open_times[15:]
+        self.store.append('BTCUSDT', '1m', make_klines(stored))
+        client = FakeClient(self.open_times, failing=[self.open_times[10]])
+
+        result = KlineSync(client, self.store).sync('BTCUSDT', '1m', self.start)
+        self.assertEqual(len(result['failed']), 1)
+        self.assertEqual(len(result['open_gaps']), 1)
+
+        client.failing = set()
+        result = KlineSync(client, self.store).sync('BTCUSDT', '1m', self.start)
+        self.assertEqual(result['repaired'], 1)
+        self.assertEqual(np.diff(self.store.load('BTCUSDT', '1m')['open_time']).max(), MINUTE)
+
+
+if __name__ == '__main__':
+    unittest.main()
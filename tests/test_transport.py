@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from src.api.binance_client import BinanceClient
+from src.api.transport import PooledClient, SingleFlight, shared_adapter
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_concurrently(self, n, target):
+        results = [None] * n
+        errors = [None] * n
+
+        def worker(i):
+            try:
+                results[i] = target()
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_identical_calls_are_merged(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return [1, 2, 3]
+
+        results, errors = self.run_concurrently(8, lambda: flight.do(('klines', 'BTCUSDT'), fetch))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [None] * 8)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ConnectionError("down")
+
+        _, errors = self.run_concurrently(4, lambda: flight.do('ticker', fail))
+        self.assertTrue(all(isinstance(error, ConnectionError) for error in errors))
+
+    def test_sequential_calls_are_not_cached(self):
+        flight = SingleFlight()
+        fetch = MagicMock(side_effect=[1, 2])
+        self.assertEqual(flight.do('key', fetch), 1)
+        self.assertEqual(flight.do('key', fetch), 2)
+
+
+class TestPooledClient(unittest.TestCase):
+
+    def test_sessions_share_the_connection_pool(self):
+        authenticated = PooledClient('key', 'secret', ping=False)
+        public = PooledClient(ping=False)
+        self.assertIs(authenticated.session.get_adapter(authenticated.API_URL), shared_adapter())
+        self.assertIs(public.session.get_adapter(public.API_URL), shared_adapter())
+        # API keys stay on their own session
+        self.assertEqual(authenticated.session.headers['X-MBX-APIKEY'], 'key')
+        self.assertNotIn('X-MBX-APIKEY', public.session.headers)
+
+    def test_closing_one_session_keeps_the_shared_pool(self):
+        first = PooledClient(ping=False)
+        second = PooledClient(ping=False)
+        pool = shared_adapter().poolmanager.connection_from_url(first.API_URL)
+        first.session.close()
+        # The other client still finds the same pool and its idle connections
+        self.assertIs(shared_adapter().poolmanager.connection_from_url(second.API_URL), pool)
+
+    def test_clients_coalesce_kline_requests(self):
+        first = BinanceClient.__new__(BinanceClient)
+        second = BinanceClient.__new__(BinanceClient)
+        release = threading.Event()
+        downloads = []
+
+        def download(*args):
+            downloads.append(args)
+            release.wait(1)
+            return [[0, '1', '1', '1', '1', '1']]
+
+        for client in (first, second):
+            client.client = MagicMock(API_URL='https://api.binance.com/api')
+            client.client.get_historical_klines.side_effect = download
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda c=c: results.append(c.get_historical_klines('BTCUSDT', '1h', '1 day ago UTC')))
+            for c in (first, second)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(downloads), 1)
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+from src.trading.strategy import (
+    MovingAverageCrossoverStrategy,
+    RSIStrategy,
+    VATSStrategy,
+    BollingerBandsStrategy,
+    YOLOStrategy,
+)
+from src.trading.macd_strategy import MACDStrategy
+from src.trading.vector_strategy import vectorize_strategy, VectorVWAPStrategy
+
+
+def make_klines(n_bars, seed):
+    rng = np.random.default_rng(seed)
+    closes = 40000 * np.cumprod(1 + rng.normal(0, 0.01, n_bars))
+    klines = []
+    for i, close in enumerate(closes):
+        open_ = close * (1 + rng.normal(0, 0.005))
+        high = max(open_, close) * 1.002
+        low = min(open_, close) * 0.998
+        volume = rng.uniform(50, 150)
+        klines.append([1622505600000 + i * 60000, str(open_), str(high), str(low), str(close), str(volume),
+                       1622505659999 + i * 60000, '0', 100, '0', '0', '0'])
+    return klines
+
+
+class TestVectorStrategies(unittest.TestCase):
+
+    def setUp(self):
+        self.history = [make_klines(120, seed) for seed in range(3)]
+        self.bars = np.array([[[float(v) for v in kline[1:6]] for kline in klines] for klines in self.history])
+
+    def assert_matches_batch(self, strategy):
+        vector = vectorize_strategy(strategy, len(self.history))
+        signals = []
+        for t in range(self.bars.shape[1]):
+            vector.update(self.bars[:, t])
+            signals.append(vector.signal.copy())
+        signals = np.array(signals)
+        for i, klines in enumerate(self.history):
+            expected = strategy.generate_signals(klines)['signal'].to_numpy()
+            np.testing.assert_array_equal(signals[:, i], expected)
+
+    def test_moving_average_crossover_matches_batch(self):
+        self.assert_matches_batch(MovingAverageCrossoverStrategy(short_window=5, long_window=20))
+
+    def test_rsi_matches_batch(self):
+        self.assert_matches_batch(RSIStrategy(rsi_period=14, rsi_overbought=60, rsi_oversold=40))
+
+    def test_vats_matches_batch(self):
+        self.assert_matches_batch(VATSStrategy(lookback_period=10, threshold=0.2, max_volatility=0.012))
+
+    def test_bollinger_matches_batch(self):
+        self.assert_matches_batch(BollingerBandsStrategy(window=20, num_std=1))
+
+    def test_macd_matches_batch(self):
+        self.assert_matches_batch(MACDStrategy(fast_period=12, slow_period=26, signal_period=9))
+
+    def test_yolo_matches_batch(self):
+        self.assert_matches_batch(YOLOStrategy(dip_threshold=0.5, rip_threshold=0.5))
+
+    def test_masked_rows_keep_state(self):
+        strategy = VectorVWAPStrategy(2, window=3)
+        mask = np.array([True, False])
+        for t in range(5):
+            strategy.update(self.bars[:2, t], mask)
+        self.assertEqual(strategy.bars.tolist(), [5, 0])
+        self.assertTrue(np.isnan(strategy.vwap[1]))
+        self.assertFalse(np.isnan(strategy.vwap[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()